@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CDC (change data capture) berbasis trigger di database SOURCE
+Untuk cutover dengan downtime minimal:
+    1. python cdc_trigger.py pasang   → buat tabel _mig_changelog + trigger
+                                        AFTER INSERT/UPDATE/DELETE
+    2. jalankan migrasi penuh seperti biasa (02_migrasi_all_tabel_...)
+    3. python cdc_trigger.py susul    → terapkan perubahan ke target per
+                                        batch sampai lag mendekati nol
+                                        (--ikuti = terus berjalan)
+    4. stop input di aplikasi lama, jalankan `susul --lag-max 0`
+    5. python cdc_trigger.py lepas    → hapus trigger (+ --hapus-log)
+Yang dicatat trigger hanya PK. Saat susul, row dibaca ulang dari source
+dan diproses dengan SPEC/transform yang sama dengan engine_migrasi:
+target row di-DELETE lalu di-INSERT ulang (jika masih ada di source).
+User source butuh hak TRIGGER (dan log_bin_trust_function_creators=1
+jika binlog aktif).
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+import engine_migrasi as eng
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+# Tabel panas di source yang dipantau
+TABEL_CDC = [
+    "transaksi_lab",
+    "transaksi_lab_detail",
+    "history",
+    "duplo",
+    "duplo_detail",
+    "pasien",
+]
+
+CHANGELOG = "_mig_changelog"
+
+# Jumlah entri changelog per putaran susul
+CDC_BATCH = int(os.getenv("MIG_CDC_BATCH", "5000"))
+
+# Sisa entri yang dianggap "lag mendekati nol"
+CDC_LAG_MAX = int(os.getenv("MIG_CDC_LAG_MAX", "100"))
+
+DDL_CHANGELOG = f"""
+CREATE TABLE IF NOT EXISTS `{CHANGELOG}` (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    tabel VARCHAR(64) NOT NULL,
+    pk BIGINT NOT NULL,
+    op CHAR(1) NOT NULL,
+    waktu TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (id)
+) ENGINE=InnoDB
+"""
+
+
+def nama_trigger(tabel, op):
+    return f"_mig_cdc_{tabel}_{op}"
+
+
+def build_trigger(tabel, pk):
+    log = f"INSERT INTO `{CHANGELOG}` (tabel, pk, op) VALUES ('{tabel}'"
+    return [
+        f"CREATE TRIGGER `{nama_trigger(tabel, 'ins')}` "
+        f"AFTER INSERT ON `{tabel}` FOR EACH ROW "
+        f"{log}, NEW.`{pk}`, 'I')",
+
+        f"CREATE TRIGGER `{nama_trigger(tabel, 'upd')}` "
+        f"AFTER UPDATE ON `{tabel}` FOR EACH ROW BEGIN "
+        f"IF NOT (OLD.`{pk}` <=> NEW.`{pk}`) THEN "
+        f"{log}, OLD.`{pk}`, 'D'); END IF; "
+        f"{log}, NEW.`{pk}`, 'U'); END",
+
+        f"CREATE TRIGGER `{nama_trigger(tabel, 'del')}` "
+        f"AFTER DELETE ON `{tabel}` FOR EACH ROW "
+        f"{log}, OLD.`{pk}`, 'D')",
+    ]
+
+
+# =====================================================
+# 2. PASANG / LEPAS TRIGGER
+# =====================================================
+def cmd_pasang(src, tabel_list):
+    with src.begin() as conn:
+        conn.exec_driver_sql(DDL_CHANGELOG)
+
+    for tabel in tabel_list:
+        spec = eng.muat_spec(tabel)
+        with src.begin() as conn:
+            for op in ("ins", "upd", "del"):
+                conn.exec_driver_sql(
+                    f"DROP TRIGGER IF EXISTS `{nama_trigger(tabel, op)}`")
+            for sql in build_trigger(tabel, spec["pk"]):
+                conn.exec_driver_sql(sql)
+        print(f"   ✔ Trigger terpasang: {tabel}")
+
+
+def cmd_lepas(src, tabel_list, hapus_log):
+    with src.begin() as conn:
+        for tabel in tabel_list:
+            for op in ("ins", "upd", "del"):
+                conn.exec_driver_sql(
+                    f"DROP TRIGGER IF EXISTS `{nama_trigger(tabel, op)}`")
+            print(f"   ✔ Trigger dilepas: {tabel}")
+        if hapus_log:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{CHANGELOG}`")
+            print(f"   ✔ Tabel {CHANGELOG} dihapus")
+
+
+# =====================================================
+# 3. SUSUL (terapkan changelog ke target)
+# =====================================================
+def terapkan_tabel(src_cur, tgt_cur, tabel, pks, alias):
+    spec = eng.muat_spec(tabel)
+    pk = spec["pk"]
+    tabel_target = eng.nama_target(spec)
+    cols = ", ".join(f"`{c}`" for c in spec["kolom_sumber"])
+    marks = ", ".join(["%s"] * len(pks))
+
+    src_cur.execute(
+        f"SELECT {cols} FROM `{spec['tabel']}` WHERE `{pk}` IN ({marks})",
+        pks)
+    rows = src_cur.fetchall()
+
+    out = []
+    eng.transform_batch(eng.build_plan(spec), rows, out)
+
+    tgt_cur.execute(
+        f"DELETE FROM `{tabel_target}` WHERE `{pk}` IN ({marks})", pks)
+    if out:
+        eng.executemany(tgt_cur, eng.build_insert(spec, alias), out)
+    return len(out)
+
+
+def susul_sekali(src_raw, tgt_raw, alias):
+    """Satu putaran: ambil CDC_BATCH entri changelog → terapkan ke target."""
+    src_cur = src_raw.cursor()
+    tgt_cur = tgt_raw.cursor()
+
+    src_cur.execute(
+        f"SELECT id, tabel, pk FROM `{CHANGELOG}` ORDER BY id LIMIT %s",
+        (CDC_BATCH,))
+    entri = src_cur.fetchall()
+    src_raw.rollback()
+    if not entri:
+        return 0, 0
+
+    per_tabel = {}
+    for _, tabel, pk in entri:
+        per_tabel.setdefault(tabel, set()).add(pk)
+
+    ditulis = 0
+    tgt_cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for tabel, pks in per_tabel.items():
+            ditulis += terapkan_tabel(src_cur, tgt_cur, tabel, sorted(pks),
+                                      alias)
+        tgt_raw.commit()
+    except Exception:
+        tgt_raw.rollback()
+        raise
+    finally:
+        tgt_cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    src_raw.rollback()
+
+    # Target sudah commit → entri yang DIBACA boleh dibuang. Jangan pakai
+    # `id <= max`: transaksi dengan id AUTO_INCREMENT lebih kecil yang
+    # commit setelah SELECT di atas belum terbaca dan harus tetap ada
+    # untuk putaran berikutnya. Jika langkah ini gagal, putaran berikutnya
+    # menerapkan ulang (DELETE + INSERT idempoten).
+    ids = [e[0] for e in entri]
+    src_cur.execute(
+        f"DELETE FROM `{CHANGELOG}` WHERE id IN "
+        f"({', '.join(['%s'] * len(ids))})", ids)
+    src_raw.commit()
+    return len(entri), ditulis
+
+
+def hitung_lag(src_raw):
+    cur = src_raw.cursor()
+    cur.execute(f"SELECT COUNT(*), MIN(waktu) FROM `{CHANGELOG}`")
+    sisa, tertua = cur.fetchone()
+    src_raw.rollback()
+    return sisa, tertua
+
+
+def cmd_susul(src, tgt, ikuti, jeda, lag_max):
+    src_raw = src.raw_connection()
+    tgt_raw = tgt.raw_connection()
+    alias = eng.dukung_alias(tgt)
+    total_entri = 0
+    total_tulis = 0
+
+    try:
+        while True:
+            n_entri, n_tulis = susul_sekali(src_raw, tgt_raw, alias)
+            total_entri += n_entri
+            total_tulis += n_tulis
+
+            sisa, tertua = hitung_lag(src_raw)
+            sys.stdout.write(
+                f"\r🔄 Diterapkan: {total_entri} entri ({total_tulis} row) | "
+                f"Sisa: {sisa} | Tertua: {tertua or '-'}   ")
+            sys.stdout.flush()
+
+            if not ikuti and sisa <= lag_max:
+                break
+            if not n_entri:
+                time.sleep(jeda)
+    except KeyboardInterrupt:
+        print("\n⏹ Dihentikan manual.")
+        return
+    finally:
+        src_raw.close()
+        tgt_raw.close()
+
+    if lag_max:
+        print(f"\n\n✅ Lag sekarang ≤ {lag_max} entri — siap cutover "
+              "(hentikan input lalu jalankan susul --lag-max 0).")
+    else:
+        print("\n\n✅ Changelog habis — target sudah sama dengan source.")
+
+
+# =====================================================
+# 4. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CDC trigger migrasi")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_pasang = sub.add_parser("pasang", help="pasang trigger + changelog")
+    p_pasang.add_argument("tabel", nargs="*", help="default: TABEL_CDC")
+
+    p_susul = sub.add_parser("susul", help="terapkan changelog ke target")
+    p_susul.add_argument("--ikuti", action="store_true",
+                         help="terus berjalan sampai Ctrl+C")
+    p_susul.add_argument("--jeda", type=float, default=2.0,
+                         help="detik tunggu saat changelog kosong")
+    p_susul.add_argument("--lag-max", type=int, default=CDC_LAG_MAX,
+                         help="berhenti jika sisa changelog ≤ nilai ini")
+
+    p_lepas = sub.add_parser("lepas", help="hapus trigger")
+    p_lepas.add_argument("tabel", nargs="*", help="default: TABEL_CDC")
+    p_lepas.add_argument("--hapus-log", action="store_true",
+                         help=f"ikut DROP tabel {CHANGELOG}")
+
+    args = parser.parse_args()
+
+    src = eng.make_engine(eng.source_config, passthrough=eng.PASSTHROUGH)
+
+    print("==============================================================")
+    print(f"🚀 CDC TRIGGER — {args.cmd.upper()}")
+    print("==============================================================\n")
+    print(f"📌 SOURCE DB : {eng.source_config['database']}")
+    print(f"📌 TARGET DB : {eng.target_config['database']}\n")
+
+    try:
+        if args.cmd == "pasang":
+            cmd_pasang(src, args.tabel or TABEL_CDC)
+        elif args.cmd == "lepas":
+            cmd_lepas(src, args.tabel or TABEL_CDC, args.hapus_log)
+        else:
+            tgt = eng.make_engine(eng.target_config)
+            cmd_susul(src, tgt, args.ikuti, args.jeda, args.lag_max)
+    except Exception as e:
+        print("\n❌ ERROR CDC!")
+        print("Error:", e)
+        sys.exit(1)
+
+    print("\n⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dasbor terminal untuk tabel / rentang yang dimigrasi bersamaan
+Script migrasi dengan MIG_DASBOR=1 (engine + progress_bar script lama)
+menulis status per tabel ke MIG_DASBOR_DIR; orkestrator 02 dan
+muat_ulang_tabel.py menulis jadwal script-nya. dasbor.py membaca folder
+itu dan menggambar satu layar:
+    - satu baris per tabel aktif: row / perkiraan total (COUNT awal),
+      row/s, ETA, tahap writer, error / retry (+ satu baris per rentang
+      PK jika reader paralel)
+    - baris global: total row/s semua tabel aktif
+    - ETA jalur kritis: per jadwal = sisa script yang sedang jalan +
+      median durasi script yang belum jalan (riwayat_run.py); jadwal
+      yang paling lama selesai menentukan kapan semua selesai
+Pakai (terminal kedua / tmux):
+    MIG_DASBOR=1 python 02_migrasi_all_tabel_pasang_fk.py
+    python dasbor.py                   # digambar ulang tiap MIG_DASBOR_INTERVAL
+    python dasbor.py --sekali          # cetak sekali lalu keluar
+    python dasbor.py --sampai-selesai  # keluar jika tidak ada yang jalan
+Digambar ulang dengan escape ANSI (seperti telemetri.py). Di luar
+terminal (cron / nohup / pipe) dicetak sebagai baris log biasa tiap
+MIG_PROGRESS_LOG detik.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+import riwayat_run
+from telemetri import (DASBOR, DASBOR_DIR, PROGRESS_LOG, TTY, bar,
+                       format_durasi)
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+INTERVAL = float(os.getenv("MIG_DASBOR_INTERVAL", "1"))
+
+# Tabel / jadwal yang sudah selesai tetap tampil selama ini (detik)
+SIMPAN = float(os.getenv("MIG_DASBOR_SIMPAN", "300"))
+
+# Tanpa update selama ini (detik) → dianggap berhenti (jika pid tidak bisa dicek)
+HILANG = 30
+
+IKON = {"jalan": "🔄", "selesai": "✔️", "gagal": "❌", "berhenti": "⚠"}
+
+
+def hidup(pid):
+    """True / False jika proses bisa dicek (POSIX), None jika tidak."""
+    if os.name != "posix":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# =====================================================
+# 2. DITULIS ORKESTRATOR
+# =====================================================
+def tulis_jadwal(nama, scripts, ke, mulai, lewati=(), run_id=None,
+                 status="jalan"):
+    """
+    Jadwal script satu orkestrator (ke = urutan 1.. script yang sedang
+    jalan). Dipanggil sebelum tiap script dan sekali di akhir (status
+    ok / gagal).
+    """
+    if not DASBOR:
+        return
+    path = os.path.join(DASBOR_DIR, f"jadwal_{os.getpid()}.json")
+    isi = dict(nama=nama, scripts=list(scripts), ke=ke, mulai=mulai,
+               mulai_script=time.time(), lewati=list(lewati), run_id=run_id,
+               status=status, pid=os.getpid(), ts=time.time())
+    try:
+        os.makedirs(DASBOR_DIR, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(isi, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠ Jadwal dasbor gagal ditulis: {e}")
+
+
+def bersihkan(folder=DASBOR_DIR):
+    """Hapus status proses yang sudah tidak ada (sebelum run baru)."""
+    if not DASBOR or not os.path.isdir(folder):
+        return
+    for isi, path in baca_folder(folder):
+        if hidup(isi.get("pid", 0)) is False:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# =====================================================
+# 3. BACA STATUS
+# =====================================================
+def baca_folder(folder):
+    hasil = []
+    for nama in sorted(os.listdir(folder)):
+        if not nama.endswith(".json"):
+            continue
+        path = os.path.join(folder, nama)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                hasil.append((json.load(f), path))
+        except (OSError, ValueError):
+            continue  # baru dihapus / ditimpa
+    return hasil
+
+
+def state_tabel(t, now):
+    """State tabel, 'berhenti' jika proses mati tanpa sempat lapor."""
+    if t.get("state") != "jalan":
+        return t.get("state")
+    ada = hidup(t["pid"])
+    if ada is False or (ada is None and now - t["ts"] > HILANG):
+        return "berhenti"
+    return "jalan"
+
+
+class Dasbor:
+    """Menyusun isi layar dari MIG_DASBOR_DIR (satu kali per refresh)."""
+
+    def __init__(self, folder=DASBOR_DIR):
+        self.folder = folder
+        self.durasi = {}     # run_id → {script: median detik}
+
+    def durasi_run(self, run_id):
+        if run_id not in self.durasi:
+            try:
+                self.durasi[run_id] = (riwayat_run.perkiraan_durasi(run_id)
+                                       if riwayat_run.AKTIF else {})
+            except Exception:
+                self.durasi[run_id] = {}
+        return self.durasi[run_id]
+
+    def baca(self, now):
+        tabel, jadwal = [], []
+        if not os.path.isdir(self.folder):
+            return tabel, jadwal
+        for isi, path in baca_folder(self.folder):
+            if os.path.basename(path).startswith("jadwal_"):
+                if isi["status"] == "jalan" and hidup(isi["pid"]) is False:
+                    isi["status"] = "berhenti"
+                if isi["status"] == "jalan" or now - isi["ts"] < SIMPAN:
+                    jadwal.append(isi)
+            else:
+                isi["state"] = state_tabel(isi, now)
+                if isi["state"] == "jalan" or now - isi["ts"] < SIMPAN:
+                    tabel.append(isi)
+        tabel.sort(key=lambda t: (t["state"] != "jalan", t.get("mulai") or 0))
+        return tabel, jadwal
+
+    def sisa_jadwal(self, j, tabel, now):
+        """(perkiraan detik sampai jadwal selesai, jumlah script tanpa riwayat)."""
+        durasi = self.durasi_run(j.get("run_id"))
+        scripts = j["scripts"]
+        sekarang = scripts[j["ke"] - 1]
+        lewati = set(j.get("lewati", ()))
+
+        # script yang sedang jalan: ETA tabelnya, jika tidak ada dari riwayat
+        eta = None
+        for t in tabel:
+            if (t["script"] == sekarang and t["state"] == "jalan"
+                    and (t.get("mulai") or 0) >= j["mulai_script"] - 1):
+                eta = max(eta or 0, t.get("eta") or 0)
+        if eta is None and sekarang in durasi:
+            eta = max(durasi[sekarang] - (now - j["mulai_script"]), 0)
+        tanpa = int(eta is None)
+        eta = eta or 0
+
+        # script berikutnya berurutan → semuanya di jalur kritis jadwal ini
+        for s in scripts[j["ke"]:]:
+            if s in lewati:
+                continue
+            if s in durasi:
+                eta += durasi[s]
+            else:
+                tanpa += 1
+        return eta, tanpa
+
+    def susun(self):
+        now = time.time()
+        tabel, jadwal = self.baca(now)
+
+        lines = [f"🚀 DASBOR MIGRASI — {datetime.now():%Y-%m-%d %H:%M:%S} "
+                 f"({self.folder})", ""]
+
+        aktif = [t for t in tabel if t["state"] == "jalan"]
+        if tabel:
+            lines.append(f"   {'tabel':<22} {'progres':<19} {'row / ≈total':>23} "
+                         f"{'row/s':>9} {'ETA':>8}  {'tahap':<14} err/retry")
+        for t in tabel:
+            total = t.get("total") or 0
+            eta = t.get("eta") if t["state"] == "jalan" else 0
+            lines.append(
+                f"{IKON.get(t['state'], '?')} {t['tabel'][:22]:<22} "
+                f"{bar(t['rows'], total, 10)} "
+                f"{t['rows']:>11,}/{total:<11,} {t.get('rate', 0):>9,.0f} "
+                f"{format_durasi(eta)}  {t.get('tahap', '-')[:14]:<14} "
+                f"{t.get('error', 0)}/{t.get('retry', 0)}")
+            if t["state"] == "jalan":
+                for lo, hi, n in t.get("rentang") or ():
+                    lines.append(f"     ↳ PK ({lo}, {hi}]: {n:,} row")
+        if not tabel:
+            lines.append("   (belum ada tabel berjalan)")
+
+        lines.append("")
+        lines.append(
+            f"Σ {len(aktif)} tabel aktif | "
+            f"{sum(t.get('rate', 0) for t in aktif):,.0f} row/s | "
+            f"{sum(t['rows'] for t in aktif):,} row | "
+            f"selesai {sum(t['state'] == 'selesai' for t in tabel)} | "
+            f"gagal {sum(t['state'] in ('gagal', 'berhenti') for t in tabel)} | "
+            f"error {sum(t.get('error', 0) for t in tabel)}")
+
+        kritis = None
+        for j in jadwal:
+            n = len(j["scripts"])
+            if j["status"] != "jalan":
+                lines.append(f"🗓 {j['nama']}: {j['status']} "
+                             f"({j['ke']}/{n} script, "
+                             f"{format_durasi(j['ts'] - j['mulai'])})")
+                continue
+            eta, tanpa = self.sisa_jadwal(j, tabel, now)
+            lines.append(
+                f"🗓 {j['nama']} [{j['ke']}/{n}] {j['scripts'][j['ke'] - 1]} "
+                f"({format_durasi(now - j['mulai_script'])}) | sisa ≈ "
+                f"{format_durasi(eta)}"
+                + (f" + {tanpa} script tanpa riwayat" if tanpa else ""))
+            if kritis is None or eta > kritis[0]:
+                kritis = (eta, j["nama"])
+        if kritis is None and aktif:
+            t = max(aktif, key=lambda t: t.get("eta") or 0)
+            kritis = (t.get("eta") or 0, t["tabel"])
+        if kritis is not None:
+            selesai = datetime.fromtimestamp(now + kritis[0])
+            lines.append(f"🏁 ETA jalur kritis: {format_durasi(kritis[0])} "
+                         f"→ ± {selesai:%H:%M} ({kritis[1]})")
+
+        berjalan = bool(aktif) or any(j["status"] == "jalan" for j in jadwal)
+        if TTY:
+            lebar = shutil.get_terminal_size((120, 40)).columns
+            lines = [l[:lebar - 1] for l in lines]   # satu baris layar per baris
+        return lines, berjalan
+
+
+# =====================================================
+# 4. MAIN
+# =====================================================
+def tampil(dasbor, sekali=False, sampai_selesai=False):
+    ulang = TTY and not sekali
+    if ulang:
+        # layar alternatif + sembunyikan kursor, dikembalikan saat keluar
+        sys.stdout.write("\x1b[?1049h\x1b[?25l")
+    try:
+        while True:
+            lines, berjalan = dasbor.susun()
+            if ulang:
+                sys.stdout.write("\x1b[H" + "\n".join(
+                    l + "\x1b[K" for l in lines) + "\x1b[J")
+            else:
+                sys.stdout.write("\n".join(lines) + "\n\n")
+            sys.stdout.flush()
+            if sekali or (sampai_selesai and not berjalan):
+                break
+            time.sleep(INTERVAL if ulang else PROGRESS_LOG)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if ulang:
+            sys.stdout.write("\x1b[?25h\x1b[?1049l")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dasbor migrasi (terminal)")
+    parser.add_argument("--dir", default=DASBOR_DIR)
+    parser.add_argument("--sekali", action="store_true",
+                        help="cetak sekali lalu keluar")
+    parser.add_argument("--sampai-selesai", action="store_true",
+                        help="keluar jika tidak ada tabel / jadwal berjalan")
+    args = parser.parse_args()
+
+    if not DASBOR:
+        print("⚠ MIG_DASBOR belum =1: script migrasi tidak menulis status "
+              f"ke {args.dir}")
+    tampil(Dasbor(args.dir), args.sekali, args.sampai_selesai)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Deteksi perubahan per row untuk sync ulang (SPEC "hash_row": True)
+Tujuan: rerun tabel yang sebagian besar sudah ada di target hanya
+menulis row baru / berubah, bukan menimpa semuanya.
+    - Hash 8 byte (blake2b) per row target hasil transform
+    - Disimpan lokal per tabel: PK di array('q') + hash di array('Q'),
+      urut PK (±16 byte per row) → file hash_row/<db>__<tabel>.pkl
+    - Row dalam satu batch urut PK → pencocokan = bisect awal batch lalu
+      jalan maju (merge), tanpa dict besar; batch antar reader paralel
+      boleh datang tidak urut
+    - Cache hanya dipercaya jika sidik target masih sama dengan saat
+      cache disimpan: jumlah row + UPDATE_TIME information_schema
+      (default), atau CHECKSUM TABLE (MIG_HASH_SIDIK=checksum, scan penuh
+      di server tapi pasti); beda → tulis penuh
+Batas mode UPDATE_TIME: resolusi 1 detik, dan NULL setelah server
+restart / di engine yang tidak mencatatnya (mis. InnoDB MariaDB) → cache
+tidak dipercaya (tulis penuh). Pakai checksum jika target bisa diubah
+orang lain dan UPDATE_TIME tidak tersedia.
+Syarat: PK integer dan mode_tulis "upsert" (row berubah ditimpa).
+"""
+
+import os
+import pickle
+import hashlib
+from array import array
+from bisect import bisect_left
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HASH_DIR = os.getenv("MIG_HASH_DIR", os.path.join(BASE_DIR, "hash_row"))
+
+# Sidik target: "update_time" (murah) atau "checksum" (CHECKSUM TABLE)
+SIDIK = os.getenv("MIG_HASH_SIDIK", "update_time")
+
+
+def hash_row(row):
+    """Hash 8 byte stabil antar proses (hash() bawaan Python di-salt)."""
+    return int.from_bytes(
+        hashlib.blake2b(repr(row).encode(), digest_size=8).digest(), "little")
+
+
+def path_cache(database, tabel):
+    return os.path.join(HASH_DIR, f"{database}__{tabel}.pkl")
+
+
+def sidik_target(conn, tabel):
+    """
+    Sidik tabel target (SQLAlchemy Connection) untuk validasi cache:
+    [jumlah row, jenis, nilai], atau None jika tidak bisa dipastikan.
+    """
+    n = conn.exec_driver_sql(f"SELECT COUNT(*) FROM `{tabel}`").scalar()
+    if SIDIK == "checksum":
+        row = conn.exec_driver_sql(f"CHECKSUM TABLE `{tabel}`").fetchone()
+        if row is None or row[1] is None:
+            return None
+        return [n, "checksum", int(row[1])]
+
+    try:
+        # MySQL 8 menyimpan statistik information_schema s/d 24 jam
+        conn.exec_driver_sql("SET SESSION information_schema_stats_expiry = 0")
+    except Exception:
+        pass     # MariaDB / MySQL 5.7: tidak ada cache statistik
+    waktu = conn.exec_driver_sql(
+        "SELECT UPDATE_TIME FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        (tabel,)).scalar()
+    if waktu is None:
+        return None
+    return [n, "update_time", str(waktu)]
+
+
+# =====================================================
+# 2. CACHE HASH
+# =====================================================
+class CacheHash:
+    """
+    Cache hash satu tabel target.
+    `kunci` = ringkasan konfigurasi (host, kolom, passthrough, ...);
+    jika berubah, cache lama dianggap tidak berlaku.
+    """
+
+    def __init__(self, path, kunci, pk_idx, lama_pk=None, lama_hash=None):
+        self.path = path
+        self.kunci = kunci
+        self.pk_idx = pk_idx
+        self.lama_pk = lama_pk if lama_pk is not None else array("q")
+        self.lama_hash = lama_hash if lama_hash is not None else array("Q")
+        self.baru = []          # (pk pertama, array pk, array hash) per batch
+        self.cocok = 0
+        self.sama = 0
+        self.hilang = 0
+
+    @classmethod
+    def muat(cls, path, kunci, pk_idx, sidik):
+        """
+        Cache dari file, atau cache kosong (tulis penuh) jika file tidak
+        ada, kunci beda, atau sidik target (sidik_target) tidak cocok.
+        Hasil: (cache, alasan_kosong / None).
+        """
+        if not os.path.exists(path):
+            return cls(path, kunci, pk_idx), "cache belum ada"
+
+        with open(path, "rb") as f:
+            isi = pickle.load(f)
+
+        if isi["kunci"] != kunci:
+            return cls(path, kunci, pk_idx), "konfigurasi kolom berubah"
+        if sidik is None or isi.get("sidik") is None:
+            return cls(path, kunci, pk_idx), (
+                f"sidik target ({SIDIK}) tidak tersedia")
+        if isi["sidik"] != sidik:
+            return cls(path, kunci, pk_idx), (
+                f"target berubah sejak cache disimpan "
+                f"({sidik} ≠ {isi['sidik']})")
+
+        return cls(path, kunci, pk_idx, isi["pk"], isi["hash"]), None
+
+    def __len__(self):
+        return len(self.lama_pk)
+
+    def saring(self, rows):
+        """
+        Row target satu batch (urut PK) → list row yang baru / berubah
+        saja. Hash semua row dicatat untuk cache berikutnya.
+        """
+        if not rows:
+            return []
+        pk_idx = self.pk_idx
+        lama_pk = self.lama_pk
+        lama_hash = self.lama_hash
+        n = len(lama_pk)
+        i = bisect_left(lama_pk, rows[0][pk_idx])
+        baru_pk = array("q")
+        baru_hash = array("Q")
+
+        hasil = []
+        for row in rows:
+            pk = row[pk_idx]
+            # PK di cache yang terlewati = sudah tidak ada di source
+            while i < n and lama_pk[i] < pk:
+                i += 1
+
+            h = hash_row(row)
+            baru_pk.append(pk)
+            baru_hash.append(h)
+
+            if i < n and lama_pk[i] == pk:
+                i += 1
+                self.cocok += 1
+                if lama_hash[i - 1] == h:
+                    self.sama += 1
+                    continue
+            hasil.append(row)
+
+        self.baru.append((baru_pk[0], baru_pk, baru_hash))
+        return hasil
+
+    def simpan(self, sidik):
+        """Tulis cache baru (atomik). Dipanggil hanya jika migrasi sukses."""
+        self.hilang = len(self.lama_pk) - self.cocok
+
+        pk_semua = array("q")
+        hash_semua = array("Q")
+        for _, pk, h in sorted(self.baru, key=lambda b: b[0]):
+            pk_semua.extend(pk)
+            hash_semua.extend(h)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({
+                "kunci": self.kunci,
+                "sidik": sidik,
+                "pk": pk_semua,
+                "hash": hash_semua,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
@@ -11,11 +11,12 @@ Aturan:
 """
 
 import os
-import sys
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from datetime import datetime
-import math
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 # ==============================================================
 # 1. Load ENV
@@ -34,7 +35,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -123,19 +125,7 @@ INSERT INTO kode_lab_detail (
 
 
 # ==============================================================
-# 5. Progress Bar
-# ==============================================================
-def progress_bar(cur, total):
-    bar_len = 40
-    fill = int(bar_len * cur / total) if total else bar_len
-    bar = "█" * fill + "-" * (bar_len - fill)
-    pct = (cur / total * 100) if total else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {pct:5.1f}%")
-    sys.stdout.flush()
-
-
-# ==============================================================
-# 6. Batch Loop
+# 5. Batch Loop
 # ==============================================================
 offset = 0
 inserted = 0
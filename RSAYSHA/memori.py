@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pantau memori per tabel + budget memori (VM kecil di RS)
+    - RSS proses utama (+ worker MIG_WORKERS) disampel tiap
+      MIG_MEM_INTERVAL detik; puncak dicatat per stage writer saat itu
+      (baca+transform / hash / tulis / commit) dan per tabel
+    - MIG_TRACEMALLOC=1 (mahal, untuk analisis): tracemalloc aktif,
+      snapshot diambil setiap memori Python naik ke puncak baru
+      (> 10%), alokasi dikelompokkan ke stage pipeline (fungsi engine
+      di traceback) + lokasi alokasi terbesar
+    - MIG_MEM_BUDGET_MB (0 = tanpa budget): jika RSS ≥ 90% budget,
+      engine MENYESUAIKAN diri, tidak mati kena OOM:
+        1. gc + kembalikan memori bebas ke OS (malloc_trim)
+        2. kedalaman antrean prefetch dipotong setengah (min 1)
+        3. batch size reader dipotong setengah (min MIG_MEM_BATCH_MIN)
+      tiap langkah diberi jeda MIG_MEM_JEDA detik untuk melihat efeknya;
+      ukuran yang sudah dikecilkan tidak dinaikkan lagi untuk tabel itu
+Antrean transform pool (MIG_WORKERS > 1) tidak ikut dikecilkan.
+"""
+
+import os
+import gc
+import time
+import ctypes
+import inspect
+import threading
+import tracemalloc
+
+from dotenv import load_dotenv
+
+from telemetri import format_byte
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+INTERVAL = float(os.getenv("MIG_MEM_INTERVAL", "1"))
+BUDGET = int(float(os.getenv("MIG_MEM_BUDGET_MB", "0")) * 1024 * 1024)
+BATCH_MIN = int(os.getenv("MIG_MEM_BATCH_MIN", "500"))
+JEDA = float(os.getenv("MIG_MEM_JEDA", "5"))
+
+TRACEMALLOC = os.getenv("MIG_TRACEMALLOC", "0") == "1"
+TRACEMALLOC_FRAME = int(os.getenv("MIG_TRACEMALLOC_FRAME", "10"))
+
+# Batas lunak: mulai menyesuaikan di persentase budget ini
+AMBANG_BUDGET = 0.9
+
+HALAMAN = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss(pid="self"):
+    """RSS (byte) dari /proc, atau None jika tidak tersedia (bukan Linux)."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * HALAMAN
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def malloc_trim():
+    """Kembalikan arena bebas glibc ke OS (diam-diam diabaikan jika tidak ada)."""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def rentang_fungsi(fn):
+    """(file, baris awal, baris akhir) sebuah fungsi untuk klasifikasi traceback."""
+    fn = inspect.unwrap(fn)
+    baris, awal = inspect.getsourcelines(fn)
+    return os.path.abspath(fn.__code__.co_filename), awal, awal + len(baris) - 1
+
+
+# =====================================================
+# 2. PEMANTAU MEMORI
+# =====================================================
+class Memori:
+    """
+    Satu pemantau per tabel.
+        telemetri    : sumber antrean prefetch + stat reader (batch_size)
+        stage_fungsi : {stage: [fungsi]} untuk klasifikasi tracemalloc
+        pool         : multiprocessing.Pool (RSS worker ikut dihitung)
+    Stage writer dibaca dari telemetri.tahap (diisi engine tiap langkah).
+    """
+
+    def __init__(self, tabel, telemetri, batch_size, stage_fungsi=None,
+                 pool=None):
+        self.tabel = tabel
+        self.telemetri = telemetri
+        self.pool = pool
+        self.batch_size = batch_size
+        self.rss_awal = rss()
+        self.aktif = self.rss_awal is not None
+        self.puncak = 0
+        self.puncak_worker = 0
+        self.puncak_stage = {}
+        self.rss_terakhir = self.rss_awal or 0
+        self.penyesuaian = []
+        self.jeda_sampai = 0.0
+        self.mentok = False
+        self.trace_puncak = 0
+        self.trace_stage = {}
+        self.trace_lokasi = []
+        self.rentang = []
+        if TRACEMALLOC and stage_fungsi:
+            for stage, fungsi in stage_fungsi.items():
+                for fn in fungsi:
+                    self.rentang.append((stage,) + rentang_fungsi(fn))
+        self.berhenti = threading.Event()
+        self.thread = None
+        self.trace_milik = False
+
+    def keterangan(self):
+        if not self.aktif:
+            return "OFF (/proc tidak tersedia)"
+        bagian = [f"RSS awal {format_byte(self.rss_awal)}"]
+        if BUDGET:
+            bagian.append(f"budget {format_byte(BUDGET)}")
+        if TRACEMALLOC:
+            bagian.append(f"tracemalloc {TRACEMALLOC_FRAME} frame")
+        return ", ".join(bagian)
+
+    # ---------- siklus ----------
+    def mulai(self):
+        if not self.aktif:
+            return self
+        if TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAME)
+            self.trace_milik = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def selesai(self):
+        """Sampel terakhir, hentikan tracemalloc. Aman dipanggil berulang."""
+        if self.thread is None:
+            return
+        self.berhenti.set()
+        self.thread.join()
+        self.thread = None
+        self.sampel()
+        if self.trace_milik:
+            tracemalloc.stop()
+            self.trace_milik = False
+        self.telemetri.memori = self.ringkasan()
+
+    def _loop(self):
+        while not self.berhenti.wait(INTERVAL):
+            self.sampel()
+
+    # ---------- sampel ----------
+    def rss_worker(self):
+        if self.pool is None:
+            return 0
+        total = 0
+        for p in getattr(self.pool, "_pool", ()):
+            total += rss(p.pid) or 0
+        return total
+
+    def sampel(self):
+        utama = rss()
+        if utama is None:
+            return
+        worker = self.rss_worker()
+        self.rss_terakhir = utama + worker
+        self.telemetri.rss = self.rss_terakhir
+        self.puncak = max(self.puncak, utama)
+        self.puncak_worker = max(self.puncak_worker, worker)
+        stage = self.telemetri.tahap
+        self.puncak_stage[stage] = max(self.puncak_stage.get(stage, 0), utama)
+
+        if self.trace_milik:
+            sekarang, _ = tracemalloc.get_traced_memory()
+            if sekarang > self.trace_puncak * 1.1:
+                self.snapshot(sekarang)
+
+        if BUDGET:
+            self.periksa_budget(self.rss_terakhir)
+
+    def snapshot(self, sekarang):
+        """Kelompokkan alokasi hidup saat ini per stage + lokasi terbesar."""
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        per_stage = {}
+        for stat in snap.statistics("traceback"):
+            stage = self.klasifikasi(stat.traceback)
+            per_stage[stage] = per_stage.get(stage, 0) + stat.size
+        self.trace_puncak = sekarang
+        self.trace_stage = per_stage
+        self.trace_lokasi = [
+            (f"{os.path.basename(s.traceback[0].filename)}:"
+             f"{s.traceback[0].lineno}", s.size)
+            for s in snap.statistics("lineno")[:5]
+        ]
+
+    def klasifikasi(self, traceback):
+        # dari frame terdalam ke luar: fungsi engine pertama yang cocok
+        for frame in reversed(traceback):
+            for stage, file, awal, akhir in self.rentang:
+                if frame.filename == file and awal <= frame.lineno <= akhir:
+                    return stage
+        return "lain"
+
+    # ---------- budget ----------
+    def periksa_budget(self, terpakai):
+        now = time.monotonic()
+        if terpakai < BUDGET * AMBANG_BUDGET or now < self.jeda_sampai:
+            return
+        self.jeda_sampai = now + JEDA
+
+        gc.collect()
+        malloc_trim()
+        terpakai = (rss() or 0) + self.rss_worker()
+        if terpakai < BUDGET * AMBANG_BUDGET:
+            self.catat("gc + malloc_trim", terpakai)
+            return
+
+        antrean = self.telemetri.antrean
+        if antrean is not None and antrean.maxsize > 1:
+            with antrean.mutex:
+                antrean.maxsize = max(antrean.maxsize // 2, 1)
+            self.catat(f"antrean prefetch → {antrean.maxsize}", terpakai)
+            return
+
+        if self.batch_size > BATCH_MIN:
+            self.batch_size = max(self.batch_size // 2, BATCH_MIN)
+            for stat in list(self.telemetri.reader.values()):
+                stat["batch_size"] = self.batch_size
+            self.catat(f"batch size → {self.batch_size:,}", terpakai)
+            return
+
+        if not self.mentok:
+            self.mentok = True
+            self.catat("sudah minimum, tidak bisa dikecilkan lagi", terpakai)
+
+    def catat(self, aksi, terpakai):
+        self.penyesuaian.append((aksi, terpakai))
+        self.telemetri.event("memori", aksi=aksi, rss=terpakai, budget=BUDGET)
+        print(f"\n⚠ Memori {format_byte(terpakai)} ≥ "
+              f"{AMBANG_BUDGET:.0%} budget {format_byte(BUDGET)}: {aksi}")
+
+    # ---------- laporan ----------
+    def ringkasan(self):
+        return {
+            "rss_awal": self.rss_awal,
+            "rss_puncak": self.puncak,
+            "rss_puncak_worker": self.puncak_worker,
+            "rss_puncak_stage": dict(self.puncak_stage),
+            "tracemalloc_stage": dict(self.trace_stage),
+            "batch_size_akhir": self.batch_size,
+            "penyesuaian": [a for a, _ in self.penyesuaian],
+        }
+
+    def laporan(self):
+        if not self.aktif or not self.puncak:
+            return []
+        hasil = [
+            f"🧠 Memori: puncak RSS {format_byte(self.puncak)} "
+            f"(awal {format_byte(self.rss_awal)})"
+            + (f" + worker {format_byte(self.puncak_worker)}"
+               if self.puncak_worker else "")
+        ]
+        hasil.append("   puncak per stage writer: " + " | ".join(
+            f"{s} {format_byte(b)}" for s, b in self.puncak_stage.items()))
+        if self.trace_stage:
+            hasil.append(
+                f"   tracemalloc di puncak ({format_byte(self.trace_puncak)}): "
+                + " | ".join(f"{s} {format_byte(b)}" for s, b in sorted(
+                    self.trace_stage.items(), key=lambda x: -x[1])))
+            for lokasi, b in self.trace_lokasi:
+                hasil.append(f"     {lokasi:<36} {format_byte(b):>12}")
+        for aksi, terpakai in self.penyesuaian:
+            hasil.append(f"   ⚠ budget: {aksi} (RSS {format_byte(terpakai)})")
+        return hasil
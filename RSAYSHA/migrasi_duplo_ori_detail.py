@@ -14,7 +14,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 
 # =====================================================
@@ -44,7 +46,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -123,19 +126,7 @@ INSERT INTO duplo_ori_detail (
 
 
 # =====================================================
-# 6. Progress Bar
-# =====================================================
-def progress_bar(cur, total):
-    bar_len = 40
-    fill = int(bar_len * cur / total) if total else bar_len
-    bar = "█" * fill + "-" * (bar_len - fill)
-    percent = (cur / total * 100) if total else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# =====================================================
-# 7. MIGRASI
+# 6. MIGRASI
 # =====================================================
 offset = 0
 total_inserted = 0
@@ -170,7 +161,7 @@ print()
 
 
 # =====================================================
-# 8. FINISH
+# 7. FINISH
 # =====================================================
 print("\n🎉 MIGRASI duplo_ori_detail SELESAI!")
 print(f"✔ Total baris berhasil dimigrasikan: {total_inserted}")
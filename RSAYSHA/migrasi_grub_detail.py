@@ -13,7 +13,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 
 # === [1] Load ENV ===
@@ -40,7 +42,8 @@ target_config = {
 # === [3] Create engine ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -97,17 +100,7 @@ INSERT INTO grub_detail (
 """
 
 
-# === [7] Progress bar ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total else bar_len
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [8] MIGRATION ===
+# === [7] MIGRATION ===
 offset = 0
 total_inserted = 0
 
@@ -139,7 +132,7 @@ while True:
 print()
 
 
-# === [9] DONE ===
+# === [8] DONE ===
 print("\n🎉 MIGRASI grub_detail SELESAI!")
 print(f"✔ Total baris dimigrasikan: {total_inserted}")
 print("⏱ Waktu selesai =", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -13,7 +13,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 
 # === [1] LOAD .env ===
@@ -41,7 +43,8 @@ target_config = {
 # === [3] ENGINE Helper ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -100,17 +103,7 @@ INSERT INTO jenis_pemeriksaan (
 """
 
 
-# === [7] Progress bar helper ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total > 0 else 0
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total > 0 else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [8] MIGRASI PER BATCH ===
+# === [7] MIGRASI PER BATCH ===
 offset = 0
 total_inserted = 0
 
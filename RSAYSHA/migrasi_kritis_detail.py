@@ -10,12 +10,13 @@ ID dari source dibawa ke target (tidak auto increment).
 """
 
 import os
-import sys
-import math
 from datetime import datetime
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
+
 # =====================================================
 # 1. Load ENV
 # =====================================================
@@ -39,7 +40,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -126,22 +128,9 @@ INSERT INTO kritis_detail (
 )
 """
 
-# =====================================================
-# 5. Progress bar
-# =====================================================
-
-
-def progress_bar(cur, total):
-    bar_len = 40
-    fill = int(bar_len * cur / total)
-    bar = "█" * fill + "-" * (bar_len - fill)
-    percent = (cur / total * 100)
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
 
 # =====================================================
-# 6. Proses migrasi
+# 5. Proses migrasi
 # =====================================================
 offset = 0
 inserted = 0
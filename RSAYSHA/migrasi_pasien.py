@@ -4,177 +4,42 @@
 """
 Migrasi tabel: pasien (source → target)
 Fitur:
-    - Batch processing (default 10.000 dari .env)
-    - Progress bar
+    - Batch processing + progress bar lewat engine_migrasi (default 10.000 dari .env)
     - Struktur kedua tabel sama persis
 """
 
-from sqlalchemy import create_engine, text
-from datetime import datetime
-from dotenv import load_dotenv
-import os
-import sys
-
-
-# === [1] Load .env ===
-load_dotenv()
-
-BATCH_SIZE = int(os.getenv("MIG_BATCH_SIZE", "10000"))
-
-
-# === [2] Konfigurasi DB dari ENV ===
-source_config = {
-    'host': os.getenv('SRC_HOST'),
-    'user': os.getenv('SRC_USER'),
-    'password': os.getenv('SRC_PASSWORD'),
-    'database': os.getenv('SRC_DATABASE'),
+from engine_migrasi import jalankan_migrasi
+
+# === [1] KOLOM (source = target) ===
+KOLOM = [
+    "id_pasien",
+    "kode_rm",
+    "nik",
+    "nama",
+    "tempat_lahir",
+    "tgl_lahir",
+    "jenis_kelamin",
+    "alamat",
+    "alamat2",
+    "alamat3",
+    "alamat4",
+    "no_hp",
+    "email",
+    "kode_his",
+    "created_at",
+    "updated_at",
+]
+
+SPEC = {
+    "tabel": "pasien",
+    "pk": "id_pasien",
+    "kolom_sumber": KOLOM,
+    "kolom_target": KOLOM,
+    "mode_tulis": "upsert",    # rerun cukup menimpa, tanpa TRUNCATE
+    "kolom_kamus": ["jenis_kelamin"],
 }
 
-target_config = {
-    'host': os.getenv('TGT_HOST'),
-    'user': os.getenv('TGT_USER'),
-    'password': os.getenv('TGT_PASSWORD'),
-    'database': os.getenv('TGT_DATABASE'),
-}
-
-
-# === [3] Engine helper ===
-def make_engine(cfg):
-    return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
-    )
-
-
-src = make_engine(source_config)
-tgt = make_engine(target_config)
-
-
-print("===================================================")
-print("🚀 MIGRASI TABEL pasien (BATCH + PROGRESS BAR)")
-print("===================================================\n")
-
-print(f"📌 SOURCE DB : {source_config['database']}")
-print(f"📌 TARGET DB : {target_config['database']}")
-print(f"📌 Batch size: {BATCH_SIZE}\n")
-
-
-# === [4] Hitung total row ===
-with src.connect() as conn:
-    total_rows = conn.execute(text("SELECT COUNT(*) FROM pasien")).scalar()
-
-print(f"📌 Total data di SOURCE: {total_rows}\n")
-
-
-# === [5] Query SELECT batch ===
-SELECT_BATCH = f"""
-SELECT
-    id_pasien,
-    kode_rm,
-    nik,
-    nama,
-    tempat_lahir,
-    tgl_lahir,
-    jenis_kelamin,
-    alamat,
-    alamat2,
-    alamat3,
-    alamat4,
-    no_hp,
-    email,
-    kode_his,
-    created_at,
-    updated_at
-FROM pasien
-ORDER BY id_pasien
-LIMIT {BATCH_SIZE} OFFSET :offset;
-"""
-
-
-# === [6] Query INSERT ===
-INSERT_SQL = """
-INSERT INTO pasien (
-    id_pasien,
-    kode_rm,
-    nik,
-    nama,
-    tempat_lahir,
-    tgl_lahir,
-    jenis_kelamin,
-    alamat,
-    alamat2,
-    alamat3,
-    alamat4,
-    no_hp,
-    email,
-    kode_his,
-    created_at,
-    updated_at
-) VALUES (
-    :id_pasien,
-    :kode_rm,
-    :nik,
-    :nama,
-    :tempat_lahir,
-    :tgl_lahir,
-    :jenis_kelamin,
-    :alamat,
-    :alamat2,
-    :alamat3,
-    :alamat4,
-    :no_hp,
-    :email,
-    :kode_his,
-    :created_at,
-    :updated_at
-)
-"""
-
-
-# === [7] Progress bar ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total > 0 else 0
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total > 0 else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [8] Migrasi per batch ===
-offset = 0
-total_inserted = 0
-
-while True:
-
-    # ambil batch
-    with src.connect() as conn:
-        rows = conn.execute(text(SELECT_BATCH), {"offset": offset}).fetchall()
-
-    if not rows:
-        break
-
-    # insert batch
-    with tgt.connect() as conn:
-        trans = conn.begin()
-        try:
-            for row in rows:
-                conn.execute(text(INSERT_SQL), dict(row._mapping))
-            trans.commit()
-        except Exception as e:
-            trans.rollback()
-            print("\n❌ ERROR batch, rollback dilakukan!")
-            print("Error:", e)
-            exit(1)
-
-    total_inserted += len(rows)
-    offset += BATCH_SIZE
-
-    progress_bar(total_inserted, total_rows)
-
-print()  # newline
-
 
-print("\n🎉 MIGRASI SELESAI!")
-print(f"✔ Total pasien berhasil dimigrasikan: {total_inserted}")
-print("⏱ Waktu selesai =", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-print("===================================================\n")
+# === [2] MIGRASI ===
+if __name__ == "__main__":
+    jalankan_migrasi(SPEC)
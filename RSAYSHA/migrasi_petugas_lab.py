@@ -13,7 +13,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 
 # === [1] Load .env ===
@@ -41,7 +43,8 @@ target_config = {
 # === [3] Engine helper ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -95,17 +98,7 @@ INSERT INTO petugas_lab (
 """
 
 
-# === [7] Progress bar ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total > 0 else 0
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total > 0 else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [8] Migrasi per batch ===
+# === [7] Migrasi per batch ===
 offset = 0
 total_inserted = 0
 
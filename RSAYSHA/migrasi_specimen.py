@@ -13,7 +13,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 
 # === [1] Load ENV ===
@@ -41,7 +43,8 @@ target_config = {
 # === [3] Engine builder ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -97,17 +100,7 @@ INSERT INTO specimen (
 """
 
 
-# === [7] Progress bar ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total > 0 else 40
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total > 0 else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [8] MIGRASI BATCH ===
+# === [7] MIGRASI BATCH ===
 offset = 0
 total_inserted = 0
 
@@ -139,7 +132,7 @@ while True:
 print()
 
 
-# === [9] Selesai ===
+# === [8] Selesai ===
 print("\n🎉 MIGRASI specimen SELESAI!")
 print(f"✔ Total baris dimigrasikan: {total_inserted}")
 print("⏱ Waktu selesai =", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
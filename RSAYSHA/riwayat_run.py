@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Riwayat run migrasi (SQLite lokal) + deteksi tabel yang makin lambat
+Yang dicatat (riwayat_run.sqlite, aktif default, MIG_RIWAYAT=0 mematikan):
+    - run   : satu baris per eksekusi 02_migrasi_all_tabel_pasang_fk.py
+              (atau per script yang dijalankan sendiri), berikut semua
+              setting MIG_* saat itu (batch size, mode, workers, ...)
+    - script: satu baris per script dalam run
+        * orkestrator : durasi script (detik_script) + status
+        * engine      : row, row ditulis, byte, durasi transfer, row/s,
+                        total + p50/p95/p99 tiap stage (telemetri.py)
+      Script lama yang belum memakai engine_migrasi hanya punya baris
+      orkestrator (catat_script: durasi + status) → laporan hanya bisa
+      membandingkan durasinya, bukan row / byte / stage.
+Laporan:
+    python riwayat_run.py daftar                 # run terakhir
+    python riwayat_run.py laporan                # run terakhir vs baseline
+    python riwayat_run.py laporan 12 --baseline 9 --ambang 15
+Baseline per script = median durasi di MIG_RIWAYAT_BASELINE_N run sukses
+sebelumnya (db source → target sama). Script yang lebih lambat dari
+baseline lebih dari MIG_RIWAYAT_AMBANG % ditandai; exit code 2 jika ada
+(bisa dipakai untuk cek otomatis setelah script diubah).
+Total durasi per run juga dipakai untuk perkiraan jendela cutover.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import statistics
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+AKTIF = os.getenv("MIG_RIWAYAT", "1") == "1"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILE_RIWAYAT = os.getenv("MIG_RIWAYAT_DB",
+                         os.path.join(BASE_DIR, "riwayat_run.sqlite"))
+
+# Lebih lambat dari baseline lebih dari ini (%) → regresi
+AMBANG = float(os.getenv("MIG_RIWAYAT_AMBANG", "20"))
+
+# Jumlah run sebelumnya yang di-median-kan sebagai baseline
+BASELINE_N = int(os.getenv("MIG_RIWAYAT_BASELINE_N", "3"))
+
+# Script di bawah durasi ini (detik) tidak dinilai (noise koneksi dll.)
+MIN_DETIK = float(os.getenv("MIG_RIWAYAT_MIN_DETIK", "2"))
+
+# Diisi orkestrator → script anak mencatat ke run yang sama
+ENV_RUN_ID = "MIG_RUN_ID"
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    db       TEXT NOT NULL,
+    mulai    TEXT NOT NULL,
+    selesai  TEXT,
+    status   TEXT NOT NULL DEFAULT 'jalan',
+    setting  TEXT NOT NULL,
+    catatan  TEXT
+);
+CREATE TABLE IF NOT EXISTS script (
+    run_id       INTEGER NOT NULL REFERENCES run(id),
+    script       TEXT NOT NULL,
+    tabel        TEXT,
+    mulai        TEXT,
+    status       TEXT,
+    detik_script REAL,
+    detik        REAL,
+    rows         INTEGER,
+    ditulis      INTEGER,
+    bytes        INTEGER,
+    row_per_s    REAL,
+    detail       TEXT,
+    PRIMARY KEY (run_id, script)
+);
+"""
+
+
+def kunci_db():
+    return (f"{os.getenv('SRC_HOST')}/{os.getenv('SRC_DATABASE')} → "
+            f"{os.getenv('TGT_HOST')}/{os.getenv('TGT_DATABASE')}")
+
+
+def setting_run():
+    """Semua setting MIG_* yang berlaku (nilai default tidak ikut)."""
+    return {k: v for k, v in sorted(os.environ.items())
+            if k.startswith("MIG_") and k != ENV_RUN_ID}
+
+
+def buka():
+    conn = sqlite3.connect(FILE_RIWAYAT, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SKEMA)
+    return conn
+
+
+# =====================================================
+# 2. CATAT
+# =====================================================
+def mulai_run(catatan=None):
+    """Buat run baru; id diwariskan ke script anak lewat env MIG_RUN_ID."""
+    with buka() as conn:
+        run_id = conn.execute(
+            "INSERT INTO run (db, mulai, setting, catatan) VALUES (?, ?, ?, ?)",
+            (kunci_db(), datetime.now().isoformat(timespec="seconds"),
+             json.dumps(setting_run()), catatan)).lastrowid
+    conn.close()
+    os.environ[ENV_RUN_ID] = str(run_id)
+    return run_id
+
+
+def selesai_run(run_id, status):
+    with buka() as conn:
+        conn.execute(
+            "UPDATE run SET selesai = ?, status = ? WHERE id = ?",
+            (datetime.now().isoformat(timespec="seconds"), status, run_id))
+    conn.close()
+
+
+def catat_script(run_id, script, **nilai):
+    """
+    Isi / lengkapi baris satu script. Kolom yang None tidak menimpa
+    nilai yang sudah dicatat pihak lain (engine vs orkestrator).
+    """
+    if nilai.get("detail") is not None:
+        nilai["detail"] = json.dumps(nilai["detail"], default=str)
+    kolom = ["run_id", "script"] + list(nilai)
+    update = ", ".join(f"{k} = COALESCE(excluded.{k}, {k})" for k in nilai)
+    with buka() as conn:
+        conn.execute(
+            f"INSERT INTO script ({', '.join(kolom)}) "
+            f"VALUES ({', '.join('?' * len(kolom))}) "
+            f"ON CONFLICT (run_id, script) DO UPDATE SET {update}",
+            (run_id, script, *nilai.values()))
+    conn.close()
+
+
+def catat_engine(tabel, ringkas, info):
+    """
+    Dipanggil engine_migrasi setelah satu tabel selesai. Tanpa
+    orkestrator (MIG_RUN_ID kosong) → satu run 'tunggal' untuk script ini.
+    """
+    tunggal = not os.getenv(ENV_RUN_ID)
+    run_id = mulai_run(catatan="tunggal") if tunggal else int(os.environ[ENV_RUN_ID])
+
+    detik = ringkas["detik"]
+    stage = {k: v for k, v in ringkas.items() if k.endswith("_ms")}
+    catat_script(
+        run_id, os.path.basename(sys.argv[0]),
+        tabel=tabel,
+        status="ok",
+        detik=detik,
+        rows=ringkas["rows"],
+        ditulis=ringkas["ditulis"],
+        bytes=ringkas["bytes"],
+        row_per_s=round(ringkas["rows"] / detik, 1) if detik else None,
+        detail={"info": info, "batch": ringkas["batch"],
+                "retry": ringkas.get("retry"), "stage": stage,
+                "persentil": ringkas["persentil"],
+                "bytes_tulis": ringkas["bytes_tulis"],
+                "bytes_kolom": ringkas["bytes_kolom"],
+                "server": ringkas.get("server"),
+                "memori": ringkas.get("memori")},
+    )
+    if tunggal:
+        selesai_run(run_id, "ok")
+
+
+# =====================================================
+# 3. BASELINE + LAPORAN
+# =====================================================
+def durasi(row):
+    """Durasi pembanding: waktu script penuh jika ada, jika tidak waktu transfer."""
+    return row["detik_script"] if row["detik_script"] is not None else row["detik"]
+
+
+def run_terakhir(conn):
+    row = conn.execute("SELECT MAX(id) FROM run").fetchone()
+    return row[0]
+
+
+def baseline(conn, run, baseline_id=None, n=BASELINE_N):
+    """
+    {script: (median durasi, list run_id)} dari run sukses sebelumnya
+    dengan db yang sama (atau satu run tertentu jika baseline_id).
+    Run 'tunggal' hanya dibandingkan dengan run 'tunggal' (durasinya
+    waktu transfer engine, bukan waktu script penuh).
+    """
+    if baseline_id is not None:
+        run_ids = [baseline_id]
+    else:
+        run_ids = [r[0] for r in conn.execute(
+            "SELECT id FROM run WHERE id < ? AND db = ? AND status = 'ok' "
+            "AND (COALESCE(catatan, '') = 'tunggal') = ? ORDER BY id DESC",
+            (run["id"], run["db"], run["catatan"] == "tunggal"))]
+
+    per_script = {}
+    for run_id in run_ids:
+        for row in conn.execute(
+                "SELECT * FROM script WHERE run_id = ? AND status = 'ok'",
+                (run_id,)):
+            lama = per_script.setdefault(row["script"], [])
+            if len(lama) < n and durasi(row) is not None:
+                lama.append((durasi(row), run_id))
+
+    return {s: (statistics.median(d for d, _ in v), [r for _, r in v])
+            for s, v in per_script.items()}
+
+
+def perkiraan_durasi(run_id=None):
+    """
+    {script: median detik} untuk run yang sedang berjalan (atau run
+    baru jika run_id None), dipakai dasbor.py untuk ETA jadwal.
+    """
+    conn = buka()
+    try:
+        run = None
+        if run_id is not None:
+            run = conn.execute(
+                "SELECT * FROM run WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            run = {"id": (run_terakhir(conn) or 0) + 1, "db": kunci_db(),
+                   "catatan": None}
+        return {s: d for s, (d, _) in baseline(conn, run).items()}
+    finally:
+        conn.close()
+
+
+def beda_setting(lama, baru):
+    lama, baru = json.loads(lama), json.loads(baru)
+    return {k: (lama.get(k), baru.get(k))
+            for k in sorted(set(lama) | set(baru)) if lama.get(k) != baru.get(k)}
+
+
+def laporan(run_id=None, baseline_id=None, ambang=AMBANG):
+    """Cetak perbandingan run vs baseline. Hasil: list script regresi."""
+    conn = buka()
+    try:
+        run_id = run_id or run_terakhir(conn)
+        run = conn.execute("SELECT * FROM run WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"Run {run_id} tidak ada di {FILE_RIWAYAT}")
+
+        base = baseline(conn, run, baseline_id)
+        rows = conn.execute(
+            "SELECT * FROM script WHERE run_id = ? ORDER BY rowid",
+            (run_id,)).fetchall()
+
+        print(f"📌 Run {run['id']} ({run['status']}) — {run['mulai']} → "
+              f"{run['selesai'] or '-'}")
+        print(f"📌 {run['db']}")
+        if baseline_id is not None:
+            ref = conn.execute(
+                "SELECT setting FROM run WHERE id = ?", (baseline_id,)).fetchone()
+            if ref is not None:
+                for k, (lama, baru) in beda_setting(
+                        ref["setting"], run["setting"]).items():
+                    print(f"   ⚙ {k}: {lama} → {baru}")
+        print(f"📌 Ambang regresi: +{ambang:g}% (minimal {MIN_DETIK:g} detik)\n")
+
+        print(f"{'script':<40} {'row':>11} {'row/s':>9} {'detik':>9} "
+              f"{'baseline':>9} {'Δ':>8}")
+        regresi = []
+        total = 0.0
+        total_base = 0.0
+        for row in rows:
+            d = durasi(row)
+            total += d or 0
+            lama = base.get(row["script"])
+            tanda = ""
+            delta = ""
+            if lama and d is not None:
+                total_base += lama[0]
+                if lama[0] > 0:
+                    persen = (d - lama[0]) / lama[0] * 100
+                    delta = f"{persen:+7.1f}%"
+                    if persen > ambang and d >= MIN_DETIK:
+                        tanda = "  🐢 REGRESI"
+                        regresi.append(row["script"])
+            if row["status"] != "ok":
+                tanda += f"  ❌ {row['status']}"
+            print(f"{row['script']:<40} {row['rows'] or 0:>11,} "
+                  f"{row['row_per_s'] or 0:>9,.0f} "
+                  f"{d if d is not None else 0:>9.1f} "
+                  f"{lama[0] if lama else 0:>9.1f} {delta:>8}{tanda}")
+
+        print(f"\n⏱ Total durasi : {total:,.1f} detik "
+              f"(baseline {total_base:,.1f} detik untuk script yang sama)")
+        if regresi:
+            print(f"🐢 {len(regresi)} script lebih lambat > {ambang:g}%: "
+                  f"{', '.join(regresi)}")
+        else:
+            print("✔ Tidak ada regresi")
+        return regresi
+    finally:
+        conn.close()
+
+
+def daftar(n=10):
+    conn = buka()
+    try:
+        for run in conn.execute(
+                "SELECT r.*, COUNT(s.script) AS n_script, "
+                "SUM(COALESCE(s.detik_script, s.detik)) AS total "
+                "FROM run r LEFT JOIN script s ON s.run_id = r.id "
+                "GROUP BY r.id ORDER BY r.id DESC LIMIT ?", (n,)):
+            print(f"#{run['id']:<5} {run['mulai']}  {run['status']:<8} "
+                  f"{run['n_script']:>3} script  {run['total'] or 0:>9,.1f} detik"
+                  f"  {run['catatan'] or ''}")
+    finally:
+        conn.close()
+
+
+# =====================================================
+# 4. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Riwayat run migrasi")
+    parser.add_argument("cmd", nargs="?", default="laporan",
+                        choices=["laporan", "daftar"])
+    parser.add_argument("run", nargs="?", type=int,
+                        help="id run (default: terakhir)")
+    parser.add_argument("--baseline", type=int,
+                        help="bandingkan dengan satu run ini saja")
+    parser.add_argument("--ambang", type=float, default=AMBANG,
+                        help="persen lebih lambat yang dianggap regresi")
+    parser.add_argument("-n", type=int, default=10, help="jumlah run `daftar`")
+    args = parser.parse_args()
+
+    print("==============================================================")
+    print(f"🚀 RIWAYAT RUN MIGRASI — {args.cmd.upper()}")
+    print("==============================================================\n")
+
+    try:
+        if args.cmd == "daftar":
+            daftar(args.n)
+        elif laporan(args.run, args.baseline, args.ambang):
+            sys.exit(2)
+    except Exception as e:
+        print("\n❌ ERROR RIWAYAT!")
+        print("Error:", e)
+        sys.exit(1)
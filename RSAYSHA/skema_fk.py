@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Helper foreign key bersama (dipakai tabel_bayangan.py, dll.)
+    - ambil_fk()        : FK dari information_schema database aktif
+    - fk_dari_backup()  : FK dari file backup_fk_*.sql terbaru (hasil
+                          dropFK.py), untuk saat FK sedang dilepas
+    - sql_tambah_fk() / sql_hapus_fk() : generate ALTER TABLE
+Format FK: dict(tabel, nama, kolom, ref_tabel, ref_kolom, on_delete,
+on_update); kolom & ref_kolom berupa list (FK multi-kolom).
+"""
+
+import os
+import re
+import glob
+
+
+# =====================================================
+# 1. FK DARI information_schema
+# =====================================================
+QUERY_FK = """
+SELECT
+    k.table_name,
+    k.constraint_name,
+    k.column_name,
+    k.referenced_table_name,
+    k.referenced_column_name,
+    r.delete_rule,
+    r.update_rule
+FROM information_schema.key_column_usage k
+JOIN information_schema.referential_constraints r
+  ON r.constraint_schema = k.table_schema
+ AND r.constraint_name = k.constraint_name
+ AND r.table_name = k.table_name
+WHERE k.referenced_table_name IS NOT NULL
+  AND k.table_schema = DATABASE()
+ORDER BY k.table_name, k.constraint_name, k.ordinal_position
+"""
+
+
+def ambil_fk(conn):
+    """Semua FK di database koneksi `conn` (SQLAlchemy Connection)."""
+    hasil = {}
+    for t, c, col, rt, rcol, on_del, on_upd in conn.exec_driver_sql(QUERY_FK):
+        fk = hasil.setdefault((t, c), {
+            "tabel": t,
+            "nama": c,
+            "kolom": [],
+            "ref_tabel": rt,
+            "ref_kolom": [],
+            "on_delete": on_del,
+            "on_update": on_upd,
+        })
+        fk["kolom"].append(col)
+        fk["ref_kolom"].append(rcol)
+    return list(hasil.values())
+
+
+# =====================================================
+# 2. FK DARI FILE BACKUP (dropFK.py)
+# =====================================================
+RE_BACKUP = re.compile(
+    r"ALTER TABLE `(?P<tabel>[^`]+)`\s+ADD CONSTRAINT `(?P<nama>[^`]+)`\s+"
+    r"FOREIGN KEY \((?P<kolom>[^)]+)\)\s+"
+    r"REFERENCES `(?P<ref_tabel>[^`]+)` \((?P<ref_kolom>[^)]+)\)",
+)
+
+
+def _daftar_kolom(teks):
+    return [c.strip().strip("`") for c in teks.split(",")]
+
+
+def fk_dari_backup(base_dir):
+    """FK dari file backup_fk_*.sql terbaru di folder base_dir (atau [])."""
+    files = sorted(glob.glob(os.path.join(base_dir, "backup_fk_*.sql")))
+    if not files:
+        return []
+
+    with open(files[-1], "r", encoding="utf-8") as f:
+        teks = f.read()
+
+    return [
+        {
+            "tabel": m["tabel"],
+            "nama": m["nama"],
+            "kolom": _daftar_kolom(m["kolom"]),
+            "ref_tabel": m["ref_tabel"],
+            "ref_kolom": _daftar_kolom(m["ref_kolom"]),
+            "on_delete": None,
+            "on_update": None,
+        }
+        for m in RE_BACKUP.finditer(teks)
+    ]
+
+
+# =====================================================
+# 3. GENERATE SQL
+# =====================================================
+def sql_tambah_fk(fk, tabel=None, ref_tabel=None):
+    cols = ", ".join(f"`{c}`" for c in fk["kolom"])
+    refcols = ", ".join(f"`{c}`" for c in fk["ref_kolom"])
+    sql = (
+        f"ALTER TABLE `{tabel or fk['tabel']}` "
+        f"ADD CONSTRAINT `{fk['nama']}` "
+        f"FOREIGN KEY ({cols}) "
+        f"REFERENCES `{ref_tabel or fk['ref_tabel']}` ({refcols})"
+    )
+    # RESTRICT / NO ACTION adalah default MySQL, tidak perlu ditulis
+    for aksi in ("on_delete", "on_update"):
+        rule = fk.get(aksi)
+        if rule and rule not in ("RESTRICT", "NO ACTION"):
+            sql += f" {aksi.upper().replace('_', ' ')} {rule}"
+    return sql
+
+
+def sql_hapus_fk(fk, tabel=None):
+    return f"ALTER TABLE `{tabel or fk['tabel']}` DROP FOREIGN KEY `{fk['nama']}`"
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Snapshot konsisten untuk beberapa koneksi reader SOURCE sekaligus
+Semua koneksi menjalankan START TRANSACTION WITH CONSISTENT SNAPSHOT
+pada titik waktu yang sama, sehingga baca paralel (per rentang PK /
+per tabel) sama hasilnya dengan satu salinan sesaat.
+Cara menyamakan titik waktu (MIG_SNAPSHOT), hanya jika > 1 koneksi
+(satu koneksi cukup START TRANSACTION WITH CONSISTENT SNAPSHOT saja):
+    - ftwrl  : FLUSH TABLES WITH READ LOCK sebentar (butuh hak RELOAD),
+               semua snapshot dibuka, lalu UNLOCK TABLES (default;
+               nilai lama "auto" dianggap ftwrl)
+    - binlog : opt-in tanpa lock, TIDAK DIJAMIN identik. Posisi
+               binlog/GTID dibaca sebelum & sesudah semua snapshot dibuka
+               (diulang MIG_SNAPSHOT_RETRY kali jika bergeser), tapi
+               karena 2PC binlog ditulis sebelum commit InnoDB terlihat:
+               transaksi yang sudah di binlog sebelum cek pertama bisa
+               baru terlihat di snapshot koneksi berikutnya. Pakai hanya
+               jika hak RELOAD tidak ada dan selisih sesaat bisa diterima
+    - off    : tanpa snapshot (perilaku lama, tiap batch transaksi baru)
+Cakupan: snapshot hanya berlaku untuk koneksi yang dibuka bersama dalam
+SATU proses. MySQL / MariaDB tidak bisa berbagi snapshot antar sesi atau
+membukanya di koordinat binlog yang sudah lewat, sedangkan orkestrator
+02 menjalankan tiap script sebagai proses terpisah berurutan. Jadi di
+pipeline 02 konsistensi hanya PER TABEL (antar rentang PK satu tabel,
+MIG_READERS > 1; MIG_READERS=1 tetap transaksi per batch): tabel yang
+dibaca belakangan ikut melihat commit setelah tabel sebelumnya selesai.
+Salinan satu titik waktu LINTAS tabel:
+    - ekstrak_data.py ekstrak <tabel...> : semua tabel dibaca dari satu
+      snapshot dalam satu proses, lalu ekstrak_data.py muat
+    - cdc_trigger.py : selisih antar tabel disusulkan sampai cutover
+Catatan: snapshot panjang menahan purge undo log di source; pakai untuk
+gladi / cutover, bukan pre-copy siang hari yang sangat lama.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+MODE = os.getenv("MIG_SNAPSHOT", "ftwrl")
+RETRY = int(os.getenv("MIG_SNAPSHOT_RETRY", "5"))
+
+MODE_SNAPSHOT = ("ftwrl", "binlog", "off", "auto")
+
+
+def posisi_binlog(cur):
+    """(file, posisi, gtid) binlog saat ini, atau None jika binlog mati."""
+    for sql in ("SHOW MASTER STATUS", "SHOW BINARY LOG STATUS"):
+        try:
+            cur.execute(sql)
+        except Exception:
+            continue  # MySQL 8.4 hanya kenal SHOW BINARY LOG STATUS
+        row = cur.fetchone()
+        if not row:
+            return None
+        return tuple(row[:2]) + (row[4] if len(row) > 4 else None,)
+    return None
+
+
+def mulai_snapshot(cur):
+    cur.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+
+
+# =====================================================
+# 2. BUKA / TUTUP
+# =====================================================
+def _snapshot_binlog(conns):
+    """
+    Posisi sama sebelum & sesudah BELUM membuktikan snapshot identik
+    (race 2PC, lihat docstring modul) — hanya untuk MIG_SNAPSHOT=binlog.
+    """
+    cek = conns[0].cursor()
+    for _ in range(max(RETRY, 1)):
+        awal = posisi_binlog(cek)
+        if awal is None:
+            return None
+        for raw in conns:
+            mulai_snapshot(raw.cursor())
+        # cek dibaca lewat koneksi pertama (sudah dalam snapshot):
+        # SHOW MASTER STATUS tetap menampilkan posisi terkini
+        if posisi_binlog(cek) == awal:
+            return awal
+        for raw in conns:
+            raw.rollback()
+    return None
+
+
+def _snapshot_ftwrl(src, conns):
+    kunci = src.raw_connection()
+    try:
+        cur = kunci.cursor()
+        cur.execute("FLUSH TABLES WITH READ LOCK")
+        try:
+            posisi = posisi_binlog(cur)
+            for raw in conns:
+                mulai_snapshot(raw.cursor())
+        finally:
+            cur.execute("UNLOCK TABLES")
+    finally:
+        kunci.close()
+    return posisi
+
+
+def buka_snapshot(src, n, mode=None):
+    """
+    Buka n koneksi raw source dengan snapshot yang sama.
+    Hasil: (list koneksi, keterangan). Koneksi JANGAN di-commit/rollback
+    sebelum selesai baca; tutup dengan tutup_snapshot().
+    """
+    mode = mode or MODE
+    if mode not in MODE_SNAPSHOT:
+        raise ValueError(f"MIG_SNAPSHOT '{mode}' tidak dikenal {MODE_SNAPSHOT}")
+
+    conns = [src.raw_connection() for _ in range(max(n, 1))]
+    try:
+        if mode == "off":
+            return conns, "OFF (tiap koneksi titik waktu sendiri)"
+
+        if len(conns) == 1:
+            mulai_snapshot(conns[0].cursor())
+            return conns, "1 koneksi"
+
+        if mode == "binlog":
+            posisi = _snapshot_binlog(conns)
+            if posisi is None:
+                raise RuntimeError(
+                    "Posisi binlog terus bergeser / binlog mati — "
+                    "coba MIG_SNAPSHOT=ftwrl")
+            return conns, f"binlog {posisi[0]}:{posisi[1]} (tanpa lock)"
+
+        posisi = _snapshot_ftwrl(src, conns)
+        if posisi:
+            return conns, f"FTWRL, binlog {posisi[0]}:{posisi[1]}"
+        return conns, "FTWRL"
+    except Exception:
+        tutup_snapshot(conns)
+        raise
+
+
+def tutup_snapshot(conns):
+    for raw in conns:
+        try:
+            raw.rollback()
+        except Exception:
+            pass     # koneksi putus / sudah diganti reader (jaga_batch.py)
+        finally:
+            raw.close()
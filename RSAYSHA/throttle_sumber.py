@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pembatas kecepatan baca SOURCE (LIS produksi yang masih dipakai lab)
+Dipanggil reader engine_migrasi setiap selesai fetch satu batch.
+    - Token bucket row/detik  (MIG_SRC_ROWS_PER_SEC, 0 = tanpa batas)
+    - Token bucket byte/detik (MIG_SRC_BYTES_PER_SEC, 0 = tanpa batas);
+      byte per row diperkirakan dari sampel row tiap batch
+    - Adaptif (MIG_SRC_ADAPTIF=1): pantau latensi fetch dan
+      Threads_running source; jika source sibuk, reader istirahat
+      sebanding waktu fetch (jeda berlipat 2x, turun lagi saat normal)
+Siang hari (pre-copy): nyalakan batas + adaptif. Malam cutover: matikan.
+Satu pembatas dipakai bersama semua reader paralel (batas total).
+"""
+
+import os
+import time
+import threading
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+ROWS_PER_SEC = float(os.getenv("MIG_SRC_ROWS_PER_SEC", "0"))
+BYTES_PER_SEC = float(os.getenv("MIG_SRC_BYTES_PER_SEC", "0"))
+ADAPTIF = os.getenv("MIG_SRC_ADAPTIF", "0") == "1"
+
+# Source dianggap sibuk jika Threads_running melebihi ini ...
+THREADS_MAX = int(os.getenv("MIG_SRC_THREADS_MAX", "20"))
+# ... atau latensi fetch > faktor × latensi normal (batch awal)
+LATENSI_FAKTOR = float(os.getenv("MIG_SRC_LATENSI_FAKTOR", "3"))
+# Jeda antar cek Threads_running (detik)
+CEK_INTERVAL = float(os.getenv("MIG_SRC_CEK_INTERVAL", "2"))
+
+# Batas rasio istirahat adaptif (istirahat = rasio × waktu fetch)
+RASIO_MIN = 0.0
+RASIO_MAX = 8.0
+SAMPEL_ROW = 200
+
+
+def perkiraan_byte(rows):
+    """Perkiraan byte batch dari sampel (str/bytes = panjang, NULL 0, lain 8)."""
+    n = len(rows)
+    if not n:
+        return 0
+    step = max(n // SAMPEL_ROW, 1)
+    total = 0
+    dihitung = 0
+    for i in range(0, n, step):
+        for v in rows[i]:
+            if isinstance(v, (str, bytes)):
+                total += len(v)
+            elif v is not None:
+                total += 8
+        dihitung += 1
+    return total * n // dihitung
+
+
+# =====================================================
+# 2. TOKEN BUCKET
+# =====================================================
+class TokenBucket:
+    """Token terisi `rate`/detik, maksimal `burst`; ambil() tidur jika kurang."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.token = self.burst
+        self.waktu = time.monotonic()
+
+    def ambil(self, n):
+        now = time.monotonic()
+        self.token = min(self.burst, self.token + (now - self.waktu) * self.rate)
+        self.waktu = now
+        self.token -= n
+        # token boleh minus (batch lebih besar dari burst) → tidur sampai lunas
+        if self.token < 0:
+            tidur = -self.token / self.rate
+            time.sleep(tidur)
+            return tidur
+        return 0.0
+
+
+# =====================================================
+# 3. PEMBATAS SOURCE
+# =====================================================
+class PembatasSumber:
+
+    def __init__(self, rows_per_sec=ROWS_PER_SEC, bytes_per_sec=BYTES_PER_SEC,
+                 adaptif=ADAPTIF):
+        self.bucket_rows = TokenBucket(rows_per_sec) if rows_per_sec else None
+        self.bucket_bytes = TokenBucket(bytes_per_sec) if bytes_per_sec else None
+        self.adaptif = adaptif
+        self.latensi_normal = None
+        self.rasio = RASIO_MIN
+        self.cek_berikut = 0.0
+        self.threads = None
+        self.total_tidur = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def aktif(self):
+        return bool(self.bucket_rows or self.bucket_bytes or self.adaptif)
+
+    def keterangan(self):
+        if not self.aktif:
+            return "OFF"
+        bagian = []
+        if self.bucket_rows:
+            bagian.append(f"{self.bucket_rows.rate:,.0f} row/s")
+        if self.bucket_bytes:
+            bagian.append(f"{self.bucket_bytes.rate / 1e6:,.1f} MB/s")
+        if self.adaptif:
+            bagian.append(f"adaptif (Threads_running ≤ {THREADS_MAX})")
+        return ", ".join(bagian)
+
+    def threads_running(self, raw):
+        cur = raw.cursor()
+        cur.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+        row = cur.fetchone()
+        cur.close()
+        return int(row[1]) if row else 0
+
+    def sibuk(self, raw, latensi_per_row):
+        if self.latensi_normal is None:
+            self.latensi_normal = latensi_per_row
+        else:
+            # latensi normal = terendah yang pernah terlihat
+            self.latensi_normal = min(self.latensi_normal, latensi_per_row)
+
+        now = time.monotonic()
+        if now >= self.cek_berikut:
+            self.threads = self.threads_running(raw)
+            self.cek_berikut = now + CEK_INTERVAL
+
+        return (latensi_per_row > self.latensi_normal * LATENSI_FAKTOR
+                or (self.threads or 0) > THREADS_MAX)
+
+    def setelah_fetch(self, raw, rows, detik_fetch):
+        """Dipanggil reader setelah satu batch di-fetch (raw = koneksi source)."""
+        # tidur di dalam lock → reader paralel ikut antre (batas global)
+        with self.lock:
+            return self._setelah_fetch(raw, rows, detik_fetch)
+
+    def _setelah_fetch(self, raw, rows, detik_fetch):
+        n = len(rows)
+        tidur = 0.0
+
+        if self.adaptif and n:
+            if self.sibuk(raw, detik_fetch / n):
+                self.rasio = min(max(self.rasio * 2, 0.5), RASIO_MAX)
+            else:
+                self.rasio = self.rasio / 2 if self.rasio > 0.1 else RASIO_MIN
+            if self.rasio:
+                time.sleep(detik_fetch * self.rasio)
+                tidur += detik_fetch * self.rasio
+
+        if self.bucket_rows:
+            tidur += self.bucket_rows.ambil(n)
+        if self.bucket_bytes:
+            tidur += self.bucket_bytes.ambil(perkiraan_byte(rows))
+
+        self.total_tidur += tidur
+        return tidur
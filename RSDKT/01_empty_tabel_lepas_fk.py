@@ -5,6 +5,7 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 scripts = [
+    "sidik_tabel.py",      # rencana tabel yang dilewati (MIG_SIDIK=1)
     "dropFK.py",
     "emptyTabel.py"
 ]
@@ -1,5 +1,12 @@
 import subprocess
 import os
+import time
+from datetime import datetime
+
+import sidik_tabel
+import riwayat_run
+import metrik_prometheus
+import dasbor
 
 # Path direktori tempat script ini berada
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -54,13 +61,79 @@ scripts = [
     "restoreFK.py"
 ]
 
-for s in scripts:
+# Tiap script = proses + snapshot source sendiri → konsisten per tabel
+# saja, bukan satu titik waktu lintas tabel (lihat snapshot_sumber.py;
+# untuk itu pakai ekstrak_data.py ekstrak/muat atau cdc_trigger.py)
+
+# Tabel tidak berubah sejak load terakhir (MIG_SIDIK=1, lihat sidik_tabel.py)
+lewati = sidik_tabel.baca_rencana()
+
+# Riwayat durasi per script (MIG_RIWAYAT=1, lihat riwayat_run.py);
+# script anak mencatat detail engine ke run yang sama lewat MIG_RUN_ID
+run_id = riwayat_run.mulai_run() if riwayat_run.AKTIF else None
+
+# Progres run untuk Prometheus (MIG_PROM_DIR, lihat metrik_prometheus.py)
+mulai_run = time.time()
+
+# Jadwal untuk ETA jalur kritis di dasbor.py (MIG_DASBOR=1)
+NAMA_JADWAL = os.path.basename(__file__)
+script_lewati = [s for s in scripts if sidik_tabel.tabel_script(s) in lewati]
+dasbor.bersihkan()
+
+for ke, s in enumerate(scripts, start=1):
+    metrik_prometheus.tulis_run(s, ke, len(scripts), mulai_ts=mulai_run)
+    dasbor.tulis_jadwal(NAMA_JADWAL, scripts, ke, mulai_run,
+                        lewati=script_lewati, run_id=run_id)
+    tabel = sidik_tabel.tabel_script(s)
+    if tabel in lewati:
+        print(f"⏭ Dilewati (tidak berubah): {s}")
+        if run_id:
+            riwayat_run.catat_script(run_id, s, tabel=tabel, status="dilewati")
+        continue
+
+    # sidik source diambil SEBELUM script membaca, disimpan jika sukses
+    awal = None
+    if sidik_tabel.AKTIF and tabel:
+        try:
+            awal = sidik_tabel.sidik_awal([tabel])
+        except Exception as e:
+            print(f"⚠ Sidik jari source {tabel} gagal diambil: {e}")
+
     script_path = os.path.join(BASE_DIR, s)
     print(f"Menjalankan: {s}")
+    mulai = datetime.now().isoformat(timespec="seconds")
+    t0 = time.monotonic()
     result = subprocess.run(["python", script_path])
 
+    if run_id:
+        riwayat_run.catat_script(
+            run_id, s, tabel=tabel, mulai=mulai,
+            status="ok" if result.returncode == 0 else f"exit {result.returncode}",
+            detik_script=round(time.monotonic() - t0, 3))
+
     if result.returncode != 0:
         print(f"❌ Error pada script: {s}")
+        metrik_prometheus.tulis_run(s, ke, len(scripts), gagal=True,
+                                    mulai_ts=mulai_run)
+        dasbor.tulis_jadwal(NAMA_JADWAL, scripts, ke, mulai_run,
+                            run_id=run_id, status="gagal")
         break
     else:
         print(f"✔️ Selesai: {s}")
+
+    if awal:
+        try:
+            sidik_tabel.catat(awal)
+        except Exception as e:
+            print(f"⚠ Sidik jari {tabel} gagal dicatat: {e}")
+else:
+    # semua sukses → rencana sudah terpakai
+    sidik_tabel.hapus_rencana()
+    dasbor.tulis_jadwal(NAMA_JADWAL, scripts, len(scripts), mulai_run,
+                        run_id=run_id, status="ok")
+    if run_id:
+        riwayat_run.selesai_run(run_id, "ok")
+        run_id = None
+
+if run_id:
+    riwayat_run.selesai_run(run_id, "gagal")
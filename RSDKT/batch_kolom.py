@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch kolomnar untuk engine_migrasi (MIG_BATCH_KOLOMNAR=1)
+Tujuan: batch di antrean prefetch jauh lebih hemat memori dibanding
+tuple-per-row.
+    - Kolom int / datetime   → array('q'), NULL disimpan sebagai sentinel
+      (datetime = mikrodetik sejak epoch)
+    - Kolom float tanpa NULL → array('d')
+    - Kolom "kamus" (status, flag, alat, ...) → kode array('H') + daftar
+      nilai unik (dictionary encoding)
+    - Kolom lain             → list biasa
+Iterasi batch menghasilkan tuple per row (urutan kolom asli), jadi
+transform_batch() tidak perlu tahu bentuk penyimpanannya.
+"""
+
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+
+# =====================================================
+# 1. ENCODE KOLOM
+# =====================================================
+NULL_Q = -(1 << 63)                 # sentinel NULL di array('q')
+EPOCH = datetime(1970, 1, 1)
+MIKRO = timedelta(microseconds=1)
+
+# Jenis kolom hasil encode
+POLOS, INT, WAKTU, KAMUS = 0, 1, 2, 3
+
+
+def _encode_angka(values):
+    """
+    (jenis, array) untuk kolom int / datetime naif / float, else None.
+    NULL pada int & datetime disimpan sebagai NULL_Q.
+    """
+    contoh = next((v for v in values if v is not None), None)
+    tipe = type(contoh)
+    try:
+        if tipe is int:
+            if all(type(v) is int or v is None for v in values):
+                return INT, array(
+                    "q", [NULL_Q if v is None else v for v in values])
+        elif tipe is datetime:
+            if all(v is None or (type(v) is datetime and v.tzinfo is None)
+                   for v in values):
+                return WAKTU, array(
+                    "q", [NULL_Q if v is None else (v - EPOCH) // MIKRO
+                          for v in values])
+        elif tipe is float:
+            if all(type(v) is float for v in values):
+                return POLOS, array("d", values)
+    except OverflowError:
+        return None
+    return None
+
+
+def _encode_kamus(values):
+    """Dictionary encoding: (kode array('H'), daftar nilai unik)."""
+    kamus = []
+    index = {}
+    kode = array("H")
+    for v in values:
+        k = index.get(v)
+        if k is None:
+            if len(kamus) >= 0xFFFF:
+                return None
+            k = index[v] = len(kamus)
+            kamus.append(sys.intern(v) if type(v) is str else v)
+        kode.append(k)
+    return kode, kamus
+
+
+# =====================================================
+# 2. BATCH KOLOMNAR
+# =====================================================
+def _decode_nilai(jenis, kamus, v):
+    if jenis == KAMUS:
+        return kamus[v]
+    if jenis == INT:
+        return None if v == NULL_Q else v
+    if jenis == WAKTU:
+        return None if v == NULL_Q else EPOCH + v * MIKRO
+    return v
+
+
+class BatchKolom:
+    __slots__ = ("n", "kolom", "jenis", "data", "kamus")
+
+    def __init__(self, n, kolom, jenis, data, kamus):
+        self.n = n
+        self.kolom = kolom      # nama kolom (urutan asli)
+        self.jenis = jenis      # per kolom: POLOS / INT / WAKTU / KAMUS
+        self.data = data        # per kolom: array / list / kode kamus
+        self.kamus = kamus      # per kolom: list nilai unik atau None
+
+    @classmethod
+    def dari_rows(cls, rows, kolom, kolom_kamus=()):
+        jenis = []
+        data = []
+        kamus = []
+        for col, values in zip(kolom, zip(*rows)):
+            if col in kolom_kamus:
+                hasil = _encode_kamus(values)
+                if hasil is not None:
+                    jenis.append(KAMUS)
+                    data.append(hasil[0])
+                    kamus.append(hasil[1])
+                    continue
+
+            hasil = _encode_angka(values)
+            if hasil is None:
+                hasil = (POLOS, list(values))
+            jenis.append(hasil[0])
+            data.append(hasil[1])
+            kamus.append(None)
+        return cls(len(rows), kolom, jenis, data, kamus)
+
+    def __len__(self):
+        return self.n
+
+    def kolom_nilai(self, idx):
+        """Nilai satu kolom dalam bentuk asli (sudah di-decode)."""
+        jenis = self.jenis[idx]
+        values = self.data[idx]
+        if jenis == POLOS:
+            return values
+        if jenis == KAMUS:
+            return list(map(self.kamus[idx].__getitem__, values))
+        if jenis == INT:
+            return [None if v == NULL_Q else v for v in values]
+        return [None if v == NULL_Q else EPOCH + v * MIKRO for v in values]
+
+    def __iter__(self):
+        return zip(*[self.kolom_nilai(i) for i in range(len(self.kolom))])
+
+    def row(self, i):
+        return BarisView(self, i)
+
+    def ukuran_byte(self):
+        """Perkiraan memori batch (header objek tidak dihitung detail)."""
+        total = sys.getsizeof(self.data)
+        for values, kamus in zip(self.data, self.kamus):
+            total += sys.getsizeof(values)
+            if isinstance(values, list):
+                total += sum(sys.getsizeof(v) for v in values
+                             if v is not None)
+            if kamus is not None:
+                total += sum(sys.getsizeof(v) for v in kamus)
+        return total
+
+
+def ukuran_rows(rows):
+    """Perkiraan memori batch tuple-per-row (pembanding ukuran_byte)."""
+    total = sys.getsizeof(rows)
+    for row in rows:
+        total += sys.getsizeof(row)
+        total += sum(sys.getsizeof(v) for v in row if v is not None)
+    return total
+
+
+class BarisView:
+    """View satu row tanpa menyalin data (untuk akses sesekali)."""
+    __slots__ = ("batch", "i")
+
+    def __init__(self, batch, i):
+        self.batch = batch
+        self.i = i
+
+    def __getitem__(self, idx):
+        b = self.batch
+        return _decode_nilai(b.jenis[idx], b.kamus[idx], b.data[idx][self.i])
+
+    def get(self, nama):
+        return self[self.batch.kolom.index(nama)]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark hot loop transaksi_lab: cara LAMA vs engine_migrasi
+Yang diukur (sisi Python saja, tanpa koneksi DB):
+    - LAMA : per row dict(...) + text(INSERT_SQL) + progress_bar()
+    - BARU : transform_batch() tuple posisi + progress dibatasi waktu
+Output: rows/detik, alokasi per row (delta sys.getallocatedblocks(),
+hasil per row ditahan selama pengukuran agar tidak langsung dibebaskan)
+dan memori peak (tracemalloc) per row.
+Pakai: python bench_hot_loop.py [jumlah_row]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import text
+
+import engine_migrasi as eng
+import migrasi_transaksi_lab as trx
+
+
+# =====================================================
+# 1. DATA SINTETIS (mirip row transaksi_lab)
+# =====================================================
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+BATCH = eng.BATCH_SIZE
+
+
+def buat_rows(n):
+    now = datetime(2025, 1, 1, 8, 30, 0)
+    rows = []
+    for i in range(n):
+        row = []
+        for col in trx.KOLOM_SUMBER:
+            if col.startswith("id_") or col.startswith("umur"):
+                row.append(i % 3 if col == "id_instalasi" else i)
+            elif col.startswith("tgl_") or col.endswith("_at") or col == "waktu_sampel":
+                row.append(now)
+            elif col == "is_mcu":
+                row.append(Decimal("0"))
+            else:
+                row.append(f"{col}-{i % 50}")
+        rows.append(tuple(row))
+    return rows
+
+
+INSERT_SQL_LAMA = "INSERT INTO transaksi_lab ({}) VALUES ({})".format(
+    ", ".join(trx.KOLOM_TARGET),
+    ", ".join(f":{c}" for c in trx.KOLOM_TARGET),
+)
+
+
+# =====================================================
+# 2. LOOP LAMA (per row)
+# =====================================================
+def progress_bar_lama(cur, total):
+    """progress_bar() lama: digambar tiap dipanggil (per row)."""
+    bar_len = 40
+    filled = int(bar_len * cur / total) if total else bar_len
+    bar = "█" * filled + "-" * (bar_len - filled)
+    percent = (cur / total * 100) if total else 100
+    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
+    sys.stdout.flush()
+
+
+def loop_lama(batches, total, simpan=None):
+    inserted = 0
+    for rows in batches:
+        for row in rows:
+            r = dict(zip(trx.KOLOM_SUMBER, row))   # setara row._mapping
+            id_inst = r["id_instalasi"]
+            if id_inst == 1:
+                jenis_rawat = "RJ"
+            elif id_inst == 2:
+                jenis_rawat = "RANAP"
+            else:
+                jenis_rawat = "-"
+            data = dict(
+                r,
+                id_asal=None,
+                id_cara_masuk=id_inst,
+                jenis_rawat=jenis_rawat,
+                note_analis=None,
+                klinis=None,
+                kesan=None,
+                saran=None,
+                newnolab=None,
+            )
+            # conn.execute(text(INSERT_SQL), data) → text() dibuat ulang
+            stmt = text(INSERT_SQL_LAMA).bindparams(**data)
+            if simpan is not None:
+                simpan.append((r, data, stmt))
+            inserted += 1
+            progress_bar_lama(inserted, total)
+    return inserted
+
+
+# =====================================================
+# 3. LOOP BARU (engine)
+# =====================================================
+def loop_baru(batches, total, simpan=None):
+    plan = eng.build_plan(trx.SPEC)
+    eng.build_insert(trx.SPEC)
+    out = []
+    processed = 0
+    for rows in batches:
+        if simpan is not None:
+            out = []                 # batch ditahan untuk hitung alokasi
+            simpan.append(out)
+        out.clear()
+        processed += eng.transform_batch(plan, rows, out)
+        eng.progress_bar(processed, total)   # dibatasi waktu di telemetri
+    return processed
+
+
+# =====================================================
+# 4. UKUR
+# =====================================================
+def ukur(nama, fn, batches, total):
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    try:
+        t0 = time.perf_counter()
+        fn(batches, total)
+        durasi = time.perf_counter() - t0
+
+        # alokasi: blok baru yang dipegang hasil per row satu batch
+        fn(batches[:1], len(batches[0]))      # pemanasan cache / plan
+        simpan = []
+        gc.collect()
+        gc.disable()
+        try:
+            awal = sys.getallocatedblocks()
+            fn(batches[:1], len(batches[0]), simpan)
+            blok = sys.getallocatedblocks() - awal
+        finally:
+            gc.enable()
+        del simpan
+
+        tracemalloc.start()
+        fn(batches[:1], len(batches[0]))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    rps = total / durasi if durasi else 0
+    n = len(batches[0])
+    print(f"   {nama:<5} : {rps:12,.0f} rows/detik | "
+          f"{blok / n:6,.1f} alokasi/row | "
+          f"{peak / n:8,.0f} byte peak/row (tracemalloc)")
+    return rps
+
+
+if __name__ == "__main__":
+    print("==============================================================")
+    print("⏱ BENCHMARK HOT LOOP transaksi_lab")
+    print("==============================================================\n")
+    print(f"📌 Jumlah row : {N_ROWS:,}")
+    print(f"📌 Batch size : {BATCH:,}\n")
+
+    rows = buat_rows(N_ROWS)
+    batches = [rows[i:i + BATCH] for i in range(0, len(rows), BATCH)]
+
+    lama = ukur("LAMA", loop_lama, batches, N_ROWS)
+    baru = ukur("BARU", loop_baru, batches, N_ROWS)
+
+    print(f"\n✔ Percepatan: {baru / lama:.1f}x" if lama else "")
+    print("==============================================================")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Deteksi batch lambat + tangkap bukti diagnosa otomatis
+Kasus: sesekali satu batch (mis. transaksi_lab_detail) butuh menit,
+bukan detik, dan saat dicek buktinya sudah hilang.
+    - Distribusi latensi bergulir per tabel (MIG_LAMBAT_JENDELA batch
+      terakhir) untuk dua stage: fetch (source) dan tulis
+      (executemany + commit di target)
+    - Batch > MIG_LAMBAT_FAKTOR × p95 (dan ≥ MIG_LAMBAT_MIN_MS) →
+      tangkap ke MIG_DIAGNOSA_DIR/<tabel>_<waktu>_<stage>.txt:
+        * rentang PK batch + durasi + p95 saat itu
+        * SHOW ENGINE INNODB STATUS dan SHOW FULL PROCESSLIST di target
+          dan tiap endpoint source
+        * EXPLAIN query batch di source
+    - Dicek juga SELAMA batch berjalan (thread pemantau tiap
+      MIG_LAMBAT_CEK detik) → bukti diambil saat macet masih terjadi,
+      bukan setelah selesai
+    - Maksimal MIG_LAMBAT_MAKS tangkapan per tabel
+MIG_LAMBAT_FAKTOR=0 → mati.
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from telemetri import persentil
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+FAKTOR = float(os.getenv("MIG_LAMBAT_FAKTOR", "5"))
+MIN_MS = float(os.getenv("MIG_LAMBAT_MIN_MS", "2000"))
+
+# Batch minimal sebelum p95 dianggap layak jadi patokan
+SAMPEL = int(os.getenv("MIG_LAMBAT_SAMPEL", "20"))
+JENDELA = int(os.getenv("MIG_LAMBAT_JENDELA", "500"))
+MAKS = int(os.getenv("MIG_LAMBAT_MAKS", "10"))
+CEK = float(os.getenv("MIG_LAMBAT_CEK", "1"))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIAGNOSA_DIR = os.getenv("MIG_DIAGNOSA_DIR", os.path.join(BASE_DIR, "diagnosa"))
+
+STAGE = ("fetch", "tulis")
+
+
+# =====================================================
+# 2. TANGKAP BUKTI
+# =====================================================
+def tabel_teks(cur):
+    """Hasil query terakhir sebagai teks kolom dipisah tab."""
+    nama = [d[0] for d in cur.description]
+    baris = ["\t".join(nama)]
+    for row in cur.fetchall():
+        baris.append("\t".join("NULL" if v is None else str(v) for v in row))
+    return "\n".join(baris)
+
+
+def jalankan(engine, sql, params=None):
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute(sql, params)
+        if sql.startswith("SHOW ENGINE"):
+            teks = cur.fetchone()[2]
+        else:
+            teks = tabel_teks(cur)
+        cur.close()
+        raw.rollback()
+        return teks
+    except Exception as e:
+        return f"(gagal: {e})"
+    finally:
+        raw.close()
+
+
+def tulis_diagnosa(path, kasus, servers, explain):
+    bagian = ["===== BATCH LAMBAT ====="]
+    bagian += [f"{k:<12}: {v}" for k, v in kasus.items()]
+
+    sql, params = explain
+    for label, engine in servers:
+        if label.startswith("source"):
+            bagian.append(f"\n===== EXPLAIN ({label}) =====\n{sql} {params}")
+            bagian.append(jalankan(engine, "EXPLAIN " + sql, params))
+    for label, engine in servers:
+        bagian.append(f"\n===== SHOW FULL PROCESSLIST ({label}) =====")
+        bagian.append(jalankan(engine, "SHOW FULL PROCESSLIST"))
+        bagian.append(f"\n===== SHOW ENGINE INNODB STATUS ({label}) =====")
+        bagian.append(jalankan(engine, "SHOW ENGINE INNODB STATUS"))
+
+    os.makedirs(DIAGNOSA_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(bagian) + "\n")
+
+
+# =====================================================
+# 3. DETEKTOR
+# =====================================================
+class DeteksiLambat:
+    """
+    Satu detektor per tabel.
+        servers = [(label, engine)] yang ditangkap statusnya
+        explain = fungsi (lo, hi) → (sql, params) query batch source
+    Writer memanggil tulis_mulai() / batch(); reader didaftarkan lewat
+    pantau() dengan dict stat yang diisi baca_batch (fetch_mulai,
+    fetch_dari).
+    """
+
+    def __init__(self, tabel, servers, explain, telemetri=None):
+        self.tabel = tabel
+        self.servers = servers
+        self.explain = explain
+        self.telemetri = telemetri
+        self.aktif = FAKTOR > 0
+        self.latensi = {s: deque(maxlen=JENDELA) for s in STAGE}
+        self.ambang = dict.fromkeys(STAGE)       # ms, None = belum ada patokan
+        self.p95 = dict.fromkeys(STAGE)
+        self.reader = {}                         # nama → stat reader
+        self.tulis = None                        # (mulai, pk) batch di writer
+        self.sudah = set()                       # (stage, pk awal) tertangkap
+        self.lock = threading.Lock()
+        self.antre = queue.Queue()
+        self.tangkapan = []
+        self.thread = None
+
+    def keterangan(self):
+        if not self.aktif:
+            return "OFF"
+        return (f"> {FAKTOR:g}× p95 (min {MIN_MS:,.0f} ms, "
+                f"setelah {SAMPEL} batch) → {DIAGNOSA_DIR}")
+
+    # ---------- siklus ----------
+    def mulai(self):
+        if self.aktif:
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def selesai(self):
+        """Tunggu tangkapan yang masih antre. Aman dipanggil berulang."""
+        if self.thread is None:
+            return
+        self.antre.put(None)
+        self.thread.join()
+        self.thread = None
+
+    # ---------- dipanggil reader / writer ----------
+    def pantau(self, nama, stat):
+        self.reader[nama] = stat
+
+    def tulis_mulai(self, meta):
+        if self.aktif:
+            self.tulis = (time.monotonic(), meta.get("pk"))
+
+    def batch(self, meta, tulis_ms):
+        """Setelah commit: catat latensi, tangkap jika lambat (belum tertangkap)."""
+        if not self.aktif:
+            return
+        self.tulis = None
+        pk = meta.get("pk") or (None, None)
+        for stage, ms in (("fetch", meta.get("fetch_ms")), ("tulis", tulis_ms)):
+            if ms is None:
+                continue
+            ambang = self.ambang[stage]
+            if ambang is not None and ms > ambang:
+                self.tangkap(stage, ms, pk, "setelah selesai", meta.get("rentang"))
+            lat = self.latensi[stage]
+            lat.append(ms)
+            if len(lat) >= SAMPEL:
+                self.p95[stage] = persentil(lat, 95)
+                self.ambang[stage] = max(self.p95[stage] * FAKTOR, MIN_MS)
+
+    # ---------- tangkap ----------
+    def tangkap(self, stage, ms, pk, kapan, rentang=None):
+        kunci = (stage, pk[0])
+        with self.lock:      # writer + thread pemantau
+            if kunci in self.sudah or len(self.sudah) >= MAKS:
+                return
+            self.sudah.add(kunci)
+        self.antre.put(dict(
+            stage=stage,
+            kapan=kapan,
+            durasi_ms=round(ms, 1),
+            p95_ms=round(self.p95[stage], 1),
+            ambang_ms=round(self.ambang[stage], 1),
+            pk=pk,
+            rentang=rentang,
+            waktu=datetime.now().isoformat(timespec="seconds"),
+        ))
+
+    def periksa(self):
+        """Batch yang masih berjalan dan sudah melewati ambang."""
+        now = time.monotonic()
+        ambang = self.ambang["fetch"]
+        if ambang is not None:
+            for nama, stat in list(self.reader.items()):
+                mulai = stat.get("fetch_mulai")
+                if mulai is not None and (now - mulai) * 1000 > ambang:
+                    self.tangkap("fetch", (now - mulai) * 1000,
+                                 (stat.get("fetch_dari"), None),
+                                 f"masih berjalan ({nama})")
+        tulis = self.tulis
+        ambang = self.ambang["tulis"]
+        if ambang is not None and tulis is not None:
+            mulai, pk = tulis
+            if (now - mulai) * 1000 > ambang:
+                self.tangkap("tulis", (now - mulai) * 1000, pk or (None, None),
+                             "masih berjalan (writer)")
+
+    def simpan(self, kasus):
+        lo, hi = kasus["pk"]
+        path = os.path.join(
+            DIAGNOSA_DIR,
+            f"{self.tabel}_{datetime.now():%Y%m%d_%H%M%S}_{kasus['stage']}"
+            f"_{len(self.tangkapan) + 1}.txt")
+        try:
+            tulis_diagnosa(path, dict(tabel=self.tabel, **kasus),
+                           self.servers, self.explain(lo, hi))
+        except Exception as e:
+            print(f"\n⚠ Diagnosa batch lambat gagal disimpan: {e}")
+            return
+        self.tangkapan.append(path)
+        if self.telemetri is not None:
+            self.telemetri.event("lambat", file=path, **kasus)
+
+    def _loop(self):
+        while True:
+            try:
+                kasus = self.antre.get(timeout=CEK)
+            except queue.Empty:
+                kasus = False
+            if kasus is None:
+                break
+            if kasus:
+                self.simpan(kasus)
+            self.periksa()
+        # sisa antrean (batch lambat terakhir sebelum selesai)
+        while not self.antre.empty():
+            kasus = self.antre.get()
+            if kasus:
+                self.simpan(kasus)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ekstrak & muat data offline (untuk transfer antar jaringan / gladi ulang)
+FITUR:
+    - ekstrak : baca tabel source per batch → file chunk JSON-lines
+                terkompresi (gzip / lzma) + manifest.json (schema, range
+                PK, jumlah row, mode passthrough, sha256 per chunk);
+                semua tabel dibaca dari satu
+                snapshot konsisten, --readers N = N tabel paralel
+                (lihat snapshot_sumber.py), dari satu endpoint saja
+                (replika terbaik jika SRC_REPLICA_HOSTS diisi, lihat
+                sumber_replika.py) agar snapshot tetap satu titik waktu
+    - muat    : baca chunk (mmap), cek sha256, transform lewat SPEC yang
+                sama dengan engine_migrasi, insert ke target paralel;
+                ditolak jika MIG_PASSTHROUGH beda dengan saat ekstrak
+Format chunk hanya data (bukan pickle): satu row = satu array JSON, nilai
+non-JSON diberi tag {"b": base64} bytes, {"d": "..."} Decimal,
+{"dt": iso} datetime, {"da": iso} date, {"t": iso} time,
+{"td": [hari, detik, mikro]} timedelta (TIME). Chunk dari host lain tidak
+bisa menjalankan kode saat dimuat; sha256 hanya mendeteksi file rusak.
+Pakai:
+    python ekstrak_data.py ekstrak transaksi_lab transaksi_lab_detail
+    python ekstrak_data.py ekstrak transaksi_lab transaksi_lab_detail --readers 2
+    python ekstrak_data.py muat transaksi_lab --workers 4
+    (opsi --dir, default MIG_EKSTRAK_DIR atau folder ./ekstrak)
+Hanya tabel yang script-nya sudah memakai engine_migrasi (punya SPEC).
+"""
+
+import os
+import sys
+import json
+import gzip
+import lzma
+import mmap
+import base64
+import hashlib
+import queue
+import argparse
+import threading
+from decimal import Decimal
+from datetime import datetime, date, time, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import engine_migrasi as eng
+from snapshot_sumber import tutup_snapshot
+from sumber_replika import buka_koneksi, engine_koneksi
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.getenv("MIG_EKSTRAK_DIR", os.path.join(BASE_DIR, "ekstrak"))
+
+KOMPRESI = {
+    "gzip": (".jsonl.gz", gzip.compress, gzip.decompress),
+    "lzma": (".jsonl.xz", lzma.compress, lzma.decompress),
+}
+
+FORMAT = "jsonl-1"
+
+
+# =====================================================
+# 1b. FORMAT CHUNK (JSON-lines bertag)
+# =====================================================
+def _tag(v):
+    """json.dumps(default=...): nilai MySQL non-JSON → dict bertag."""
+    if isinstance(v, (bytes, bytearray)):
+        return {"b": base64.b64encode(v).decode("ascii")}
+    if isinstance(v, Decimal):
+        return {"d": str(v)}
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    if isinstance(v, date):
+        return {"da": v.isoformat()}
+    if isinstance(v, time):
+        return {"t": v.isoformat()}
+    if isinstance(v, timedelta):
+        return {"td": [v.days, v.seconds, v.microseconds]}
+    raise TypeError(f"Tipe {type(v).__name__} tidak didukung format chunk")
+
+
+UNTAG = {
+    "b": base64.b64decode,
+    "d": Decimal,
+    "dt": datetime.fromisoformat,
+    "da": date.fromisoformat,
+    "t": time.fromisoformat,
+    "td": lambda v: timedelta(days=v[0], seconds=v[1], microseconds=v[2]),
+}
+
+
+def _untag(obj):
+    # row tidak pernah berisi object JSON selain nilai bertag
+    if len(obj) != 1:
+        raise ValueError(f"Nilai chunk tidak dikenal: {obj!r}")
+    (tag, v), = obj.items()
+    if tag not in UNTAG:
+        raise ValueError(f"Tag chunk tidak dikenal: {tag!r}")
+    return UNTAG[tag](v)
+
+
+def encode_rows(rows):
+    return "\n".join(
+        json.dumps(row, default=_tag, separators=(",", ":"))
+        for row in rows).encode("utf-8")
+
+
+def decode_rows(data):
+    return [tuple(json.loads(line, object_hook=_untag))
+            for line in data.decode("utf-8").split("\n") if line]
+
+
+def baca_manifest(folder):
+    path = os.path.join(folder, "manifest.json")
+    if not os.path.exists(path):
+        return {"tabel": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tulis_manifest(folder, manifest):
+    path = os.path.join(folder, "manifest.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+# =====================================================
+# 2. EKSTRAK (source → file chunk)
+# =====================================================
+def ekstrak_tabel(src, raw, tabel, folder, kompresi, tampil=True):
+    """
+    raw = koneksi snapshot source (lihat snapshot_sumber.py), src =
+    engine asal koneksi itu.
+    """
+    spec = eng.muat_spec(tabel)
+    ext, compress, _ = KOMPRESI[kompresi]
+    pk_idx = spec["kolom_sumber"].index(spec["pk"])
+
+    tabel_dir = os.path.join(folder, tabel)
+    os.makedirs(tabel_dir, exist_ok=True)
+
+    cur = raw.cursor()
+    cur.execute(f"SHOW CREATE TABLE `{spec['tabel']}`")
+    ddl = cur.fetchone()[1]
+    cur.execute(f"SELECT COUNT(*) FROM `{spec['tabel']}`")
+    total_rows = cur.fetchone()[0]
+    cur.close()
+
+    if tampil:
+        print(f"\n📦 EKSTRAK {tabel} ({total_rows} row)")
+
+    chunks = []
+    done = 0
+    for no, rows in enumerate(eng.baca_batch(src, spec, raw=raw), start=1):
+        if isinstance(rows, eng.BatchKolom):
+            pk_min, pk_max = rows.row(0)[pk_idx], rows.row(len(rows) - 1)[pk_idx]
+        else:
+            pk_min, pk_max = rows[0][pk_idx], rows[-1][pk_idx]
+
+        blob = compress(encode_rows(rows))
+        nama = f"{tabel}_{no:05d}{ext}"
+        with open(os.path.join(tabel_dir, nama), "wb") as f:
+            f.write(blob)
+
+        chunks.append({
+            "file": nama,
+            "rows": len(rows),
+            "pk_min": pk_min,
+            "pk_max": pk_max,
+            "bytes": len(blob),
+            "sha256": hashlib.sha256(blob).hexdigest(),
+        })
+        done += len(rows)
+        if tampil:
+            eng.progress_bar(done, total_rows, tabel=tabel)
+
+    if tampil:
+        print()
+    return {
+        "pk": spec["pk"],
+        "kolom_sumber": spec["kolom_sumber"],
+        "ddl_source": ddl,
+        "kompresi": kompresi,
+        "format": FORMAT,
+        "passthrough": eng.PASSTHROUGH,
+        "total_rows": done,
+        "pk_min": chunks[0]["pk_min"] if chunks else None,
+        "pk_max": chunks[-1]["pk_max"] if chunks else None,
+        "chunks": chunks,
+        "diekstrak": datetime.now().isoformat(),
+    }
+
+
+def cmd_ekstrak(args):
+    endpoints = eng.engine_sumber(passthrough=eng.PASSTHROUGH)
+    os.makedirs(args.dir, exist_ok=True)
+    manifest = baca_manifest(args.dir)
+    manifest["source_db"] = eng.source_config["database"]
+    manifest["passthrough"] = eng.PASSTHROUGH
+
+    readers = max(min(args.readers, len(args.tabel)), 1)
+    # satu endpoint: snapshot lintas server tidak satu titik waktu
+    conns, keterangan = buka_koneksi(endpoints[0], readers)
+    manifest["snapshot"] = keterangan
+    print(f"📌 Snapshot : {keterangan} ({readers} koneksi)")
+
+    try:
+        if readers == 1:
+            for tabel in args.tabel:
+                manifest["tabel"][tabel] = ekstrak_tabel(
+                    engine_koneksi(endpoints, conns[0]), conns[0], tabel,
+                    args.dir, args.kompresi)
+                # manifest ditulis tiap tabel selesai → ekstrak bisa dilanjut
+                tulis_manifest(args.dir, manifest)
+        else:
+            bebas = queue.Queue()
+            for raw in conns:
+                bebas.put(raw)
+
+            def kerja(tabel):
+                raw = bebas.get()
+                try:
+                    return ekstrak_tabel(engine_koneksi(endpoints, raw), raw,
+                                         tabel, args.dir, args.kompresi,
+                                         tampil=False)
+                finally:
+                    bebas.put(raw)
+
+            with ThreadPoolExecutor(max_workers=readers) as ex:
+                futures = {ex.submit(kerja, t): t for t in args.tabel}
+                for fut in as_completed(futures):
+                    tabel = futures[fut]
+                    manifest["tabel"][tabel] = fut.result()
+                    tulis_manifest(args.dir, manifest)
+                    print(f"   ✔ {tabel}: "
+                          f"{manifest['tabel'][tabel]['total_rows']} row")
+    finally:
+        tutup_snapshot(conns)
+
+    print(f"\n✅ Manifest: {os.path.join(args.dir, 'manifest.json')}")
+
+
+# =====================================================
+# 3. MUAT (file chunk → target, paralel)
+# =====================================================
+def baca_chunk(path, sha256, decompress):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hashlib.sha256(mm).hexdigest() != sha256:
+                raise ValueError(f"Checksum tidak cocok: {path}")
+            return decode_rows(decompress(mm))
+
+
+def muat_chunk(tgt, plan, insert_sql, path, chunk, decompress):
+    rows = baca_chunk(path, chunk["sha256"], decompress)
+    out = []
+    eng.transform_batch(plan, rows, out)
+
+    raw = tgt.raw_connection()
+    try:
+        cur = raw.cursor()
+        try:
+            if out:
+                eng.executemany(cur, insert_sql, out)
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        cur.close()
+    finally:
+        raw.close()
+    return len(rows), len(out)
+
+
+def muat_tabel(tgt, tabel, info, folder, workers):
+    spec = eng.muat_spec(tabel)
+    if info["kolom_sumber"] != spec["kolom_sumber"]:
+        raise ValueError(
+            f"Kolom ekstrak {tabel} beda dengan SPEC sekarang, ekstrak ulang")
+    if info.get("format") != FORMAT:
+        raise ValueError(
+            f"Format chunk {tabel} ({info.get('format', 'pickle')}) tidak "
+            f"didukung, ekstrak ulang")
+    # row mentah (passthrough) vs sudah dikonversi PyMySQL: transform beda
+    if info["passthrough"] != eng.PASSTHROUGH:
+        raise ValueError(
+            f"Chunk {tabel} diekstrak dengan MIG_PASSTHROUGH="
+            f"{int(info['passthrough'])}, sekarang {int(eng.PASSTHROUGH)}")
+
+    _, _, decompress = KOMPRESI[info["kompresi"]]
+    plan = eng.build_plan(spec)
+    insert_sql = eng.build_insert(spec, eng.dukung_alias(tgt))
+    total_rows = info["total_rows"]
+
+    print(f"\n📥 MUAT {tabel} ({total_rows} row, "
+          f"{len(info['chunks'])} chunk, {workers} worker)")
+
+    processed = 0
+    inserted = 0
+    lock = threading.Lock()
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [
+            ex.submit(muat_chunk, tgt, plan, insert_sql,
+                      os.path.join(folder, tabel, c["file"]), c, decompress)
+            for c in info["chunks"]
+        ]
+        for fut in as_completed(futures):
+            n_rows, n_out = fut.result()
+            with lock:
+                processed += n_rows
+                inserted += n_out
+            eng.progress_bar(processed, total_rows, tabel=tabel)
+
+    print()
+    return inserted
+
+
+def cmd_muat(args):
+    manifest = baca_manifest(args.dir)
+    tabel_list = args.tabel or list(manifest["tabel"])
+    tgt = eng.make_engine(eng.target_config)
+
+    for tabel in tabel_list:
+        info = manifest["tabel"].get(tabel)
+        if info is None:
+            print(f"❌ Tabel {tabel} tidak ada di manifest {args.dir}")
+            sys.exit(1)
+        try:
+            inserted = muat_tabel(tgt, tabel, info, args.dir, args.workers)
+        except Exception as e:
+            print(f"\n❌ ERROR MUAT {tabel}!")
+            print("Error:", e)
+            sys.exit(1)
+        print(f"✔ {tabel}: {inserted} row dimuat")
+
+
+# =====================================================
+# 4. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstrak / muat data migrasi")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_ekstrak = sub.add_parser("ekstrak", help="source → file chunk")
+    p_ekstrak.add_argument("tabel", nargs="+")
+    p_ekstrak.add_argument("--dir", default=DEFAULT_DIR)
+    p_ekstrak.add_argument("--kompresi", choices=list(KOMPRESI),
+                           default="gzip")
+    p_ekstrak.add_argument("--readers", type=int, default=1,
+                           help="koneksi source paralel (snapshot per endpoint)")
+
+    p_muat = sub.add_parser("muat", help="file chunk → target")
+    p_muat.add_argument("tabel", nargs="*",
+                        help="kosong = semua tabel di manifest")
+    p_muat.add_argument("--dir", default=DEFAULT_DIR)
+    p_muat.add_argument("--workers", type=int, default=4)
+
+    args = parser.parse_args()
+
+    print("==============================================================")
+    print(f"🚀 {args.cmd.upper()} DATA MIGRASI — folder {args.dir}")
+    print("==============================================================")
+
+    if args.cmd == "ekstrak":
+        cmd_ekstrak(args)
+    else:
+        cmd_muat(args)
+
+    print("\n⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
@@ -6,18 +6,38 @@ Script: truncate_except_laravel.py
 Deskripsi:
     - Mengosongkan SEMUA tabel pada database target
     - KECUALI tabel penting Laravel + tambahan user
+    - Tabel yang sudah kosong (row 0 + auto_increment belum jalan) dilewati
+    - TRUNCATE paralel di beberapa koneksi (MIG_TRUNCATE_WORKERS)
+    - Opsional MIG_TRUNCATE_MODE=recreate → DROP + CREATE dari DDL
+      SHOW CREATE TABLE (disimpan dulu ke ddl_cache_<db>_<waktu>.json,
+      file baru tiap run → cache run sebelumnya tidak pernah ditimpa)
     - Menggunakan konfigurasi dari .env
 """
 
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import re
+import sys
+import glob
+import json
+
+import sidik_tabel
 
 
 # === [1] LOAD ENV FILE ===
 load_dotenv()
 
+# Jumlah koneksi TRUNCATE paralel
+TRUNCATE_WORKERS = int(os.getenv("MIG_TRUNCATE_WORKERS", "4"))
+
+# truncate → TRUNCATE biasa | recreate → DROP + CREATE dari DDL
+TRUNCATE_MODE = os.getenv("MIG_TRUNCATE_MODE", "truncate")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 # === [2] KONFIG DATABASE TARGET ===
 target_config = {
@@ -41,7 +61,12 @@ print("=======================================")
 print("      🔥 TRUNCATE DATABASE SAFELY")
 print("=======================================\n")
 print(f"📌 Target DB   : {target_config['database']}")
-print(f"📌 Target Host : {target_config['host']}\n")
+print(f"📌 Target Host : {target_config['host']}")
+print(f"📌 Mode        : {TRUNCATE_MODE} ({TRUNCATE_WORKERS} koneksi)\n")
+
+if TRUNCATE_MODE not in ("truncate", "recreate"):
+    print(f"❌ MIG_TRUNCATE_MODE '{TRUNCATE_MODE}' tidak dikenal")
+    sys.exit(1)
 
 
 # === [4] Tabel yang tidak boleh dihapus ===
@@ -59,15 +84,53 @@ protected_tables = {
 }
 
 
-# === [5] Ambil semua tabel ===
-inspector = inspect(tgt_engine)
-all_tables = inspector.get_table_names()
+# === [5] Ambil semua tabel + perkiraan isi ===
+QUERY_TABEL = """
+SELECT table_name, table_rows, auto_increment
+FROM information_schema.tables
+WHERE table_schema = DATABASE() AND table_type = 'BASE TABLE'
+ORDER BY table_name
+"""
+
+with tgt_engine.connect() as conn:
+    try:
+        # MySQL 8 meng-cache statistik information_schema → minta yang terbaru
+        conn.exec_driver_sql("SET SESSION information_schema_stats_expiry = 0")
+    except Exception:
+        pass  # MySQL 5.7 / MariaDB: variabel tidak ada, statistik sudah live
+    table_stats = {
+        t: (rows, ai) for t, rows, ai in conn.exec_driver_sql(QUERY_TABEL)
+    }
+
+all_tables = list(table_stats)
 
 print(f"📌 Total tabel ditemukan : {len(all_tables)}\n")
 
 
 # === [6] Tentukan tabel yang boleh di-truncate ===
-truncate_tables = [t for t in all_tables if t not in protected_tables]
+# Tabel yang tidak berubah sejak load terakhir (MIG_SIDIK=1) tidak dikosongkan
+unchanged_tables = sidik_tabel.baca_rencana()
+candidate_tables = [t for t in all_tables
+                    if t not in protected_tables and t not in unchanged_tables]
+
+
+def sudah_kosong(conn, table):
+    """
+    Kosong = perkiraan row 0, auto_increment belum bergeser (TRUNCATE
+    juga me-reset AI, jadi tabel kosong dengan AI > 1 tetap di-truncate),
+    dan dipastikan dengan SELECT 1 ... LIMIT 1 (table_rows InnoDB hanya
+    perkiraan).
+    """
+    rows, ai = table_stats[table]
+    if rows or (ai is not None and ai > 1):
+        return False
+    return conn.exec_driver_sql(
+        f"SELECT 1 FROM `{table}` LIMIT 1").first() is None
+
+
+with tgt_engine.connect() as conn:
+    empty_tables = [t for t in candidate_tables if sudah_kosong(conn, t)]
+truncate_tables = [t for t in candidate_tables if t not in empty_tables]
 
 print("🔍 TABEL YANG AKAN DI-TRUNCATE:")
 for t in truncate_tables:
@@ -77,29 +140,83 @@ print("\n🔒 TABEL YANG DILINDUNGI (SKIP):")
 for t in protected_tables:
     print(" -", t)
 
-
-# === [7] Eksekusi truncate dengan FK_CHECKS OFF ===
-with tgt_engine.connect() as conn:
-    trans = conn.begin()
-    try:
-        print("\n🚫 Menonaktifkan FOREIGN_KEY_CHECKS...")
+if unchanged_tables:
+    print("\n⏭ TABEL TIDAK BERUBAH (SKIP, lihat sidik_tabel.py):")
+    for t in sorted(unchanged_tables):
+        print(" -", t)
+
+print(f"\n⏭ TABEL SUDAH KOSONG (SKIP): {len(empty_tables)} tabel")
+
+
+# === [7] Simpan DDL (mode recreate) ===
+RE_AUTO_INCREMENT = re.compile(r"\s+AUTO_INCREMENT=\d+")
+
+ddl_cache = {}
+ddl_lama = sorted(glob.glob(os.path.join(
+    BASE_DIR, f"ddl_cache_{target_config['database']}_*.json")))
+if ddl_lama:
+    # run recreate sebelumnya putus setelah DROP → tabel hilang dari target
+    with open(ddl_lama[-1], "r", encoding="utf-8") as f:
+        hilang = sorted(set(json.load(f)) - set(all_tables))
+    if hilang:
+        print(f"\n⚠ {len(hilang)} tabel di {os.path.basename(ddl_lama[-1])} "
+              "tidak ada di target, buat ulang dari file itu:")
+        for t in hilang:
+            print(" -", t)
+
+if TRUNCATE_MODE == "recreate" and truncate_tables:
+    with tgt_engine.connect() as conn:
+        for t in truncate_tables:
+            ddl = conn.exec_driver_sql(f"SHOW CREATE TABLE `{t}`").fetchone()[1]
+            ddl_cache[t] = RE_AUTO_INCREMENT.sub("", ddl)
+
+    # disimpan ke file → tabel bisa dibuat manual jika CREATE gagal.
+    # File baru tiap run ("x" = tidak menimpa): run berikutnya setelah
+    # DROP yang gagal tidak boleh menimpa satu-satunya DDL yang utuh
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ddl_file = os.path.join(
+        BASE_DIR, f"ddl_cache_{target_config['database']}_{ts}.json")
+    with open(ddl_file, "x", encoding="utf-8") as f:
+        json.dump(ddl_cache, f, indent=2)
+    print(f"\n💾 DDL disimpan: {ddl_file}")
+
+
+# === [8] Eksekusi paralel dengan FK_CHECKS OFF (per koneksi) ===
+def kosongkan(table):
+    with tgt_engine.connect() as conn:
         conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0;")
-
-        for table in truncate_tables:
-            sql = f"TRUNCATE `{table}`;"
-            conn.exec_driver_sql(sql)
-            print(f"   ✔ TRUNCATED: {table}")
-
-        print("\n🔁 Mengaktifkan kembali FOREIGN_KEY_CHECKS...")
-        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1;")
-
-        trans.commit()
-        print("\n🎉 BERHASIL! Semua tabel yang tidak dilindungi telah di-empty.")
-    except Exception as e:
-        trans.rollback()
-        print("❌ ERROR! Semua perubahan dibatalkan.")
-        print("   ➜", e)
+        try:
+            if TRUNCATE_MODE == "recreate":
+                conn.exec_driver_sql(f"DROP TABLE `{table}`;")
+                conn.exec_driver_sql(ddl_cache[table])
+            else:
+                conn.exec_driver_sql(f"TRUNCATE `{table}`;")
+        finally:
+            conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1;")
+    return table
+
+
+errors = []
+print("\n🚫 FOREIGN_KEY_CHECKS dinonaktifkan per koneksi...")
+with ThreadPoolExecutor(max_workers=max(TRUNCATE_WORKERS, 1)) as ex:
+    futures = {ex.submit(kosongkan, t): t for t in truncate_tables}
+    for fut in as_completed(futures):
+        try:
+            print(f"   ✔ TRUNCATED: {fut.result()}")
+        except Exception as e:
+            errors.append((futures[fut], e))
+            print(f"   ❌ GAGAL: {futures[fut]}")
+
+if errors:
+    print("\n❌ ERROR! Sebagian tabel gagal dikosongkan:")
+    for table, e in errors:
+        print(f"   ➜ {table}: {e}")
+else:
+    print("\n🎉 BERHASIL! Semua tabel yang tidak dilindungi telah di-empty.")
 
 
 print("\n⏱ Selesai:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 print("\n=======================================\n")
+
+if errors:
+    sys.exit(1)
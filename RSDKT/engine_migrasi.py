@@ -0,0 +1,953 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Engine migrasi bersama (source → target)
+FITUR:
+    - Konfigurasi DB + batch dari .env (sama seperti script migrasi lain)
+    - Reader baca per batch berdasarkan PK (keyset), di-prefetch ke antrean,
+      kecepatan baca source bisa dibatasi (lihat throttle_sumber.py)
+    - Reader paralel per rentang PK (MIG_READERS) dalam satu snapshot
+      konsisten per tabel — bukan lintas tabel / script (lihat
+      snapshot_sumber.py)
+    - Source bisa lebih dari satu endpoint (primary + replika, cek lag
+      dulu), lihat sumber_replika.py
+    - Transform per row berupa tuple posisi, opsional paralel di
+      process pool (MIG_WORKERS): plan transform dikirim sekali lewat
+      initializer, batch row di-pickle ke worker dan hasilnya kembali
+      (BUKAN multiprocessing.shared_memory — nilai str / datetime /
+      Decimal panjangnya bervariasi, tetap perlu serialisasi)
+    - Writer bulk: statement %s dibangun sekali, satu executemany
+      + commit per batch; upsert memakai alias baris (INSERT ... AS
+      _baru ON DUPLICATE KEY UPDATE c = _baru.c) di MySQL ≥ 8.0.19,
+      VALUES(c) di MariaDB / MySQL lama
+    - Telemetri (telemetri.py): row/s, MB/s, ETA, porsi waktu fetch /
+      transform / write / commit, event JSON per batch, byte dibaca /
+      ditulis per kolom (sampel)
+    - Riwayat run (riwayat_run.py): ringkasan tiap tabel disimpan ke
+      SQLite lokal untuk baseline durasi + deteksi regresi
+    - Sampler status server source + target (status_server.py): delta
+      SHOW GLOBAL STATUS berdampingan dengan metrik batch
+    - Batch lambat (> kelipatan p95) → INNODB STATUS, PROCESSLIST,
+      EXPLAIN, rentang PK ditangkap otomatis (diagnosa_lambat.py)
+    - Metrik Prometheus / OpenMetrics: textfile node_exporter + HTTP
+      lokal opsional (metrik_prometheus.py)
+    - Memori (memori.py): puncak RSS per tabel / stage, tracemalloc
+      opsional, budget memori → batch / antrean dikecilkan, bukan OOM
+    - Dasbor (MIG_DASBOR=1): status tabel + tahap writer untuk dasbor.py
+    - Penjaga batch (jaga_batch.py): tenggat per batch → KILL QUERY,
+      reconnect + ulang batch dengan backoff untuk deadlock / lock wait /
+      koneksi putus, pool_pre_ping + timeout koneksi
+    - Batch kolomnar (MIG_BATCH_KOLOMNAR=1): batch di antrean prefetch
+      disimpan per kolom (lihat batch_kolom.py) → prefetch bisa lebih dalam
+    - Mode tulis per tabel (SPEC "mode_tulis"): insert / ignore / upsert
+      → rerun tidak wajib TRUNCATE dulu
+    - Deteksi perubahan per row (SPEC "hash_row": True): hanya row baru /
+      berubah yang ditulis, lihat hash_row.py
+    - Mode bayangan (MIG_SHADOW=1): insert ke <tabel>__new, lalu ditukar
+      atomik oleh tabel_bayangan.py
+    - Mode passthrough (MIG_PASSTHROUGH=1): DATETIME/DATE/TIME/DECIMAL
+      dari source tidak di-parse, dikirim apa adanya (str) ke target
+Dipakai oleh script migrasi_<tabel>.py yang mendefinisikan SPEC:
+    SPEC = {
+        "tabel": "transaksi_lab",          # tabel source
+        "tabel_target": "transaksi_lab",   # opsional, default = tabel
+        "pk": "id_transaksi_lab",          # kolom urut batch (keyset)
+        "kolom_sumber": [...],             # kolom SELECT dari source
+        "kolom_target": [...],             # kolom INSERT ke target
+        "kolom_hitung": [...],             # opsional, kolom hasil transform
+        "transform": transform,            # opsional, tuple source →
+                                           # tuple kolom_hitung / None (skip)
+        "default": {"kolom": nilai},       # opsional, kolom target konstan
+        "decode": {"kolom": fungsi},       # opsional, hanya di passthrough:
+                                           # kolom yang DIBACA transform
+        "kolom_kamus": [...],              # opsional, kolom string dengan
+                                           # sedikit nilai unik (kolomnar)
+        "mode_tulis": "upsert",            # opsional, lihat MODE_TULIS
+        "hash_row": True,                  # opsional, butuh mode upsert
+    }
+Nilai kolom target diambil dari kolom_hitung, lalu kolom_sumber dengan
+nama sama, lalu default.
+"""
+
+import os
+import re
+import sys
+import time
+import importlib
+import queue
+import functools
+import threading
+from contextlib import nullcontext
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from operator import itemgetter
+from dotenv import load_dotenv
+from pymysql import converters
+from pymysql.constants import FIELD_TYPE
+from sqlalchemy import create_engine, text
+
+from batch_kolom import BatchKolom
+from telemetri import Telemetri, Profil, byte_kolom, progress_bar  # noqa: F401
+import riwayat_run
+from hash_row import CacheHash, path_cache, sidik_target
+from throttle_sumber import PembatasSumber
+from status_server import SamplerStatus
+from diagnosa_lambat import DeteksiLambat
+from metrik_prometheus import EksporMetrik
+from memori import Memori
+from jaga_batch import (JagaBatch, opsi_engine, koneksi_putus, buang_koneksi)
+from snapshot_sumber import tutup_snapshot, mulai_snapshot
+from sumber_replika import (REPLICA_HOSTS, pilih_endpoint, endpoint_tabel,
+                            buka_koneksi, engine_koneksi)
+
+
+# =====================================================
+# 1. LOAD ENV
+# =====================================================
+load_dotenv()
+
+BATCH_SIZE = int(os.getenv("MIG_BATCH_SIZE", "10000"))
+
+# Jumlah proses transform (0/1 = transform di proses utama)
+WORKERS = int(os.getenv("MIG_WORKERS", "0"))
+
+# Jumlah batch yang boleh dibaca duluan sebelum ditulis
+PREFETCH = int(os.getenv("MIG_PREFETCH", "2"))
+
+# Jumlah koneksi reader paralel per tabel (dibagi per rentang PK,
+# semua dalam satu snapshot konsisten, lihat snapshot_sumber.py)
+READERS = int(os.getenv("MIG_READERS", "1"))
+
+# Simpan batch prefetch dalam bentuk kolomnar (hemat memori)
+KOLOMNAR = os.getenv("MIG_BATCH_KOLOMNAR", "0") == "1"
+
+# Mode tulis default untuk SPEC yang tidak menyebut "mode_tulis":
+#   insert → INSERT biasa (gagal jika PK sudah ada)
+#   ignore → INSERT IGNORE (row yang PK-nya sudah ada dilewati)
+#   upsert → INSERT ... ON DUPLICATE KEY UPDATE (row lama ditimpa)
+MODE_TULIS = ("insert", "ignore", "upsert")
+DEFAULT_MODE_TULIS = os.getenv("MIG_MODE_TULIS", "insert")
+
+# 0 = abaikan SPEC "hash_row" (paksa tulis penuh seperti biasa)
+HASH_ROW = os.getenv("MIG_HASH_ROW", "1") == "1"
+
+# Tulis ke tabel bayangan <tabel>__new (lihat tabel_bayangan.py)
+SHADOW = os.getenv("MIG_SHADOW", "0") == "1"
+SHADOW_SUFFIX = "__new"
+
+# Kolom tanggal/desimal source tidak di-decode ke datetime/Decimal
+PASSTHROUGH = os.getenv("MIG_PASSTHROUGH", "0") == "1"
+
+source_config = {
+    "host": os.getenv("SRC_HOST"),
+    "user": os.getenv("SRC_USER"),
+    "password": os.getenv("SRC_PASSWORD"),
+    "database": os.getenv("SRC_DATABASE"),
+}
+
+target_config = {
+    "host": os.getenv("TGT_HOST"),
+    "user": os.getenv("TGT_USER"),
+    "password": os.getenv("TGT_PASSWORD"),
+    "database": os.getenv("TGT_DATABASE"),
+}
+
+
+# =====================================================
+# 2. ENGINE
+# =====================================================
+# Tipe yang dibiarkan sebagai str apa adanya di mode passthrough.
+# Nilai seperti '0000-00-00 00:00:00' ikut lolos tanpa diubah.
+PASSTHROUGH_TYPES = (
+    FIELD_TYPE.DATETIME,
+    FIELD_TYPE.TIMESTAMP,
+    FIELD_TYPE.DATE,
+    FIELD_TYPE.TIME,
+    FIELD_TYPE.DECIMAL,
+    FIELD_TYPE.NEWDECIMAL,
+)
+
+
+def konversi_passthrough():
+    """Tabel konversi PyMySQL tanpa decoder untuk PASSTHROUGH_TYPES."""
+    conv = dict(converters.conversions)
+    for t in PASSTHROUGH_TYPES:
+        conv.pop(t, None)
+    return conv
+
+
+def make_engine(cfg, passthrough=False):
+    opsi = opsi_engine()
+    if passthrough:
+        opsi["connect_args"]["conv"] = konversi_passthrough()
+    return create_engine(
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi,
+    )
+
+
+def engine_sumber(passthrough=False):
+    """[(host, engine)] source yang layak dibaca (primary + replika)."""
+    primary = make_engine(source_config, passthrough=passthrough)
+    if not REPLICA_HOSTS:
+        return [(source_config["host"], primary)]
+    replika = [(host, make_engine(dict(source_config, host=host),
+                                  passthrough=passthrough))
+               for host in REPLICA_HOSTS]
+    return pilih_endpoint(source_config["host"], primary, replika)
+
+
+# =====================================================
+# 3. BUILDER QUERY + RENCANA KOLOM
+# =====================================================
+def muat_spec(tabel):
+    """Ambil SPEC dari script migrasi_<tabel>.py (harus sudah pakai engine)."""
+    modul = importlib.import_module(f"migrasi_{tabel}")
+    spec = getattr(modul, "SPEC", None)
+    if spec is None:
+        raise ValueError(
+            f"migrasi_{tabel}.py belum memakai engine_migrasi (tidak ada SPEC)")
+    return spec
+
+
+def build_select(spec, lanjut=False, sampai=False, limit=None):
+    cols = ", ".join(f"`{c}`" for c in spec["kolom_sumber"])
+    pk = spec["pk"]
+    where = f"WHERE `{pk}` > %s " if lanjut else ""
+    if sampai:
+        where += f"AND `{pk}` <= %s "
+    return (
+        f"SELECT {cols} FROM `{spec['tabel']}` {where}"
+        f"ORDER BY `{pk}` LIMIT {limit or BATCH_SIZE}"
+    )
+
+
+def build_explain(spec, lo, hi):
+    """(sql, params) query batch untuk PK lo < pk <= hi (diagnosa)."""
+    if lo is None:
+        return build_select(spec), None
+    if hi is None:
+        return build_select(spec, lanjut=True), (lo,)
+    return build_select(spec, lanjut=True, sampai=True), (lo, hi)
+
+
+def nama_target(spec):
+    """Nama tabel tujuan insert (ditambah __new di mode bayangan)."""
+    tabel = spec.get("tabel_target", spec["tabel"])
+    return tabel + SHADOW_SUFFIX if SHADOW else tabel
+
+
+def mode_tulis(spec):
+    mode = spec.get("mode_tulis", DEFAULT_MODE_TULIS)
+    if mode not in MODE_TULIS:
+        raise ValueError(f"mode_tulis '{mode}' tidak dikenal {MODE_TULIS}")
+    return mode
+
+
+def pakai_hash(spec):
+    if not (HASH_ROW and spec.get("hash_row")):
+        return False
+    if mode_tulis(spec) != "upsert":
+        raise ValueError("hash_row butuh mode_tulis 'upsert'")
+    return True
+
+
+# Alias baris upsert; VALUES(col) di ON DUPLICATE KEY UPDATE deprecated
+# sejak MySQL 8.0.20
+AS_BARIS = " AS `_baru` ON DUPLICATE KEY UPDATE "
+
+
+def dukung_alias(tgt):
+    """
+    True jika server target MySQL ≥ 8.0.19 (punya alias baris untuk
+    upsert). MariaDB tidak punya, tetap VALUES(col).
+    """
+    with tgt.connect() as conn:
+        versi = conn.execute(text("SELECT VERSION()")).scalar()
+    if "mariadb" in versi.lower():
+        return False
+    angka = tuple(int(x) for x in re.findall(r"\d+", versi)[:3])
+    return angka >= (8, 0, 19)
+
+
+def build_insert(spec, alias=False):
+    """
+    Statement multi-row (PyMySQL executemany menggabungkan VALUES jadi
+    satu INSERT besar, termasuk yang ber-ON DUPLICATE KEY UPDATE).
+    alias=True (hasil dukung_alias) → upsert pakai alias baris; tulis
+    lewat executemany() di bawah, bukan cur.executemany langsung.
+    """
+    tabel = nama_target(spec)
+    mode = mode_tulis(spec)
+    cols = ", ".join(f"`{c}`" for c in spec["kolom_target"])
+    params = ", ".join(["%s"] * len(spec["kolom_target"]))
+    ignore = "IGNORE " if mode == "ignore" else ""
+    sql = f"INSERT {ignore}INTO `{tabel}` ({cols}) VALUES ({params})"
+
+    if mode == "upsert":
+        baru = "`_baru`.`{}`" if alias else "VALUES(`{}`)"
+        update = ", ".join(
+            f"`{c}` = " + baru.format(c)
+            for c in spec["kolom_target"] if c != spec["pk"])
+        sql += (AS_BARIS if alias else " ON DUPLICATE KEY UPDATE ") + update
+    return sql
+
+
+def executemany(cur, sql, data):
+    """
+    cur.executemany yang tetap multi-row untuk upsert alias baris.
+    PyMySQL hanya menggabungkan VALUES jika langsung diikuti
+    "ON DUPLICATE"; dengan "AS `_baru`" ia jatuh ke satu INSERT per row,
+    jadi bagian statement dipecah sendiri ke _do_execute_many.
+    """
+    if AS_BARIS not in sql:
+        return cur.executemany(sql, data)
+    if not data:
+        return None
+    awal, sisa = sql.split(" VALUES ", 1)
+    values, update = sisa.split(AS_BARIS, 1)
+    return cur._do_execute_many(
+        awal + " VALUES ", values, AS_BARIS + update, data,
+        cur.max_stmt_length, cur._get_db().encoding)
+
+
+def build_plan(spec):
+    """
+    Hitung sekali posisi tiap kolom target di tuple gabungan
+    (row source + hasil transform + konstanta default), supaya
+    per row cukup satu itemgetter tanpa dict.
+    """
+    sumber = spec["kolom_sumber"]
+    hitung = spec.get("kolom_hitung", [])
+    default = spec.get("default", {})
+    konstan_kolom = list(default)
+
+    posisi = []
+    for col in spec["kolom_target"]:
+        if col in hitung:
+            posisi.append(len(sumber) + hitung.index(col))
+        elif col in sumber:
+            posisi.append(sumber.index(col))
+        elif col in default:
+            posisi.append(len(sumber) + len(hitung) + konstan_kolom.index(col))
+        else:
+            raise ValueError(
+                f"Kolom target '{col}' tidak ada di source/hitung/default")
+
+    decode = {}
+    if PASSTHROUGH:
+        decode = {sumber.index(c): fn
+                  for c, fn in spec.get("decode", {}).items()}
+
+    return {
+        "transform": spec.get("transform"),
+        "ambil": itemgetter(*posisi),
+        "konstan": tuple(default[c] for c in konstan_kolom),
+        "decode": decode,
+    }
+
+
+# =====================================================
+# 4. READER (keyset per PK)
+# =====================================================
+def baca_batch(src, spec, pembatas=None, raw=None, rentang=None, stat=None,
+               jaga=None, nama="reader"):
+    """
+    Generator batch source berupa tuple of tuple (urutan kolom_sumber),
+    atau BatchKolom jika MIG_BATCH_KOLOMNAR=1.
+    `pembatas` (PembatasSumber) mengatur jeda baca; default dari env.
+    `raw` = koneksi snapshot (lihat snapshot_sumber.py): transaksi tidak
+    ditutup per batch dan koneksi tidak ditutup di sini.
+    `rentang` = (lo, hi) → hanya PK lo < pk <= hi (reader paralel).
+    `stat` (dict) diisi fetch_ms, perkiraan bytes (total + per kolom,
+    dari sampel row) & rentang PK (pk) batch terakhir, plus fetch_mulai /
+    fetch_dari selama query berjalan (dipantau diagnosa_lambat.py).
+    stat["batch_size"] (diisi memori.py saat budget memori terlampaui)
+    mengecilkan LIMIT mulai batch berikutnya.
+    `jaga` (JagaBatch) memberi tenggat per query dan mengulang batch yang
+    gagal karena error sementara; koneksi putus dibuka ulang dari `src`
+    (koneksi snapshot diganti snapshot baru milik reader ini sendiri).
+    """
+    if pembatas is None:
+        pembatas = PembatasSumber()
+    kolom = spec["kolom_sumber"]
+    kolom_kamus = set(spec.get("kolom_kamus", ()))
+    pk_idx = kolom.index(spec["pk"])
+    limit = BATCH_SIZE
+    sql_awal = build_select(spec)
+    sql_lanjut = build_select(spec, lanjut=True, sampai=rentang is not None)
+    last = None if rentang is None else rentang[0]
+
+    snapshot = raw is not None
+    milik = not snapshot     # koneksi ditutup di sini
+    if milik:
+        raw = src.raw_connection()
+    try:
+        cur = raw.cursor()
+        while True:
+            if stat is not None and stat.get("batch_size", limit) != limit:
+                limit = stat["batch_size"]
+                sql_awal = build_select(spec, limit=limit)
+                sql_lanjut = build_select(spec, lanjut=True,
+                                          sampai=rentang is not None,
+                                          limit=limit)
+            mulai = time.monotonic()
+            if stat is not None:
+                stat["fetch_mulai"] = mulai
+                stat["fetch_dari"] = last
+            ke = 0
+            putus = False
+            while True:
+                try:
+                    if putus:
+                        raw = src.raw_connection()
+                        milik = True
+                        if snapshot:
+                            mulai_snapshot(raw.cursor())
+                            print(f"\n⚠ {nama}: snapshot baru setelah "
+                                  f"reconnect (PK > {last})")
+                        cur = raw.cursor()
+                        putus = False
+                    with (jaga.tenggat(nama, src, raw) if jaga is not None
+                          else nullcontext()):
+                        if last is None:
+                            cur.execute(sql_awal)
+                        elif rentang is None:
+                            cur.execute(sql_lanjut, (last,))
+                        else:
+                            cur.execute(sql_lanjut, (last, rentang[1]))
+                        rows = cur.fetchall()
+                    if not snapshot:
+                        # tutup transaksi baca agar tidak menahan snapshot lama
+                        raw.rollback()
+                    break
+                except Exception as e:
+                    ke += 1
+                    if jaga is None or not jaga.boleh_ulang(e, ke, nama):
+                        raise
+                    if koneksi_putus(e):
+                        buang_koneksi(raw)
+                        putus = True
+
+            if not rows:
+                break
+
+            if stat is not None:
+                stat["fetch_mulai"] = None
+                stat["fetch_ms"] = (time.monotonic() - mulai) * 1000
+                stat["bytes_kolom"] = byte_kolom(rows)
+                stat["bytes"] = sum(stat["bytes_kolom"])
+                stat["pk"] = (last, rows[-1][pk_idx])
+
+            if pembatas.aktif:
+                pembatas.setelah_fetch(raw, rows, time.monotonic() - mulai)
+
+            last = rows[-1][pk_idx]
+            n_rows = len(rows)
+            if KOLOMNAR:
+                rows = BatchKolom.dari_rows(rows, kolom, kolom_kamus)
+            yield rows
+
+            if n_rows < limit:
+                break
+        cur.close()
+    finally:
+        if milik:
+            raw.close()
+
+
+def ukur_reader(gen, stat, rentang=None):
+    """
+    Batch reader + meta telemetri:
+    (rows, {fetch_ms, bytes, bytes_kolom, pk, rentang}).
+    Thread reader tidak diprofil (lihat telemetri.Profil).
+    """
+    for rows in gen:
+        meta = dict(stat, rentang=rentang)
+        meta.pop("fetch_mulai", None)
+        yield rows, meta
+
+
+def rentang_pk(raw, spec, n):
+    """Bagi PK integer source jadi n rentang (lo, hi] yang kira-kira sama."""
+    cur = raw.cursor()
+    cur.execute(
+        f"SELECT MIN(`{spec['pk']}`), MAX(`{spec['pk']}`) FROM `{spec['tabel']}`")
+    pk_min, pk_max = cur.fetchone()
+    cur.close()
+    if pk_min is None:
+        return []
+    if not isinstance(pk_min, int):
+        raise ValueError(f"MIG_READERS > 1 butuh PK integer ({spec['pk']})")
+
+    lebar = pk_max - pk_min + 1
+    batas = [pk_min - 1 + lebar * k // n for k in range(n + 1)]
+    return [(lo, hi) for lo, hi in zip(batas, batas[1:]) if hi > lo]
+
+
+_SELESAI = object()
+
+
+def prefetch(gen, depth, telemetri=None):
+    """
+    Jalankan generator di thread terpisah, hasil ditampung di antrean.
+    `telemetri` (opsional) diberi antrean untuk metrik kedalaman antrean.
+    """
+    q = queue.Queue(maxsize=max(depth, 1))
+    if telemetri is not None:
+        telemetri.antrean = q
+
+    def run():
+        try:
+            for item in gen:
+                q.put(item)
+        except Exception as e:
+            q.put(e)
+            return
+        q.put(_SELESAI)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    while True:
+        item = q.get()
+        if item is _SELESAI:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def prefetch_paralel(gens, depth, telemetri=None):
+    """
+    Beberapa generator (reader per rentang PK) jalan paralel, hasilnya
+    masuk satu antrean. Urutan batch antar rentang tidak dijamin.
+    """
+    q = queue.Queue(maxsize=max(depth, 1) * max(len(gens), 1))
+    if telemetri is not None:
+        telemetri.antrean = q
+
+    def run(gen):
+        try:
+            for item in gen:
+                q.put(item)
+        except Exception as e:
+            q.put(e)
+            return
+        q.put(_SELESAI)
+
+    for gen in gens:
+        threading.Thread(target=run, args=(gen,), daemon=True).start()
+
+    sisa = len(gens)
+    while sisa:
+        item = q.get()
+        if item is _SELESAI:
+            sisa -= 1
+            continue
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+# =====================================================
+# 5. TRANSFORM
+# =====================================================
+def transform_batch(plan, rows, out):
+    """
+    Transform satu batch ke list `out` (dipakai ulang antar batch).
+    Tiap row target = itemgetter(row + hasil_transform + konstanta).
+    """
+    transform = plan["transform"]
+    ambil = plan["ambil"]
+    konstan = plan["konstan"]
+    decode = plan["decode"]
+    append = out.append
+
+    if transform is None:
+        for row in rows:
+            append(ambil(row + konstan))
+        return len(rows)
+
+    for row in rows:
+        if decode:
+            # passthrough: hanya kolom yang dipakai transform yang di-decode
+            row = list(row)
+            for idx, fn in decode.items():
+                if row[idx] is not None:
+                    row[idx] = fn(row[idx])
+            row = tuple(row)
+        hitung = transform(row)
+        if hitung is None:
+            continue
+        append(ambil(row + hitung + konstan))
+    return len(rows)
+
+
+# Plan transform di worker process, diisi sekali oleh init_worker
+_PLAN_WORKER = None
+
+
+def init_worker(plan):
+    """Initializer Pool: plan tidak ikut dikirim di tiap task."""
+    global _PLAN_WORKER
+    _PLAN_WORKER = plan
+
+
+def buat_pool(spec):
+    return multiprocessing.Pool(WORKERS, initializer=init_worker,
+                                initargs=(build_plan(spec),))
+
+
+def transform_worker(rows):
+    """Versi transform_batch untuk worker process (plan dari init_worker)."""
+    mulai = time.perf_counter()
+    out = []
+    n_rows = transform_batch(_PLAN_WORKER, rows, out)
+    return n_rows, out, (time.perf_counter() - mulai) * 1000
+
+
+def transform_stage(spec, batches, pool):
+    """
+    (rows, meta) → (n_rows, data, meta), meta ditambah transform_ms.
+    `pool` (buat_pool) sudah memegang plan; yang dikirim per task hanya
+    row batch, hasil transform dikirim balik (keduanya di-pickle).
+    """
+    if pool is None:
+        plan = build_plan(spec)
+        out = []
+        for rows, meta in batches:
+            out.clear()
+            mulai = time.perf_counter()
+            n_rows = transform_batch(plan, rows, out)
+            meta["transform_ms"] = (time.perf_counter() - mulai) * 1000
+            yield n_rows, out, meta
+        return
+
+    # Pool.imap membaca input tanpa batas → dibatasi semaphore
+    # supaya batch yang "melayang" maksimal PREFETCH + WORKERS.
+    slot = threading.BoundedSemaphore(PREFETCH + WORKERS)
+    # imap menjaga urutan → meta cukup diantre paralel dengan task
+    metas = deque()
+
+    def tasks():
+        for rows, meta in batches:
+            slot.acquire()
+            metas.append(meta)
+            yield rows
+
+    for n_rows, out, transform_ms in pool.imap(transform_worker, tasks()):
+        meta = metas.popleft()
+        meta["transform_ms"] = transform_ms
+        yield n_rows, out, meta
+        slot.release()
+
+
+# =====================================================
+# 6. MIGRASI
+# =====================================================
+def sidik_tabel_target(tgt, spec):
+    with tgt.connect() as conn:
+        return sidik_target(conn, nama_target(spec))
+
+
+def muat_cache_hash(spec, tgt, insert_sql):
+    """Cache hash tabel target; kosong (tulis penuh) jika tidak valid."""
+    pk_idx = spec["kolom_target"].index(spec["pk"])
+    kunci = f"{target_config['host']}|{PASSTHROUGH}|{insert_sql}"
+    path = path_cache(target_config["database"], nama_target(spec))
+
+    cache, alasan = CacheHash.muat(
+        path, kunci, pk_idx, sidik_tabel_target(tgt, spec))
+    if alasan:
+        print(f"📌 Cache hash: kosong ({alasan}) → tulis penuh\n")
+    else:
+        print(f"📌 Cache hash: {len(cache)} row → tulis yang berubah saja\n")
+    return cache
+
+
+def batch_sudah_masuk(cur, spec, data):
+    """True jika semua PK batch sudah ada di target (commit sempat jalan)."""
+    pk_idx = spec["kolom_target"].index(spec["pk"])
+    pks = [row[pk_idx] for row in data]
+    cur.execute(
+        f"SELECT COUNT(*) FROM `{nama_target(spec)}` "
+        f"WHERE `{spec['pk']}` BETWEEN %s AND %s", (min(pks), max(pks)))
+    return cur.fetchone()[0] >= len(data)
+
+
+def pulihkan_writer(tgt, raw, spec, data, e, saat_commit):
+    """
+    Setelah error yang bisa diulang: rollback, atau buka koneksi baru
+    jika koneksi putus. Hasil (raw, cur, sudah_masuk).
+    Koneksi putus saat COMMIT = tidak pasti batch masuk atau tidak;
+    mode insert dicek dulu (ditulis ulang → gagal duplikat PK), mode
+    ignore / upsert aman ditulis ulang.
+    """
+    if not koneksi_putus(e):
+        raw.rollback()
+        return raw, raw.cursor(), False
+    buang_koneksi(raw)
+    raw = tgt.raw_connection()
+    cur = raw.cursor()
+    sudah = False
+    if saat_commit and data and mode_tulis(spec) == "insert":
+        sudah = batch_sudah_masuk(cur, spec, data)
+        raw.rollback()
+    return raw, cur, sudah
+
+
+def buka_reader(endpoints, spec, pembatas, detektor, telemetri, jaga):
+    """
+    Generator batch source + koneksi snapshot yang harus ditutup.
+    MIG_READERS > 1 → satu reader per rentang PK, semuanya di endpoint
+    tabel ini (endpoint_tabel) dalam satu snapshot.
+    Stat tiap reader didaftarkan ke detektor batch lambat dan ke
+    telemetri (bersama antrean prefetch, dipakai memori.py); query tiap
+    reader dijaga tenggat + retry oleh `jaga`.
+    """
+    if READERS <= 1:
+        _, src = endpoint_tabel(endpoints, spec["tabel"])
+        stat = {}
+        detektor.pantau("reader", stat)
+        telemetri.reader["reader"] = stat
+        gen = ukur_reader(baca_batch(src, spec, pembatas, stat=stat,
+                                     jaga=jaga), stat)
+        return prefetch(gen, PREFETCH, telemetri), []
+
+    conns, keterangan = buka_koneksi(
+        endpoint_tabel(endpoints, spec["tabel"]), READERS)
+    print(f"📌 Snapshot  : {keterangan}\n")
+    try:
+        rentang = rentang_pk(conns[0], spec, READERS)
+    except Exception:
+        tutup_snapshot(conns)
+        raise
+    gens = []
+    for i, (c, r) in enumerate(zip(conns, rentang)):
+        stat = {}
+        detektor.pantau(f"reader{i}", stat)
+        telemetri.reader[f"reader{i}"] = stat
+        src = engine_koneksi(endpoints, c)
+        gens.append(ukur_reader(
+            baca_batch(src, spec, pembatas, raw=c, rentang=r, stat=stat,
+                       jaga=jaga, nama=f"reader{i}"),
+            stat, r))
+    return prefetch_paralel(gens, PREFETCH, telemetri), conns
+
+
+def jalankan_migrasi(spec):
+    tabel = spec["tabel"]
+    tgt = make_engine(target_config)
+
+    print("==============================================================")
+    print(f"🚀 MIGRASI TABEL {tabel} (ENGINE BATCH MODE)")
+    print("==============================================================\n")
+
+    print(f"📌 SOURCE DB : {source_config['database']}")
+    print(f"📌 TARGET DB : {target_config['database']}")
+    print(f"📌 Tabel tujuan: {nama_target(spec)} ({mode_tulis(spec)})")
+    print(f"📌 Batch size: {BATCH_SIZE:,}")
+    print(f"📌 Readers   : {READERS if READERS > 1 else 1}")
+    print(f"📌 Workers   : {WORKERS if WORKERS > 1 else 1}")
+    print(f"📌 Kolomnar  : {'ON' if KOLOMNAR else 'OFF'} (prefetch {PREFETCH})")
+    print(f"📌 Passthrough: {'ON' if PASSTHROUGH else 'OFF'}")
+    print(f"📌 Hash row  : {'ON' if pakai_hash(spec) else 'OFF'}")
+
+    pembatas = PembatasSumber()
+    print(f"📌 Throttle source: {pembatas.keterangan()}\n")
+
+    endpoints = engine_sumber(passthrough=PASSTHROUGH)
+    host, src = endpoint_tabel(endpoints, tabel)
+    print(f"📌 Source baca: {', '.join(h for h, _ in endpoints)}"
+          f" (COUNT / reader tunggal: {host})\n")
+
+    with src.connect() as conn:
+        total_rows = conn.execute(
+            text(f"SELECT COUNT(*) FROM `{tabel}`")).scalar()
+
+    print(f"📌 Total data di SOURCE : {total_rows}\n")
+
+    insert_sql = build_insert(spec, dukung_alias(tgt))
+
+    cache = None
+    if pakai_hash(spec):
+        cache = muat_cache_hash(spec, tgt, insert_sql)
+
+    # Pool dibuat SEBELUM thread reader jalan (aman untuk fork)
+    pool = None
+    if WORKERS > 1:
+        pool = buat_pool(spec)
+
+    processed = 0
+    inserted = 0
+    info = {
+        "batch_size": BATCH_SIZE,
+        "mode": mode_tulis(spec),
+        "readers": READERS,
+        "workers": WORKERS,
+        "prefetch": PREFETCH,
+        "kolomnar": KOLOMNAR,
+        "passthrough": PASSTHROUGH,
+        "hash_row": pakai_hash(spec),
+    }
+    telemetri = Telemetri(tabel, total_rows, info=info,
+                          kolom_sumber=spec["kolom_sumber"],
+                          kolom_target=spec["kolom_target"])
+    sampler = SamplerStatus(telemetri, [("target", tgt)] + [
+        (f"source {h}", e) for h, e in endpoints])
+    print(f"📌 Status server: {sampler.keterangan()}")
+    detektor = DeteksiLambat(
+        tabel, [("target", tgt)] + [(f"source {h}", e) for h, e in endpoints],
+        functools.partial(build_explain, spec), telemetri)
+    print(f"📌 Batch lambat : {detektor.keterangan()}")
+    ekspor = EksporMetrik(tabel, telemetri, pembatas)
+    print(f"📌 Metrik       : {ekspor.keterangan()}")
+    memori = Memori(tabel, telemetri, BATCH_SIZE, stage_fungsi={
+        "fetch": [baca_batch, prefetch, prefetch_paralel],
+        "transform": [transform_batch, transform_stage],
+        "kolomnar": [BatchKolom.dari_rows],
+        "hash": [CacheHash.saring, CacheHash.simpan],
+        "tulis": [jalankan_migrasi],
+    }, pool=pool)
+    print(f"📌 Memori       : {memori.keterangan()}")
+    jaga = JagaBatch(tabel, telemetri)
+    print(f"📌 Penjaga      : {jaga.keterangan()}\n")
+
+    snapshot = []
+    raw = tgt.raw_connection()
+    try:
+        cur = raw.cursor()
+        batches, snapshot = buka_reader(
+            endpoints, spec, pembatas, detektor, telemetri, jaga)
+        telemetri.mulai()
+        sampler.mulai()
+        detektor.mulai()
+        ekspor.mulai()
+        memori.mulai()
+        jaga.mulai()
+        telemetri.tahap = "baca+transform"
+        with Profil(tabel, "writer") as profil:
+            for n_rows, data, meta in transform_stage(spec, batches, pool):
+                if cache is not None:
+                    telemetri.tahap = "hash"
+                    data = cache.saring(data)
+                detektor.tulis_mulai(meta)
+                t0 = time.perf_counter()
+                gagal = None
+                pulih = None     # (error, saat_commit) percobaan sebelumnya
+                ke = 0
+                while True:
+                    try:
+                        if pulih is not None:
+                            raw, cur, sudah = pulihkan_writer(
+                                tgt, raw, spec, data, *pulih)
+                            pulih = None
+                            if sudah:
+                                print("\n✔ writer: batch ternyata sudah "
+                                      "ter-commit, tidak ditulis ulang")
+                                t1 = t2 = time.perf_counter()
+                                break
+                        with jaga.tenggat("writer", tgt, raw):
+                            telemetri.tahap = "tulis"
+                            if data:
+                                executemany(cur, insert_sql, data)
+                            t1 = time.perf_counter()
+                            telemetri.tahap = "commit"
+                            raw.commit()
+                            t2 = time.perf_counter()
+                        break
+                    except Exception as e:
+                        ke += 1
+                        if not jaga.boleh_ulang(e, ke, "writer"):
+                            gagal = e
+                            break
+                        pulih = (e, telemetri.tahap == "commit")
+
+                if gagal is not None:
+                    try:
+                        raw.rollback()
+                    except Exception:
+                        pass     # koneksi sudah putus
+                    telemetri.n_error += 1
+                    ekspor.selesai("gagal")
+                    jaga.selesai()
+                    memori.selesai()
+                    detektor.selesai()
+                    sampler.selesai()
+                    telemetri.selesai("gagal")
+                    print("\n❌ ERROR INSERT BATCH — ROLLBACK!")
+                    print("Error:", gagal)
+                    sys.exit(1)
+
+                processed += n_rows
+                inserted += len(data)
+                meta["bytes_kolom_tulis"] = byte_kolom(data)
+                telemetri.batch(meta, n_rows, len(data),
+                                (t1 - t0) * 1000, (t2 - t1) * 1000)
+                detektor.batch(meta, (t2 - t0) * 1000)
+                telemetri.tahap = "baca+transform"
+
+        jaga.selesai()
+        memori.selesai()
+        detektor.selesai()
+        sampler.selesai()
+        ekspor.selesai("selesai")
+        ringkas = telemetri.selesai()
+        cur.close()
+    finally:
+        # sampai sini tanpa "selesai" = exception di reader / transform
+        ekspor.selesai("gagal")
+        jaga.selesai()
+        memori.selesai()
+        detektor.selesai()
+        sampler.selesai()
+        telemetri.selesai("gagal")
+        raw.close()
+        tutup_snapshot(snapshot)
+        if pool is not None:
+            pool.terminate()
+
+    sama = 0
+    if cache is not None:
+        cache.simpan(sidik_tabel_target(tgt, spec))
+        sama = cache.sama
+
+    if riwayat_run.AKTIF:
+        try:
+            riwayat_run.catat_engine(
+                spec.get("tabel_target", tabel), ringkas, info)
+        except Exception as e:
+            print(f"⚠ Riwayat run gagal dicatat: {e}")
+
+    print("\n\n==============================================================")
+    print(f"🎉 MIGRASI {tabel} SELESAI!")
+    print(f"✔ Total dimigrasi: {inserted}")
+    if sama:
+        print(f"⏭ Tidak berubah  : {sama}")
+    if processed - inserted - sama:
+        print(f"⚠ Total skipped  : {processed - inserted - sama}")
+    if cache is not None and cache.hilang:
+        print(f"⚠ Hilang di source: {cache.hilang} (tidak dihapus di target)")
+    if pembatas.total_tidur:
+        print(f"⏸ Jeda throttle  : {pembatas.total_tidur:.1f} detik")
+    if telemetri.n_retry or jaga.n_kill:
+        print(f"🔁 Batch diulang  : {telemetri.n_retry} "
+              f"(KILL query macet: {jaga.n_kill})")
+    if ringkas["detik"]:
+        print(f"⚡ Kecepatan      : {processed / ringkas['detik']:,.0f} row/s "
+              f"({ringkas['detik']:.1f} detik)")
+    for baris in (telemetri.laporan() + telemetri.laporan_byte()
+                  + memori.laporan() + sampler.laporan()):
+        print(baris)
+    if detektor.tangkapan:
+        print(f"🐢 Batch lambat  : {len(detektor.tangkapan)} diagnosa → "
+              f"{os.path.dirname(detektor.tangkapan[0])}")
+    if profil.prof is not None:
+        print(f"🔬 Profil writer : {profil.path}")
+        print(profil.teratas())
+    print("⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
+
+    return inserted
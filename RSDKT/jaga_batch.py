@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Penjaga batch: tenggat per batch, KILL QUERY, reconnect + ulang otomatis
+Kasus: koneksi putus / query macet di run semalaman → script menunggu
+selamanya, atau berhenti karena satu deadlock sesaat.
+    - Tenggat per batch (MIG_BATAS_BATCH detik, 0 = mati): fetch source
+      dan executemany + commit target dipantau thread penjaga; lewat
+      tenggat → KILL QUERY <id> lewat koneksi samping, masih macet
+      MIG_BATAS_BATCH detik lagi → KILL <id> (koneksi diputus)
+    - Error dipilah:
+        * bisa diulang : deadlock (1213), lock wait timeout (1205),
+          gone away (2006), lost connection (2013 / 2055), tidak bisa
+          konek (2003), query di-KILL (1317 / 1927), server shutdown
+          (1053)
+        * fatal        : selain itu (duplikat PK, kolom salah, data
+          tidak valid, ...) → berhenti seperti biasa
+    - Batch diulang maksimal MIG_RETRY kali dengan jeda eksponensial
+      (MIG_RETRY_JEDA × 2^n, maks MIG_RETRY_JEDA_MAKS, + jitter);
+      koneksi yang putus dibuka ulang dulu
+    - Engine SQLAlchemy: pool_pre_ping, pool_recycle, connect_timeout
+      dan read/write_timeout socket (cadangan jika server tidak bisa
+      dihubungi sama sekali, KILL pun tidak sampai)
+Ulang batch aman: reader keyset mengulang query dengan PK awal yang
+sama; writer mengulang batch yang sudah di-rollback (lihat engine_migrasi
+untuk commit yang putus di tengah jalan).
+"""
+
+import os
+import time
+import random
+import threading
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+BATAS = float(os.getenv("MIG_BATAS_BATCH", "900"))
+RETRY = int(os.getenv("MIG_RETRY", "5"))
+JEDA = float(os.getenv("MIG_RETRY_JEDA", "2"))
+JEDA_MAKS = float(os.getenv("MIG_RETRY_JEDA_MAKS", "120"))
+
+CONNECT_TIMEOUT = int(os.getenv("MIG_CONNECT_TIMEOUT", "15"))
+POOL_RECYCLE = int(os.getenv("MIG_POOL_RECYCLE", "3600"))
+
+# Error MySQL / PyMySQL yang aman diulang
+KODE_ULANG = {
+    1213: "deadlock",
+    1205: "lock wait timeout",
+    2006: "server gone away",
+    2013: "lost connection",
+    2055: "lost connection",
+    2003: "tidak bisa konek",
+    1317: "query di-KILL",
+    1927: "koneksi di-KILL",
+    1053: "server shutdown",
+}
+
+# ... dan di antaranya yang membuat koneksi tidak bisa dipakai lagi
+KODE_PUTUS = {2006, 2013, 2055, 2003, 1927, 1053}
+
+
+def opsi_engine():
+    """Argumen create_engine: cek koneksi sebelum dipakai + timeout socket."""
+    connect_args = {"connect_timeout": CONNECT_TIMEOUT}
+    if BATAS > 0:
+        # cadangan di sisi klien: lebih longgar dari tenggat + KILL
+        connect_args["read_timeout"] = max(int(BATAS * 3), 1)
+        connect_args["write_timeout"] = max(int(BATAS * 3), 1)
+    return {
+        "pool_pre_ping": True,
+        "pool_recycle": POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+def kode_error(e):
+    """Kode error MySQL dari exception PyMySQL / SQLAlchemy (None jika bukan)."""
+    e = getattr(e, "orig", None) or e
+    args = getattr(e, "args", ())
+    if args and isinstance(args[0], int):
+        return args[0]
+    return None
+
+
+def koneksi_putus(e):
+    e = getattr(e, "orig", None) or e
+    if type(e).__name__ == "InterfaceError":
+        return True    # PyMySQL: koneksi sudah tertutup
+    return kode_error(e) in KODE_PUTUS
+
+
+def bisa_diulang(e):
+    return koneksi_putus(e) or kode_error(e) in KODE_ULANG
+
+
+def buang_koneksi(raw):
+    """Koneksi putus: keluarkan dari pool SQLAlchemy (jangan dipakai ulang)."""
+    try:
+        raw.invalidate()
+    except Exception:
+        pass
+
+
+def jeda_ulang(ke):
+    """Jeda sebelum percobaan ulang ke-`ke` (1..): eksponensial + jitter."""
+    return min(JEDA * 2 ** (ke - 1), JEDA_MAKS) * random.uniform(0.5, 1.0)
+
+
+# =====================================================
+# 2. PENJAGA (thread)
+# =====================================================
+class JagaBatch:
+    """
+    Satu penjaga per tabel. Reader / writer membungkus query batch
+    dengan tenggat(nama, engine, raw); thread penjaga mem-KILL query
+    yang lewat MIG_BATAS_BATCH lewat koneksi samping ke engine yang sama.
+    Percobaan ulang dicatat ke telemetri (n_retry + event "retry").
+    """
+
+    def __init__(self, tabel, telemetri):
+        self.tabel = tabel
+        self.telemetri = telemetri
+        self.aktif = BATAS > 0
+        self.jalan = {}      # nama → [mulai, engine, thread_id, n_kill]
+        self.lock = threading.Lock()
+        self.berhenti = threading.Event()
+        self.thread = None
+        self.n_kill = 0
+
+    def keterangan(self):
+        teks = f"retry {RETRY}× (jeda {JEDA:g}–{JEDA_MAKS:g} detik)"
+        if not self.aktif:
+            return f"tenggat OFF, {teks}"
+        return f"tenggat {BATAS:g} detik/batch → KILL QUERY, {teks}"
+
+    # ---------- siklus ----------
+    def mulai(self):
+        if self.aktif:
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def selesai(self):
+        """Aman dipanggil berulang."""
+        if self.thread is None:
+            return
+        self.berhenti.set()
+        self.thread.join()
+        self.thread = None
+
+    def _loop(self):
+        while not self.berhenti.wait(min(max(BATAS / 10, 0.5), 5)):
+            self.periksa()
+
+    # ---------- tenggat ----------
+    def tenggat(self, nama, engine, raw):
+        """Context manager: query batch di `raw` dijaga tenggat."""
+        return _Tenggat(self, nama, engine, raw)
+
+    def periksa(self):
+        now = time.monotonic()
+        with self.lock:
+            macet = [(nama, list(isi)) for nama, isi in self.jalan.items()
+                     if now - isi[0] > BATAS * (isi[3] + 1)]
+        for nama, (mulai, engine, thread_id, n_kill) in macet:
+            # pertama KILL QUERY, jika tetap macet KILL koneksinya
+            perintah = "KILL QUERY" if n_kill == 0 else "KILL"
+            with self.lock:
+                isi = self.jalan.get(nama)
+                if isi is None or isi[2] != thread_id:
+                    continue     # batch sudah selesai sendiri
+                isi[3] += 1
+            self.kill(engine, f"{perintah} {int(thread_id)}", nama, now - mulai)
+
+    def kill(self, engine, sql, nama, detik):
+        self.n_kill += 1
+        print(f"\n⏰ {self.tabel} {nama}: batch {detik:,.0f} detik > tenggat "
+              f"{BATAS:g} detik → {sql}")
+        self.telemetri.event("kill", nama=nama, sql=sql, detik=round(detik, 1))
+        try:
+            raw = engine.raw_connection()
+            try:
+                cur = raw.cursor()
+                cur.execute(sql)
+                cur.close()
+            finally:
+                raw.close()
+        except Exception as e:
+            # server tidak terjangkau → read_timeout socket yang memutus
+            print(f"\n⚠ {sql} gagal: {e}")
+
+    # ---------- ulang ----------
+    def boleh_ulang(self, e, ke, nama):
+        """
+        Dipanggil setelah percobaan ke-`ke` gagal: True (sudah tidur
+        jeda backoff) jika batch boleh diulang, False jika fatal / habis.
+        """
+        if not bisa_diulang(e) or ke > RETRY:
+            return False
+        jeda = jeda_ulang(ke)
+        with self.telemetri.lock:
+            self.telemetri.n_retry += 1
+        kode = kode_error(e)
+        self.telemetri.event("retry", nama=nama, ke=ke, kode=kode,
+                             error=str(e), jeda=round(jeda, 2))
+        print(f"\n🔁 {self.tabel} {nama}: {KODE_ULANG.get(kode, 'koneksi putus')}"
+              f" ({kode}) → ulang {ke}/{RETRY} dalam {jeda:.1f} detik")
+        time.sleep(jeda)
+        return True
+
+
+class _Tenggat:
+    def __init__(self, jaga, nama, engine, raw):
+        self.jaga = jaga
+        self.nama = nama
+        self.engine = engine
+        self.raw = raw
+
+    def __enter__(self):
+        if self.jaga.aktif:
+            try:
+                thread_id = self.raw.thread_id()
+            except Exception:
+                return self      # koneksi sudah putus, query pasti gagal
+            with self.jaga.lock:
+                self.jaga.jalan[self.nama] = [time.monotonic(), self.engine,
+                                              thread_id, 0]
+        return self
+
+    def __exit__(self, *exc):
+        with self.jaga.lock:
+            self.jaga.jalan.pop(self.nama, None)
+        return False
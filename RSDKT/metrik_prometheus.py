@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ekspor metrik migrasi untuk Prometheus / Grafana (tanpa library tambahan)
+    - Textfile node_exporter (MIG_PROM_DIR): satu file per tabel
+      migrasi_<tabel>.prom, ditulis atomik tiap MIG_PROM_INTERVAL detik
+      dan saat tabel selesai / gagal (state terakhir tetap terbaca);
+      orkestrator 02 menulis migrasi_run.prom (progres script)
+    - HTTP lokal opsional (MIG_PROM_PORT, 0 = mati) di /metrics untuk
+      tabel yang sedang berjalan; format OpenMetrics jika diminta lewat
+      header Accept, selain itu format teks Prometheus
+Metrik (label tabel):
+    migrasi_rows_total, migrasi_rows_written_total, migrasi_bytes_total,
+    migrasi_bytes_written_total, migrasi_column_bytes_total{kolom,arah},
+    migrasi_batches_total, migrasi_errors_total, migrasi_retries_total,
+    migrasi_throttle_sleep_seconds_total, migrasi_rows_source,
+    migrasi_rows_per_second, migrasi_eta_seconds, migrasi_queue_depth,
+    migrasi_memory_rss_bytes,
+    migrasi_batch_duration_seconds{stage} (histogram),
+    migrasi_tabel_state{state}, migrasi_tabel_start_timestamp_seconds
+Contoh alert: migrasi_tabel_state{state="gagal"} == 1, atau
+rate(migrasi_rows_total[5m]) == 0 selama tabel masih "jalan".
+"""
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+PROM_DIR = os.getenv("MIG_PROM_DIR", "")
+PROM_PORT = int(os.getenv("MIG_PROM_PORT", "0"))
+PROM_HOST = os.getenv("MIG_PROM_HOST", "127.0.0.1")
+INTERVAL = float(os.getenv("MIG_PROM_INTERVAL", "15"))
+
+# Batas bucket histogram durasi batch (detik)
+BUCKET = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+          120, 300)
+
+STATE = ("jalan", "selesai", "gagal")
+
+TIPE_TEKS = "text/plain; version=0.0.4; charset=utf-8"
+TIPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def label(**isi):
+    bagian = []
+    for k, v in isi.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        bagian.append(f'{k}="{v}"')
+    return "{" + ",".join(bagian) + "}"
+
+
+def angka(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render(keluarga, openmetrics=False):
+    """
+    keluarga = [(nama, tipe, bantuan, [(suffix, label, nilai)])].
+    Counter: nama tanpa _total; sampel ber-suffix _total.
+    """
+    baris = []
+    for nama, tipe, bantuan, sampel in keluarga:
+        nama_tipe = nama if openmetrics or tipe != "counter" else nama + "_total"
+        baris.append(f"# HELP {nama_tipe} {bantuan}")
+        baris.append(f"# TYPE {nama_tipe} {tipe}")
+        for suffix, lbl, nilai in sampel:
+            baris.append(f"{nama}{suffix}{lbl} {angka(nilai)}")
+    if openmetrics:
+        baris.append("# EOF")
+    return "\n".join(baris) + "\n"
+
+
+def tulis_atomik(path, isi):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(isi)
+    os.replace(tmp, path)
+
+
+# =====================================================
+# 2. EKSPOR METRIK SATU TABEL
+# =====================================================
+class EksporMetrik:
+    """
+    Membaca counter Telemetri (tanpa menambah kerja di hot loop);
+    histogram diisi bertahap dari durasi per batch yang belum dibaca.
+    """
+
+    def __init__(self, tabel, telemetri, pembatas=None):
+        self.tabel = tabel
+        self.telemetri = telemetri
+        self.pembatas = pembatas
+        self.state = "jalan"
+        self.mulai_ts = time.time()
+        self.bucket = {k: [0] * (len(BUCKET) + 1) for k in telemetri.durasi}
+        self.jumlah = dict.fromkeys(telemetri.durasi, 0.0)
+        self.dibaca = dict.fromkeys(telemetri.durasi, 0)
+        self.rate = 0.0
+        self.rate_titik = (time.monotonic(), 0)
+        self.lock = threading.Lock()
+        self.berhenti = threading.Event()
+        self.thread = None
+        self.http = None
+        self.path = (os.path.join(PROM_DIR, f"migrasi_{tabel}.prom")
+                     if PROM_DIR else None)
+
+    @property
+    def aktif(self):
+        return bool(self.path or PROM_PORT)
+
+    def keterangan(self):
+        if not self.aktif:
+            return "OFF"
+        bagian = []
+        if self.path:
+            bagian.append(f"textfile {self.path}")
+        if PROM_PORT:
+            bagian.append(f"http://{PROM_HOST}:{PROM_PORT}/metrics")
+        return ", ".join(bagian)
+
+    # ---------- siklus ----------
+    def mulai(self):
+        if not self.aktif:
+            return self
+        if PROM_PORT:
+            try:
+                self.http = ThreadingHTTPServer((PROM_HOST, PROM_PORT),
+                                                handler(self))
+                threading.Thread(target=self.http.serve_forever,
+                                 daemon=True).start()
+            except OSError as e:
+                print(f"   ⚠ Endpoint metrik tidak bisa dibuka: {e}")
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def selesai(self, state):
+        """State akhir (selesai / gagal) + textfile terakhir. Hanya panggilan pertama berlaku."""
+        if self.thread is None:
+            return
+        self.berhenti.set()
+        self.thread.join()
+        self.thread = None
+        self.state = state
+        self.tulis()
+        if self.http is not None:
+            self.http.shutdown()
+            self.http.server_close()
+            self.http = None
+
+    def _loop(self):
+        while not self.berhenti.wait(INTERVAL):
+            self.tulis()
+
+    # ---------- isi metrik ----------
+    def perbarui(self):
+        """Tambah durasi batch baru ke histogram + hitung rate terkini."""
+        t = self.telemetri
+        for stage, durasi in t.durasi.items():
+            n = len(durasi)
+            for ms in durasi[self.dibaca[stage]:n]:
+                self.bucket[stage][bisect_left(BUCKET, ms / 1000)] += 1
+                self.jumlah[stage] += ms / 1000
+            self.dibaca[stage] = n
+
+        now = time.monotonic()
+        waktu, rows = self.rate_titik
+        if now - waktu >= 1:
+            self.rate = (t.rows - rows) / (now - waktu)
+            self.rate_titik = (now, t.rows)
+
+    def keluarga(self):
+        t = self.telemetri
+        lbl = label(tabel=self.tabel)
+        with self.lock:
+            self.perbarui()
+            histogram = []
+            for stage, bucket in self.bucket.items():
+                kumulatif = 0
+                for batas, n in zip(BUCKET + (float("inf"),), bucket):
+                    kumulatif += n
+                    histogram.append(("_bucket", label(
+                        tabel=self.tabel, stage=stage[:-3],
+                        le=angka(float(batas))), kumulatif))
+                l_stage = label(tabel=self.tabel, stage=stage[:-3])
+                histogram.append(("_sum", l_stage, round(self.jumlah[stage], 6)))
+                histogram.append(("_count", l_stage, kumulatif))
+            rate = self.rate
+
+        sisa = max(t.total - t.rows, 0)
+        antrean = t.antrean
+        tidur = self.pembatas.total_tidur if self.pembatas is not None else 0.0
+        return [
+            ("migrasi_rows", "counter", "Row source yang sudah diproses",
+             [("_total", lbl, t.rows)]),
+            ("migrasi_rows_written", "counter", "Row yang ditulis ke target",
+             [("_total", lbl, t.ditulis)]),
+            ("migrasi_bytes", "counter", "Perkiraan byte source yang dibaca",
+             [("_total", lbl, t.bytes)]),
+            ("migrasi_bytes_written", "counter",
+             "Perkiraan byte yang ditulis ke target",
+             [("_total", lbl, t.bytes_tulis)]),
+            ("migrasi_column_bytes", "counter",
+             "Perkiraan byte per kolom (arah baca / tulis, sampel)",
+             [("_total", label(tabel=self.tabel, kolom=k, arah=arah), b)
+              for arah, per in t.bytes_per_kolom().items()
+              for k, b in per.items()]),
+            ("migrasi_batches", "counter", "Batch yang sudah di-commit",
+             [("_total", lbl, t.n_batch)]),
+            ("migrasi_errors", "counter", "Error batch",
+             [("_total", lbl, t.n_error)]),
+            ("migrasi_retries", "counter", "Batch yang diulang",
+             [("_total", lbl, t.n_retry)]),
+            ("migrasi_throttle_sleep_seconds", "counter",
+             "Total jeda pembatas baca source",
+             [("_total", lbl, round(tidur, 3))]),
+            ("migrasi_rows_source", "gauge", "Jumlah row di source (COUNT awal)",
+             [("", lbl, t.total)]),
+            ("migrasi_rows_per_second", "gauge", "Kecepatan terkini (row/s)",
+             [("", lbl, round(rate, 1))]),
+            ("migrasi_eta_seconds", "gauge", "Perkiraan sisa waktu",
+             [("", lbl, round(sisa / rate, 1) if rate > 0 else -1)]),
+            ("migrasi_queue_depth", "gauge", "Batch menunggu di antrean prefetch",
+             [("", lbl, antrean.qsize() if antrean is not None else 0)]),
+            ("migrasi_memory_rss_bytes", "gauge",
+             "RSS proses migrasi + worker (memori.py)",
+             [("", lbl, t.rss)]),
+            ("migrasi_batch_duration_seconds", "histogram",
+             "Durasi per batch per stage", histogram),
+            ("migrasi_tabel_state", "gauge", "State tabel (1 = aktif)",
+             [("", label(tabel=self.tabel, state=s), int(s == self.state))
+              for s in STATE]),
+            ("migrasi_tabel_start_timestamp_seconds", "gauge",
+             "Waktu mulai tabel (unix)",
+             [("", lbl, round(self.mulai_ts, 3))]),
+        ]
+
+    def teks(self, openmetrics=False):
+        return render(self.keluarga(), openmetrics)
+
+    def tulis(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(PROM_DIR, exist_ok=True)
+            tulis_atomik(self.path, self.teks())
+        except OSError as e:
+            print(f"\n⚠ Textfile metrik gagal ditulis: {e}")
+
+
+def handler(ekspor):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            om = "application/openmetrics-text" in self.headers.get("Accept", "")
+            isi = ekspor.teks(openmetrics=om).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", TIPE_OPENMETRICS if om else TIPE_TEKS)
+            self.send_header("Content-Length", str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def log_message(self, *args):
+            pass  # jangan campur log akses dengan progress
+
+    return Handler
+
+
+# =====================================================
+# 3. PROGRES RUN (orkestrator)
+# =====================================================
+def tulis_run(script, ke, total, gagal=False, mulai_ts=None):
+    """migrasi_run.prom: posisi script dalam run 02 (jika MIG_PROM_DIR)."""
+    if not PROM_DIR:
+        return
+    keluarga = [
+        ("migrasi_run_scripts", "gauge", "Jumlah script dalam run",
+         [("", "", total)]),
+        ("migrasi_run_script_index", "gauge", "Urutan script yang sedang / terakhir jalan",
+         [("", label(script=script), ke)]),
+        ("migrasi_run_failed", "gauge", "1 jika run berhenti karena error",
+         [("", "", int(gagal))]),
+        ("migrasi_run_start_timestamp_seconds", "gauge", "Waktu mulai run (unix)",
+         [("", "", round(mulai_ts or time.time(), 3))]),
+    ]
+    try:
+        os.makedirs(PROM_DIR, exist_ok=True)
+        tulis_atomik(os.path.join(PROM_DIR, "migrasi_run.prom"), render(keluarga))
+    except OSError as e:
+        print(f"⚠ Textfile metrik run gagal ditulis: {e}")
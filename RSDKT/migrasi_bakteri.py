@@ -12,6 +12,8 @@ from datetime import datetime
 from dotenv import load_dotenv
 import os
 
+from jaga_batch import opsi_engine
+
 
 # === [1] LOAD ENV FILE ===
 load_dotenv()   # otomatis baca .env di direktori project
@@ -36,7 +38,8 @@ target_config = {
 # === [3] Helper buat ENGINE ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -10,11 +10,13 @@ Field tambahan target:
 """
 
 import os
-import sys
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from datetime import datetime
 
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
+
 # =====================================================
 # 1. Load ENV
 # =====================================================
@@ -42,7 +44,8 @@ target_config = {
 # =====================================================
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -116,19 +119,7 @@ INSERT INTO kategori_alat (
 
 
 # =====================================================
-# 6. Progress bar
-# =====================================================
-def progress(cur, total):
-    bar_len = 40
-    filled = int(bar_len * cur / total) if total else bar_len
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (cur / total * 100) if total else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# =====================================================
-# 7. Eksekusi migrasi
+# 6. Eksekusi migrasi
 # =====================================================
 offset = 0
 inserted = 0
@@ -162,7 +153,7 @@ while True:
 
                 conn.execute(text(INSERT_SQL), data)
                 inserted += 1
-                progress(inserted, total_rows)
+                progress_bar(inserted, total_rows)
 
             trans.commit()
 
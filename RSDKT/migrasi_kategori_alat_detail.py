@@ -8,11 +8,12 @@ Perbedaan:
 """
 
 import os
-import sys
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from datetime import datetime
-import math
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 # =====================================================
 # 1. Load ENV
@@ -37,7 +38,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -106,22 +108,9 @@ INSERT INTO kategori_alat_detail (
 )
 """
 
-# =====================================================
-# 5. Simple progress bar
-# =====================================================
-
-
-def progress(cur, total):
-    size = 40
-    filled = int(size * cur / total) if total else size
-    bar = "█" * filled + "-" * (size - filled)
-    percent = (cur / total * 100) if total else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
 
 # =====================================================
-# 6. Migrasi batch
+# 5. Migrasi batch
 # =====================================================
 offset = 0
 inserted = 0
@@ -154,7 +143,7 @@ while True:
 
                 conn.execute(text(INSERT_SQL), data)
                 inserted += 1
-                progress(inserted, total_rows)
+                progress_bar(inserted, total_rows)
 
             trans.commit()
 
@@ -13,7 +13,9 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
+
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
 
 # =====================================================
 # 1. Load ENV
@@ -41,7 +43,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -104,19 +107,7 @@ INSERT INTO kritis (
 
 
 # =====================================================
-# 6. Progress bar
-# =====================================================
-def progress_bar(cur, total):
-    bar_len = 40
-    fill = int(bar_len * cur / total)
-    bar = "█" * fill + "-" * (bar_len - fill)
-    percent = (cur / total * 100)
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# =====================================================
-# 7. MIGRASI
+# 6. MIGRASI
 # =====================================================
 offset = 0
 total_inserted = 0
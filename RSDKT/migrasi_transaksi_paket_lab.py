@@ -7,12 +7,13 @@ Struktur sama 100% → langsung copy.
 """
 
 import os
-import sys
-import math
 from datetime import datetime
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
+
 # =====================================================
 # 1. Load ENV
 # =====================================================
@@ -36,7 +37,8 @@ target_config = {
 
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -106,22 +108,9 @@ INSERT INTO transaksi_paket_lab (
 )
 """
 
-# =====================================================
-# 5. Progress bar
-# =====================================================
-
-
-def progress_bar(cur, total):
-    bar_len = 40
-    fill = int(bar_len * cur / total)
-    bar = "█" * fill + "-" * (bar_len - fill)
-    percent = (cur / total * 100)
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
 
 # =====================================================
-# 6. MIGRASI
+# 5. MIGRASI
 # =====================================================
 offset = 0
 inserted = 0
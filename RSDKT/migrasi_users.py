@@ -17,9 +17,11 @@ from sqlalchemy import create_engine, text
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import sys
 import json
 
+from telemetri import progress_bar
+from jaga_batch import opsi_engine
+
 
 # === [1] Load ENV ===
 load_dotenv()
@@ -45,7 +47,8 @@ target_config = {
 # === [3] Engine maker ===
 def make_engine(cfg):
     return create_engine(
-        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}",
+        **opsi_engine(),
     )
 
 
@@ -143,17 +146,7 @@ DEFAULT_PERM = json.dumps([
 ])
 
 
-# === [8] Progress bar ===
-def progress_bar(current, total):
-    bar_len = 40
-    filled = int(bar_len * current / total) if total > 0 else 40
-    bar = "█" * filled + "-" * (bar_len - filled)
-    percent = (current / total * 100) if total > 0 else 100
-    sys.stdout.write(f"\r🔄 Progress: |{bar}| {percent:5.1f}%")
-    sys.stdout.flush()
-
-
-# === [9] MIGRASI per batch ===
+# === [8] MIGRASI per batch ===
 offset = 0
 total_inserted = 0
 
@@ -193,7 +186,7 @@ while True:
 print()
 
 
-# === [10] Selesai ===
+# === [9] Selesai ===
 print("\n🎉 MIGRASI users SELESAI!")
 print(f"✔ Total baris dimigrasikan: {total_inserted}")
 print("⏱ Waktu selesai =", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Muat ulang tabel tertentu saja (tanpa 01 + 02 penuh)
+Pakai:
+    python muat_ulang_tabel.py kode_lab kode_lab_detail
+    python muat_ulang_tabel.py transaksi_lab --dry-run
+Langkah:
+    1. Hitung tabel yang ikut dimuat ulang: tabel pilihan + semua tabel
+       anak via FK (rekursif) + tabel turunan (kode_lab → kode_lab_detail
+       lewat insert_nr_single.py)
+    2. Lepas FK yang menyangkut tabel-tabel itu (jika FK sedang terpasang)
+    3. TRUNCATE tabel-tabel itu saja, tabel lain tidak disentuh
+    4. Jalankan script migrasinya sesuai urutan 02_migrasi_all_tabel_...
+    5. Pasang kembali FK yang tadi dilepas
+Jika FK sedang dilepas (dropFK.py), relasi dibaca dari backup_fk_*.sql.
+Tabel anak tanpa script migrasi tidak di-TRUNCATE dan penelusuran
+berhenti di sana (anak-anaknya tidak ikut lewat jalur itu); keduanya
+dilaporkan sebelum apa pun diubah.
+"""
+
+import os
+import ast
+import sys
+import time
+import argparse
+import subprocess
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+import skema_fk
+import sidik_tabel
+import dasbor
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ORKESTRATOR = "02_migrasi_all_tabel_pasang_fk.py"
+
+target_config = {
+    "host": os.getenv("TGT_HOST"),
+    "user": os.getenv("TGT_USER"),
+    "password": os.getenv("TGT_PASSWORD"),
+    "database": os.getenv("TGT_DATABASE"),
+}
+
+
+def make_engine(cfg):
+    return create_engine(
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+    )
+
+
+def urutan_script():
+    """Daftar `scripts` di orkestrator 02 (dibaca, tidak dijalankan)."""
+    with open(os.path.join(BASE_DIR, ORKESTRATOR), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                getattr(t, "id", None) == "scripts" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"Daftar scripts tidak ditemukan di {ORKESTRATOR}")
+
+
+# =====================================================
+# 2. TUTUPAN DEPENDENSI
+# =====================================================
+def tutupan(tabel_list, fks, ada_script):
+    """
+    Tabel pilihan + anak FK (rekursif) + tabel turunan. Anak tanpa script
+    migrasi tidak bisa dimuat ulang → tidak ditelusuri lebih jauh.
+    Hasil: (tabel dimuat ulang, {anak tanpa script: induknya}).
+    """
+    anak = {}
+    for fk in fks:
+        if fk["tabel"] != fk["ref_tabel"]:
+            anak.setdefault(fk["ref_tabel"], set()).add(fk["tabel"])
+    for tabel, induk in sidik_tabel.TURUNAN.items():
+        for t in induk:
+            anak.setdefault(t, set()).add(tabel)
+
+    hasil = set()
+    buntu = {}
+    antre = [(t, None) for t in tabel_list]
+    while antre:
+        t, induk = antre.pop()
+        if t not in ada_script:
+            buntu.setdefault(t, set()).add(induk)
+            continue
+        if t in hasil:
+            continue
+        hasil.add(t)
+        antre.extend((a, t) for a in anak.get(t, ()))
+    return hasil, buntu
+
+
+# =====================================================
+# 3. MUAT ULANG
+# =====================================================
+def jalankan_script(scripts):
+    # jadwal untuk dasbor.py (MIG_DASBOR=1)
+    nama = os.path.basename(__file__)
+    mulai = time.time()
+    dasbor.bersihkan()
+    for ke, s in enumerate(scripts, start=1):
+        dasbor.tulis_jadwal(nama, scripts, ke, mulai)
+        print(f"\nMenjalankan: {s}")
+        result = subprocess.run(["python", os.path.join(BASE_DIR, s)])
+        if result.returncode != 0:
+            dasbor.tulis_jadwal(nama, scripts, ke, mulai, status="gagal")
+            raise RuntimeError(f"Script gagal: {s}")
+        print(f"✔️ Selesai: {s}")
+    dasbor.tulis_jadwal(nama, scripts, len(scripts), mulai, status="ok")
+
+
+def muat_ulang(tgt, tabel_list, dry_run):
+    with tgt.connect() as conn:
+        fk_aktif = skema_fk.ambil_fk(conn)
+    fks = fk_aktif or skema_fk.fk_dari_backup(BASE_DIR)
+
+    urutan = urutan_script()
+    punya_script, tanpa_script = tutupan(
+        tabel_list, fks, {sidik_tabel.tabel_script(s) for s in urutan})
+    scripts = [s for s in urutan
+               if sidik_tabel.tabel_script(s) in punya_script]
+    pindah = [fk for fk in fk_aktif
+              if fk["tabel"] in punya_script or fk["ref_tabel"] in punya_script]
+
+    print("🔍 TABEL YANG DIMUAT ULANG:")
+    for t in sorted(punya_script):
+        print(" -", t, "(dipilih)" if t in tabel_list else "(dependen)")
+    if tanpa_script:
+        print("\n⚠ Tabel anak TANPA script migrasi (tidak di-TRUNCATE, "
+              "anak-anaknya tidak ditelusuri; row-nya bisa jadi orphan):")
+        for t, induk in sorted(tanpa_script.items()):
+            print(f" - {t} (anak dari {', '.join(sorted(induk))})")
+    print(f"\n📌 Script : {len(scripts)}")
+    print(f"📌 FK dilepas sementara: {len(pindah)}")
+
+    if dry_run:
+        print("\n👉 --dry-run: tidak ada yang diubah")
+        return
+
+    with tgt.connect() as conn:
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+        try:
+            for fk in pindah:
+                conn.exec_driver_sql(skema_fk.sql_hapus_fk(fk))
+            for t in sorted(punya_script):
+                conn.exec_driver_sql(f"TRUNCATE `{t}`")
+                print(f"   ✔ TRUNCATED: {t}")
+        finally:
+            conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+
+    # sidik source SEBELUM script membaca, disimpan setelah semua sukses
+    awal = None
+    if sidik_tabel.AKTIF:
+        try:
+            awal = sidik_tabel.sidik_awal(sorted(punya_script))
+        except Exception as e:
+            print(f"⚠ Sidik jari source gagal diambil: {e}")
+
+    try:
+        jalankan_script(scripts)
+    finally:
+        # FK dipasang lagi walau ada script gagal (metadata saja)
+        with tgt.connect() as conn:
+            conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+            try:
+                for fk in pindah:
+                    conn.exec_driver_sql(skema_fk.sql_tambah_fk(fk))
+            finally:
+                conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+        if pindah:
+            print(f"\n   ✔ {len(pindah)} FK dipasang kembali")
+
+    if awal:
+        sidik_tabel.catat(awal)
+
+
+# =====================================================
+# 4. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Muat ulang tabel tertentu")
+    parser.add_argument("tabel", nargs="+")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="tampilkan rencana saja")
+    args = parser.parse_args()
+
+    print("==============================================================")
+    print("🚀 MUAT ULANG TABEL TERPILIH")
+    print("==============================================================\n")
+    print(f"📌 TARGET DB : {target_config['database']}")
+    print(f"📌 Tabel     : {', '.join(args.tabel)}\n")
+
+    semua = set(sidik_tabel.semua_tabel())
+    asing = [t for t in args.tabel if t not in semua]
+    if asing:
+        print(f"❌ Tidak ada script migrasi untuk: {', '.join(asing)}")
+        sys.exit(1)
+
+    try:
+        muat_ulang(make_engine(target_config), args.tabel, args.dry_run)
+    except Exception as e:
+        print("\n❌ ERROR MUAT ULANG!")
+        print("Error:", e)
+        sys.exit(1)
+
+    print("\n⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sidik jari per tabel → lewati tabel yang tidak berubah saat gladi ulang
+(aktif jika MIG_SIDIK=1)
+Sidik jari:
+    - source : CHECKSUM TABLE + COUNT(*) + MAX(updated_at) (jika ada)
+    - target : CHECKSUM TABLE + COUNT(*) (target masih utuh?)
+    - script : sha256 migrasi_<tabel>.py (mapping berubah → muat ulang)
+Alur (sudah dipanggil orkestrator):
+    1. 01_empty_tabel_lepas_fk.py → `python sidik_tabel.py rencana`
+       → sidik_rencana.json berisi tabel yang boleh dilewati
+       → emptyTabel.py tidak men-TRUNCATE tabel tersebut
+    2. 02_migrasi_all_tabel_pasang_fk.py melewati script tabel tersebut,
+       dan mencatat sidik jari tiap tabel yang sukses dimuat
+       (sidik_tabel.json), lalu menghapus rencana
+Sidik source + script diambil SEBELUM script tabel jalan (sidik_awal)
+dan baru disimpan setelah script sukses (catat). Jika diambil sesudah
+load, row yang commit ke LIS selama / setelah script membaca ikut masuk
+sidik jari tapi tidak pernah sampai ke target → tabel dilewati terus.
+Paksa muat penuh: python sidik_tabel.py reset
+Rencana hanya optimasi: jika gagal dibuat (source / target tidak bisa
+dihubungi, information_schema error, ...) rencana dihapus dan SEMUA
+tabel dimuat ulang dengan peringatan, orkestrator 01 tidak berhenti.
+kode_lab_detail juga diisi insert_nr_single.py dari kode_lab target,
+jadi kode_lab_detail ikut dimuat ulang setiap kode_lab dimuat ulang.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+AKTIF = os.getenv("MIG_SIDIK", "0") == "1"
+
+# 0 = tanpa CHECKSUM TABLE di source (hanya COUNT + MAX(updated_at))
+PAKAI_CHECKSUM = os.getenv("MIG_SIDIK_CHECKSUM", "1") == "1"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILE_SIDIK = os.path.join(BASE_DIR, "sidik_tabel.json")
+FILE_RENCANA = os.path.join(BASE_DIR, "sidik_rencana.json")
+
+# Script non-migrasi_<tabel>.py yang mengisi tabel target
+SCRIPT_TABEL = {
+    "insert_nr_single.py": "kode_lab_detail",
+}
+
+# Tabel target yang (juga) diturunkan dari tabel target lain
+TURUNAN = {
+    "kode_lab_detail": ["kode_lab"],
+}
+
+source_config = {
+    "host": os.getenv("SRC_HOST"),
+    "user": os.getenv("SRC_USER"),
+    "password": os.getenv("SRC_PASSWORD"),
+    "database": os.getenv("SRC_DATABASE"),
+}
+
+target_config = {
+    "host": os.getenv("TGT_HOST"),
+    "user": os.getenv("TGT_USER"),
+    "password": os.getenv("TGT_PASSWORD"),
+    "database": os.getenv("TGT_DATABASE"),
+}
+
+
+def make_engine(cfg):
+    return create_engine(
+        f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+    )
+
+
+def tabel_script(script):
+    """Nama tabel target yang diisi script (None untuk dropFK, dll.)."""
+    if script in SCRIPT_TABEL:
+        return SCRIPT_TABEL[script]
+    if script.startswith("migrasi_") and script.endswith(".py"):
+        return script[len("migrasi_"):-len(".py")]
+    return None
+
+
+def semua_tabel():
+    return sorted(
+        tabel_script(f) for f in os.listdir(BASE_DIR)
+        if f.startswith("migrasi_") and f.endswith(".py"))
+
+
+def kunci_db():
+    return (f"{source_config['host']}/{source_config['database']} → "
+            f"{target_config['host']}/{target_config['database']}")
+
+
+# =====================================================
+# 2. HITUNG SIDIK JARI
+# =====================================================
+def sidik_script(tabel):
+    h = hashlib.sha256()
+    for script, t in sorted(SCRIPT_TABEL.items()):
+        if t == tabel:
+            with open(os.path.join(BASE_DIR, script), "rb") as f:
+                h.update(f.read())
+    with open(os.path.join(BASE_DIR, f"migrasi_{tabel}.py"), "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def ada_kolom(conn, tabel, kolom):
+    return conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "AND column_name = %s", (tabel, kolom)).scalar() > 0
+
+
+def checksum(conn, tabel):
+    return conn.exec_driver_sql(f"CHECKSUM TABLE `{tabel}`").fetchone()[1]
+
+
+def sidik_source(conn, tabel):
+    sidik = {
+        "rows": conn.exec_driver_sql(
+            f"SELECT COUNT(*) FROM `{tabel}`").scalar(),
+    }
+    if ada_kolom(conn, tabel, "updated_at"):
+        sidik["max_updated_at"] = str(conn.exec_driver_sql(
+            f"SELECT MAX(`updated_at`) FROM `{tabel}`").scalar())
+    if PAKAI_CHECKSUM:
+        sidik["checksum"] = checksum(conn, tabel)
+    return sidik
+
+
+def sidik_target(conn, tabel):
+    return {
+        "rows": conn.exec_driver_sql(
+            f"SELECT COUNT(*) FROM `{tabel}`").scalar(),
+        "checksum": checksum(conn, tabel),
+    }
+
+
+# =====================================================
+# 3. SIMPAN / BACA
+# =====================================================
+def baca_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tulis_json(path, isi):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(isi, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+def baca_rencana():
+    """Set tabel yang dilewati (kosong jika tidak aktif / belum ada rencana)."""
+    if not AKTIF:
+        return set()
+    rencana = baca_json(FILE_RENCANA, {})
+    if rencana.get("db") != kunci_db():
+        return set()
+    return set(rencana.get("lewati", []))
+
+
+def hapus_rencana():
+    if os.path.exists(FILE_RENCANA):
+        os.remove(FILE_RENCANA)
+
+
+def sidik_awal(tabel_list):
+    """
+    Sidik source + script SEBELUM script tabel dijalankan:
+    {tabel: {"source", "script"}}, diteruskan ke catat() jika sukses.
+    """
+    src = make_engine(source_config)
+    with src.connect() as sconn:
+        return {
+            tabel: {
+                "source": sidik_source(sconn, tabel),
+                "script": sidik_script(tabel),
+            }
+            for tabel in tabel_list
+        }
+
+
+def catat(awal):
+    """
+    Catat sidik jari tabel yang baru saja sukses dimuat. `awal` = hasil
+    sidik_awal() sebelum script jalan; sidik target diambil sekarang.
+    """
+    semua = baca_json(FILE_SIDIK, {})
+    data = semua.setdefault(kunci_db(), {})
+
+    tgt = make_engine(target_config)
+    with tgt.connect() as tconn:
+        for tabel, isi in awal.items():
+            data[tabel] = {
+                "source": isi["source"],
+                "target": sidik_target(tconn, tabel),
+                "script": isi["script"],
+                "dicatat": datetime.now().isoformat(),
+            }
+    tulis_json(FILE_SIDIK, semua)
+
+
+# =====================================================
+# 4. RENCANA
+# =====================================================
+def banding(sconn, tconn, tabel, lama):
+    """Alasan tabel dimuat ulang, atau None jika boleh dilewati."""
+    if lama is None:
+        return "belum pernah dicatat"
+    if lama["script"] != sidik_script(tabel):
+        return "script berubah"
+    if lama["source"] != sidik_source(sconn, tabel):
+        return "source berubah"
+    if lama["target"] != sidik_target(tconn, tabel):
+        return "target tidak utuh"
+    return None
+
+
+def cmd_rencana():
+    # rencana lama tidak boleh dipakai jika rencana baru gagal dibuat
+    hapus_rencana()
+    if not AKTIF:
+        print("📌 MIG_SIDIK=0 → semua tabel dimuat ulang")
+        return
+
+    try:
+        buat_rencana()
+    except Exception as e:
+        hapus_rencana()
+        print(f"⚠ Rencana sidik jari gagal dibuat: {e}")
+        print("📌 Semua tabel dimuat ulang (tanpa lewati)")
+
+
+def buat_rencana():
+    data = baca_json(FILE_SIDIK, {}).get(kunci_db(), {})
+    lewati = set()
+    alasan = {}
+
+    src = make_engine(source_config)
+    tgt = make_engine(target_config)
+    with src.connect() as sconn, tgt.connect() as tconn:
+        for tabel in semua_tabel():
+            try:
+                sebab = banding(sconn, tconn, tabel, data.get(tabel))
+            except Exception as e:
+                sebab = f"gagal dicek: {str(e).splitlines()[0]}"
+            if sebab:
+                alasan[tabel] = sebab
+            else:
+                lewati.add(tabel)
+
+    for tabel, induk in TURUNAN.items():
+        for t in induk:
+            if tabel in lewati and t not in lewati:
+                lewati.discard(tabel)
+                alasan[tabel] = f"{t} dimuat ulang"
+
+    tulis_json(FILE_RENCANA, {
+        "db": kunci_db(),
+        "lewati": sorted(lewati),
+        "muat": alasan,
+        "dibuat": datetime.now().isoformat(),
+    })
+
+    print(f"⏭ DILEWATI ({len(lewati)} tabel, tidak berubah):")
+    for tabel in sorted(lewati):
+        print(" -", tabel)
+    print(f"\n🔄 DIMUAT ULANG ({len(alasan)} tabel):")
+    for tabel, sebab in sorted(alasan.items()):
+        print(f" - {tabel} ({sebab})")
+
+
+# =====================================================
+# 5. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sidik jari tabel migrasi")
+    parser.add_argument("cmd", nargs="?", default="rencana",
+                        choices=["rencana", "catat", "reset"])
+    parser.add_argument("tabel", nargs="*", help="untuk `catat`")
+    args = parser.parse_args()
+
+    print("==============================================================")
+    print(f"🚀 SIDIK JARI TABEL — {args.cmd.upper()}")
+    print("==============================================================\n")
+    print(f"📌 {kunci_db()}\n")
+
+    try:
+        if args.cmd == "rencana":
+            cmd_rencana()
+        elif args.cmd == "catat":
+            # manual: source dianggap tidak berubah sejak load terakhir
+            catat(sidik_awal(args.tabel or semua_tabel()))
+            print(f"✔ {len(args.tabel or semua_tabel())} tabel dicatat")
+        else:
+            for path in (FILE_SIDIK, FILE_RENCANA):
+                if os.path.exists(path):
+                    os.remove(path)
+            print("✔ Sidik jari dihapus → muat penuh di run berikutnya")
+    except Exception as e:
+        print("\n❌ ERROR SIDIK JARI!")
+        print("Error:", e)
+        sys.exit(1)
+
+    print("\n⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sampler status server SOURCE + TARGET selama migrasi satu tabel
+Tujuan: saat throughput turun di tengah run, kelihatan penyebabnya
+(redo log, flushing buffer pool, lock wait, disk, source sibuk).
+    - Tiap MIG_STATUS_INTERVAL detik (0 = mati): SHOW GLOBAL STATUS +
+      information_schema.innodb_trx (+ performance_schema jika aktif)
+      di target dan di tiap endpoint source yang dibaca
+    - Counter dicatat sebagai delta per detik, gauge apa adanya
+    - Ditulis sebagai event "status" di MIG_TELEMETRI_JSON, berdampingan
+      dengan event "batch" (ikut rows_migrasi = row engine pada
+      interval yang sama), plus satu baris di tampilan progress
+    - Akhir tabel: total / puncak per server + petunjuk penyebab
+Koneksi sampler terpisah dari reader/writer (tidak ikut snapshot).
+"""
+
+import os
+import time
+import threading
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+INTERVAL = float(os.getenv("MIG_STATUS_INTERVAL", "5"))
+
+# Bertambah terus → dicatat delta per detik
+COUNTER = (
+    "Innodb_rows_inserted",
+    "Innodb_rows_read",
+    "Innodb_log_waits",
+    "Innodb_buffer_pool_wait_free",
+    "Innodb_row_lock_waits",
+    "Innodb_row_lock_time",
+    "Innodb_data_fsyncs",
+    "Innodb_data_written",
+    "Innodb_os_log_written",
+    "Bytes_sent",
+    "Bytes_received",
+    "Questions",
+)
+
+# Nilai sesaat
+GAUGE = (
+    "Threads_running",
+    "Threads_connected",
+    "Innodb_buffer_pool_pages_dirty",
+    "Innodb_buffer_pool_pages_free",
+    "Innodb_data_pending_fsyncs",
+    "Innodb_row_lock_current_waits",
+)
+
+SQL_STATUS = (
+    "SHOW GLOBAL STATUS WHERE Variable_name IN ("
+    + ", ".join(f"'{k}'" for k in COUNTER + GAUGE) + ")"
+)
+
+SQL_TRX = (
+    "SELECT COUNT(*), SUM(trx_state = 'LOCK WAIT'), "
+    "MAX(TIMESTAMPDIFF(SECOND, trx_started, NOW())) "
+    "FROM information_schema.innodb_trx"
+)
+
+# waktu tunggu I/O file redo log (picodetik), butuh performance_schema
+SQL_REDO_IO = (
+    "SELECT SUM_TIMER_WAIT FROM performance_schema.file_summary_by_event_name "
+    "WHERE EVENT_NAME = 'wait/io/file/innodb/innodb_log_file'"
+)
+
+PETUNJUK = {
+    "Innodb_log_waits": "redo log buffer penuh → naikkan innodb_log_buffer_size",
+    "Innodb_buffer_pool_wait_free": "buffer pool menunggu halaman bersih → "
+                                    "flushing / disk lambat",
+    "Innodb_row_lock_waits": "ada lock wait (cek transaksi lain di server ini)",
+}
+
+
+# =====================================================
+# 2. SAMPEL SATU SERVER
+# =====================================================
+class Server:
+    """Satu koneksi sampler ke satu server (target / endpoint source)."""
+
+    def __init__(self, label, engine):
+        self.label = label
+        self.raw = engine.raw_connection()
+        self.pakai_pfs = True
+        self.lama = None
+        self.waktu = None
+        self.total = dict.fromkeys(COUNTER, 0)
+        self.puncak = {}
+        self.terakhir = {}
+
+    def baca(self):
+        cur = self.raw.cursor()
+        try:
+            cur.execute(SQL_STATUS)
+            nilai = {}
+            for nama, v in cur.fetchall():
+                try:
+                    nilai[nama] = int(v)
+                except (TypeError, ValueError):
+                    pass
+
+            cur.execute(SQL_TRX)
+            n, tunggu, terlama = cur.fetchone()
+            nilai["trx_aktif"] = int(n or 0)
+            nilai["trx_lock_wait"] = int(tunggu or 0)
+            nilai["trx_terlama_detik"] = int(terlama or 0)
+
+            if self.pakai_pfs:
+                try:
+                    cur.execute(SQL_REDO_IO)
+                    row = cur.fetchone()
+                    if row and row[0] is not None:
+                        nilai["redo_io_ms"] = int(row[0]) / 1e9
+                except Exception:
+                    self.pakai_pfs = False  # performance_schema mati / tanpa hak
+        finally:
+            cur.close()
+        # tutup transaksi baca (REPEATABLE READ, autocommit mati)
+        self.raw.rollback()
+        return nilai
+
+    def sampel(self):
+        """Delta per detik counter + gauge sejak sampel sebelumnya."""
+        now = time.monotonic()
+        nilai = self.baca()
+        lama, waktu = self.lama, self.waktu
+        self.lama, self.waktu = nilai, now
+        if lama is None:
+            return None
+
+        detik = now - waktu
+        hasil = {"detik": round(detik, 3)}
+        for k, v in nilai.items():
+            if k in COUNTER or k == "redo_io_ms":
+                d = max(v - lama.get(k, v), 0)
+                if k in self.total:
+                    self.total[k] += d
+                hasil[k] = round(d / detik, 1) if detik else 0
+            else:
+                hasil[k] = v
+            self.puncak[k] = max(self.puncak.get(k, 0), hasil[k])
+        self.terakhir = hasil
+        return hasil
+
+    def tutup(self):
+        if self.raw is None:
+            return
+        try:
+            self.raw.close()
+        except Exception:
+            pass
+        self.raw = None
+
+
+# =====================================================
+# 3. SAMPLER (thread)
+# =====================================================
+class SamplerStatus:
+    """
+    Thread sampler untuk satu tabel. servers = [(label, engine)].
+    Hasil tiap interval dikirim ke Telemetri (event JSON + baris tampilan).
+    """
+
+    def __init__(self, telemetri, servers, interval=INTERVAL):
+        self.telemetri = telemetri
+        self.interval = interval
+        self.servers = []
+        self.berhenti = threading.Event()
+        self.thread = None
+        self.rows_lama = 0
+        if interval <= 0:
+            return
+        for label, engine in servers:
+            try:
+                self.servers.append(Server(label, engine))
+            except Exception as e:
+                print(f"   ⚠ Sampler status {label} tidak bisa konek: {e}")
+
+    @property
+    def aktif(self):
+        return bool(self.servers)
+
+    def mulai(self):
+        if not self.aktif:
+            return self
+        self.putaran()   # sampel awal (basis delta)
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def selesai(self):
+        """Sampel terakhir, tutup koneksi. Aman dipanggil lebih dari sekali."""
+        if self.thread is not None:
+            self.berhenti.set()
+            self.thread.join()
+            self.thread = None
+            self.putaran()
+            self.telemetri.server = self.ringkasan()
+        for s in self.servers:
+            s.tutup()
+
+    def keterangan(self):
+        if not self.aktif:
+            return "OFF"
+        return (f"tiap {self.interval:g} detik "
+                f"({', '.join(s.label for s in self.servers)})")
+
+    def putaran(self):
+        rows = self.telemetri.rows
+        rows_delta, self.rows_lama = rows - self.rows_lama, rows
+        for s in self.servers:
+            try:
+                hasil = s.sampel()
+            except Exception as e:
+                hasil = None
+                self.telemetri.status[s.label] = f"⚠ {e}"
+            if hasil is None:
+                continue
+            self.telemetri.event("status", server=s.label,
+                                 rows_migrasi=rows_delta, **hasil)
+            self.telemetri.status[s.label] = baris_status(hasil)
+
+    def _loop(self):
+        while not self.berhenti.wait(self.interval):
+            self.putaran()
+
+    # ---------- ringkasan ----------
+    def ringkasan(self):
+        return {
+            s.label: {"total": dict(s.total), "puncak": dict(s.puncak)}
+            for s in self.servers
+        }
+
+    def laporan(self):
+        hasil = []
+        for s in self.servers:
+            if not s.puncak:
+                continue
+            t, p = s.total, s.puncak
+            hasil.append(
+                f"🖥 {s.label:<22} ins {t['Innodb_rows_inserted']:,} | "
+                f"read {t['Innodb_rows_read']:,} | "
+                f"log_waits {t['Innodb_log_waits']:,} | "
+                f"wait_free {t['Innodb_buffer_pool_wait_free']:,} | "
+                f"lock_waits {t['Innodb_row_lock_waits']:,} | "
+                f"threads_running maks {p.get('Threads_running', 0)}")
+            for k, teks in PETUNJUK.items():
+                if t[k]:
+                    hasil.append(f"   ⚠ {k}={t[k]:,}: {teks}")
+            if p.get("Innodb_data_pending_fsyncs"):
+                hasil.append("   ⚠ ada fsync tertunda → disk lambat")
+        return hasil
+
+
+def baris_status(h):
+    return (f"ins {h.get('Innodb_rows_inserted', 0):,.0f}/s | "
+            f"read {h.get('Innodb_rows_read', 0):,.0f}/s | "
+            f"log_waits {h.get('Innodb_log_waits', 0):g} | "
+            f"wait_free {h.get('Innodb_buffer_pool_wait_free', 0):g} | "
+            f"dirty {h.get('Innodb_buffer_pool_pages_dirty', 0):,} | "
+            f"lock_wait {h.get('trx_lock_wait', 0)} | "
+            f"thr {h.get('Threads_running', 0)}")
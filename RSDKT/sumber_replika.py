@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Baca source dari beberapa endpoint (primary + replika LIS)
+Konfigurasi .env:
+    SRC_REPLICA_HOSTS=10.0.0.12,10.0.0.13:3307   # user/password/db sama
+    MIG_REPLICA_LAG_MAX=5      # detik; replika lebih tertinggal → tidak dipakai
+    MIG_SRC_PRIMARY_BACA=0     # 0 = primary hanya dipakai jika tidak ada
+                               #     replika yang layak (lab tidak terbebani)
+Pembagian: satu tabel SELALU dibaca dari satu endpoint (crc32 nama
+tabel), tabel-tabel disebar antar endpoint. Dengan MIG_READERS>1 semua
+rentang PK tabel itu dibuka di endpoint yang sama, jadi snapshot tetap
+konsisten per tabel. Antar tabel di server berbeda titik waktunya bisa
+selisih sebesar lag replika; ekstrak_data.py (satu snapshot lintas
+tabel) karena itu membuka semua koneksinya di satu endpoint.
+"""
+
+import os
+import zlib
+
+from dotenv import load_dotenv
+
+from snapshot_sumber import buka_snapshot
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+REPLICA_HOSTS = [
+    h.strip() for h in os.getenv("SRC_REPLICA_HOSTS", "").split(",")
+    if h.strip()
+]
+LAG_MAX = float(os.getenv("MIG_REPLICA_LAG_MAX", "5"))
+PRIMARY_BACA = os.getenv("MIG_SRC_PRIMARY_BACA", "0") == "1"
+
+
+# =====================================================
+# 2. CEK LAG REPLIKA
+# =====================================================
+def lag_replika(engine):
+    """
+    Detik tertinggal replika, atau None jika replikasi berhenti /
+    server bukan replika.
+    """
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        for sql in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+            try:
+                cur.execute(sql)
+            except Exception:
+                continue  # MySQL < 8.0.22 / MariaDB lama: sintaks SLAVE
+            row = cur.fetchone()
+            if not row:
+                return None
+            # nama kolom ikut server, bukan perintah: MariaDB ≥ 10.5.1
+            # menerima REPLICA tapi tetap mengembalikan *_Master
+            nama = [d[0] for d in cur.description]
+            for kolom in ("Seconds_Behind_Source", "Seconds_Behind_Master"):
+                if kolom in nama:
+                    return row[nama.index(kolom)]
+            return None
+        return None
+    finally:
+        raw.close()
+
+
+def pilih_endpoint(host_primary, primary, replika):
+    """
+    [(host, engine)] yang layak dibaca: replika dengan lag ≤ LAG_MAX,
+    ditambah primary (jika PRIMARY_BACA atau tidak ada replika layak).
+    """
+    layak = []
+    for host, engine in replika:
+        try:
+            lag = lag_replika(engine)
+        except Exception as e:
+            print(f"   ⚠ Replika {host} tidak bisa dicek: {e}")
+            continue
+        if lag is None:
+            print(f"   ⚠ Replika {host}: replikasi tidak jalan → dilewati")
+        elif lag > LAG_MAX:
+            print(f"   ⚠ Replika {host}: lag {lag} detik > {LAG_MAX:g} → dilewati")
+        else:
+            print(f"   ✔ Replika {host}: lag {lag} detik")
+            layak.append((host, engine))
+
+    if PRIMARY_BACA or not layak:
+        layak.insert(0, (host_primary, primary))
+    return layak
+
+
+# =====================================================
+# 3. PEMBAGIAN KONEKSI
+# =====================================================
+def endpoint_tabel(endpoints, tabel):
+    """Endpoint tetap untuk satu tabel (stabil antar run)."""
+    return endpoints[zlib.crc32(tabel.encode()) % len(endpoints)]
+
+
+def engine_koneksi(endpoints, conn):
+    """Engine asal koneksi snapshot `conn` (KILL QUERY + reconnect)."""
+    per_host = {e.url.host: e for _, e in endpoints}
+    return per_host.get(getattr(conn, "host", None), endpoints[0][1])
+
+
+def buka_koneksi(endpoint, n):
+    """
+    n koneksi reader di SATU endpoint (host, engine), semuanya dalam satu
+    snapshot. Rentang PK satu tabel tidak boleh disebar antar server:
+    snapshot tiap server berbeda titik waktunya sebesar lag replika.
+    Hasil: (list koneksi, keterangan).
+    """
+    host, engine = endpoint
+    conns, ket = buka_snapshot(engine, n)
+    return conns, f"{host} ×{n} [{ket}]"
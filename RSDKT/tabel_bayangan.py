@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Load ke tabel bayangan + tukar atomik (RENAME TABLE)
+Aplikasi tetap bisa membaca tabel lama selama reload berjalan.
+Urutan:
+    1. python tabel_bayangan.py siapkan transaksi_lab transaksi_lab_detail
+       → CREATE TABLE <tabel>__new LIKE <tabel> (index ikut tersalin)
+         + FK tabel aktif dibuat ulang di bayangan (LIKE tidak menyalin FK)
+    2. MIG_SHADOW=1 python migrasi_transaksi_lab.py  (dst, script engine;
+       FK bayangan aktif → jalankan script induk sebelum anak)
+    3. python tabel_bayangan.py verifikasi transaksi_lab transaksi_lab_detail
+       → jumlah row vs source + cek orphan FK bayangan / tabel anak lain
+    4. python tabel_bayangan.py tukar transaksi_lab transaksi_lab_detail
+       → satu RENAME TABLE: <tabel> → <tabel>__old, <tabel>__new → <tabel>
+    5. rollback instan : python tabel_bayangan.py rollback <tabel...>
+       hapus cadangan  : python tabel_bayangan.py bersihkan <tabel...>
+FK: FK milik tabel bayangan ikut RENAME dengan benar. FK tabel anak LAIN
+ikut menunjuk ke <tabel>__old, jadi di langkah tukar yang sama FK itu
+dipindah ke tabel aktif (FOREIGN_KEY_CHECKS=0, metadata saja; orphan
+sudah dicek sebelum RENAME) lalu dicek keberadaannya. Jika pindah FK
+gagal, RENAME dibalik dan FK anak dikembalikan. Nama constraint unik per
+database → FK bayangan bergantian bernama <fk> / <fk>__new. Jika FK
+sedang dilepas (dropFK.py), pasang seperti biasa dengan restoreFK.py
+setelah tukar.
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+import engine_migrasi as eng
+import skema_fk
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+BARU = eng.SHADOW_SUFFIX
+LAMA = "__old"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def ada_tabel(conn, nama):
+    return conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        (nama,)).scalar() > 0
+
+
+def hitung(conn, nama):
+    return conn.exec_driver_sql(f"SELECT COUNT(*) FROM `{nama}`").scalar()
+
+
+def nama_fk_bayangan(nama):
+    """Nama constraint unik per database: bergantian <fk> ↔ <fk>__new."""
+    return nama[:-len(BARU)] if nama.endswith(BARU) else nama + BARU
+
+
+def bentuk_fk(fk):
+    return (tuple(fk["kolom"]), fk["ref_tabel"], tuple(fk["ref_kolom"]))
+
+
+def fk_hilang(conn, fks):
+    """FK di `fks` yang tidak ada / tidak menunjuk ke ref_tabel-nya."""
+    ada = {(fk["tabel"], fk["nama"]): fk["ref_tabel"]
+           for fk in skema_fk.ambil_fk(conn)}
+    return [fk for fk in fks
+            if ada.get((fk["tabel"], fk["nama"])) != fk["ref_tabel"]]
+
+
+def pasang_ulang_fk(conn, fks):
+    """Drop (jika ada) + add FK agar menunjuk ke ref_tabel (metadata saja)."""
+    ada = {(fk["tabel"], fk["nama"]) for fk in skema_fk.ambil_fk(conn)}
+    conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for fk in fks:
+            if (fk["tabel"], fk["nama"]) in ada:
+                conn.exec_driver_sql(skema_fk.sql_hapus_fk(fk))
+            conn.exec_driver_sql(skema_fk.sql_tambah_fk(fk))
+    finally:
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+
+
+# =====================================================
+# 2. SIAPKAN
+# =====================================================
+def cmd_siapkan(tgt, tabel_list):
+    set_tabel = set(tabel_list)
+
+    with tgt.connect() as conn:
+        for t in tabel_list:
+            if ada_tabel(conn, t + LAMA):
+                raise ValueError(
+                    f"Tabel {t}{LAMA} masih ada — jalankan `bersihkan` dulu")
+
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+        try:
+            for t in tabel_list:
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{t}{BARU}`")
+                conn.exec_driver_sql(f"CREATE TABLE `{t}{BARU}` LIKE `{t}`")
+                print(f"   ✔ {t}{BARU} dibuat (LIKE {t})")
+        finally:
+            conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+
+        # LIKE tidak menyalin FK → dibuat di bayangan SEBELUM load, agar
+        # load + verifikasi berjalan dengan cek referensial
+        fks = [fk for fk in skema_fk.ambil_fk(conn) if fk["tabel"] in set_tabel]
+        for fk in fks:
+            ref = fk["ref_tabel"]
+            conn.exec_driver_sql(skema_fk.sql_tambah_fk(
+                dict(fk, nama=nama_fk_bayangan(fk["nama"])),
+                tabel=fk["tabel"] + BARU,
+                ref_tabel=ref + BARU if ref in set_tabel else ref))
+        if fks:
+            print(f"   ✔ {len(fks)} FK dibuat di tabel bayangan")
+        else:
+            print("   ⚠ Tidak ada FK di tabel aktif (sedang dilepas?) → "
+                  "pasang dengan restoreFK.py setelah tukar")
+
+    print("\n👉 Lanjut: jalankan script migrasi dengan MIG_SHADOW=1")
+
+
+# =====================================================
+# 3. VERIFIKASI
+# =====================================================
+def cek_orphan(conn, fk, anak, induk):
+    on = " AND ".join(
+        f"c.`{a}` = p.`{b}`" for a, b in zip(fk["kolom"], fk["ref_kolom"]))
+    not_null = " AND ".join(f"c.`{a}` IS NOT NULL" for a in fk["kolom"])
+    return conn.exec_driver_sql(
+        f"SELECT COUNT(*) FROM `{anak}` c LEFT JOIN `{induk}` p ON {on} "
+        f"WHERE {not_null} AND p.`{fk['ref_kolom'][0]}` IS NULL").scalar()
+
+
+def cmd_verifikasi(src, tgt, tabel_list):
+    set_tabel = set(tabel_list)
+    gagal = 0
+
+    print("🔍 Jumlah row source vs bayangan:")
+    with src.connect() as sconn, tgt.connect() as tconn:
+        for t in tabel_list:
+            if not ada_tabel(tconn, t + BARU):
+                print(f"   ❌ {t}{BARU} tidak ada")
+                gagal += 1
+                continue
+
+            spec = eng.muat_spec(t)
+            n_src = hitung(sconn, spec["tabel"])
+            n_baru = hitung(tconn, t + BARU)
+
+            # transform boleh men-skip row → bayangan boleh lebih sedikit
+            if n_baru == n_src:
+                status = "✔"
+            elif spec.get("transform") and 0 < n_baru < n_src:
+                status = "⚠ (row di-skip transform)"
+            else:
+                status = "❌"
+                gagal += 1
+            print(f"   {status} {t}: source {n_src} | bayangan {n_baru}")
+
+        fks = skema_fk.ambil_fk(tconn) or skema_fk.fk_dari_backup(BASE_DIR)
+        cek = []
+        for fk in fks:
+            anak, induk = fk["tabel"], fk["ref_tabel"]
+            if anak in set_tabel:
+                # FK bayangan (anak bayangan → induk bayangan / induk lain)
+                cek.append((fk, anak + BARU,
+                            induk + BARU if induk in set_tabel else induk))
+            elif induk in set_tabel and not anak.endswith((BARU, LAMA)):
+                # tabel anak lain yang akan dipindah ke bayangan saat tukar
+                cek.append((fk, anak, induk + BARU))
+
+        print(f"\n🔍 Cek orphan FK ({len(cek)} FK):")
+        for fk, anak, induk in cek:
+            n = cek_orphan(tconn, fk, anak, induk)
+            status = "✔" if n == 0 else "❌"
+            if n:
+                gagal += 1
+            print(f"   {status} {fk['tabel']}.{','.join(fk['kolom'])} → "
+                  f"{fk['ref_tabel']}: {n} orphan")
+
+    if gagal:
+        print(f"\n❌ Verifikasi GAGAL ({gagal} masalah). Jangan tukar dulu.")
+        sys.exit(1)
+    print("\n✅ Verifikasi OK — siap ditukar.")
+
+
+# =====================================================
+# 4. TUKAR / ROLLBACK
+# =====================================================
+def tukar(tgt, tabel_list, simpan, masuk):
+    """
+    Satu RENAME TABLE atomik: <t> → <t><simpan>, <t><masuk> → <t>.
+    Sebelum RENAME: tabel masuk wajib punya FK yang sama dengan tabel aktif
+    dan tabel anak lain tidak boleh orphan terhadapnya. Setelah RENAME FK
+    tabel anak lain dipindah ke tabel aktif lalu dicek; jika gagal RENAME
+    dibalik dan FK anak dikembalikan.
+    """
+    set_tabel = set(tabel_list)
+
+    with tgt.connect() as conn:
+        for t in tabel_list:
+            if not ada_tabel(conn, t + masuk):
+                raise ValueError(f"Tabel {t}{masuk} tidak ada")
+            if ada_tabel(conn, t + simpan):
+                raise ValueError(
+                    f"Tabel {t}{simpan} masih ada — jalankan `bersihkan` dulu")
+
+        semua = skema_fk.ambil_fk(conn)
+
+        # FK milik tabel masuk ikut RENAME → harus sudah sama dengan aktif
+        punya = {(fk["tabel"], bentuk_fk(fk)) for fk in semua}
+        kurang = [
+            fk for fk in semua if fk["tabel"] in set_tabel and (
+                fk["tabel"] + masuk,
+                bentuk_fk(dict(fk, ref_tabel=fk["ref_tabel"] + masuk
+                               if fk["ref_tabel"] in set_tabel
+                               else fk["ref_tabel"]))) not in punya]
+        if kurang:
+            raise ValueError(
+                f"{len(kurang)} FK belum ada di tabel *{masuk} (mis. "
+                f"{kurang[0]['tabel']}.{kurang[0]['nama']}) — jalankan "
+                "`siapkan` ulang")
+
+        # FK tabel anak lain ikut RENAME ke <simpan> → dipindah ke aktif
+        anak = [fk for fk in semua
+                if fk["ref_tabel"] in set_tabel and fk["tabel"] not in set_tabel
+                and not fk["tabel"].endswith((BARU, LAMA))]
+        for fk in anak:
+            n = cek_orphan(conn, fk, fk["tabel"], fk["ref_tabel"] + masuk)
+            if n:
+                raise ValueError(
+                    f"{fk['tabel']}.{','.join(fk['kolom'])}: {n} orphan "
+                    f"terhadap {fk['ref_tabel']}{masuk} — batal tukar")
+
+        rename = ", ".join(
+            f"`{t}` TO `{t}{simpan}`, `{t}{masuk}` TO `{t}`"
+            for t in tabel_list)
+        conn.exec_driver_sql(f"RENAME TABLE {rename}")
+        print(f"   ✔ RENAME TABLE atomik ({len(tabel_list)} tabel)")
+
+        if not anak:
+            return
+        try:
+            pasang_ulang_fk(conn, anak)
+            hilang = fk_hilang(conn, anak)
+            if hilang:
+                raise RuntimeError(
+                    f"{len(hilang)} FK anak tidak menunjuk ke tabel aktif "
+                    f"(mis. {hilang[0]['tabel']}.{hilang[0]['nama']})")
+        except Exception:
+            print("   ❌ Pindah FK anak gagal → RENAME dibalik")
+            balik = ", ".join(
+                f"`{t}` TO `{t}{masuk}`, `{t}{simpan}` TO `{t}`"
+                for t in tabel_list)
+            conn.exec_driver_sql(f"RENAME TABLE {balik}")
+            pasang_ulang_fk(conn, fk_hilang(conn, anak))
+            raise
+        print(f"   ✔ {len(anak)} FK tabel anak dipindah ke tabel aktif")
+
+
+def cmd_bersihkan(tgt, tabel_list):
+    with tgt.connect() as conn:
+        for t in tabel_list:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{t}{LAMA}`")
+            print(f"   ✔ {t}{LAMA} dihapus")
+
+
+# =====================================================
+# 5. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tabel bayangan + swap")
+    parser.add_argument(
+        "cmd", choices=["siapkan", "verifikasi", "tukar", "rollback",
+                        "bersihkan"])
+    parser.add_argument("tabel", nargs="+")
+    args = parser.parse_args()
+
+    tgt = eng.make_engine(eng.target_config)
+
+    print("==============================================================")
+    print(f"🚀 TABEL BAYANGAN — {args.cmd.upper()}")
+    print("==============================================================\n")
+    print(f"📌 TARGET DB : {eng.target_config['database']}")
+    print(f"📌 Tabel     : {', '.join(args.tabel)}\n")
+
+    try:
+        if args.cmd == "siapkan":
+            cmd_siapkan(tgt, args.tabel)
+        elif args.cmd == "verifikasi":
+            src = eng.make_engine(eng.source_config)
+            cmd_verifikasi(src, tgt, args.tabel)
+        elif args.cmd == "tukar":
+            tukar(tgt, args.tabel, LAMA, BARU)
+            print(f"\n✅ Tabel baru aktif. Tabel lama tersimpan sebagai *{LAMA}")
+        elif args.cmd == "rollback":
+            tukar(tgt, args.tabel, BARU, LAMA)
+            print(f"\n✅ Tabel lama aktif kembali. Data baru di *{BARU}")
+        else:
+            cmd_bersihkan(tgt, args.tabel)
+    except Exception as e:
+        print("\n❌ ERROR TABEL BAYANGAN!")
+        print("Error:", e)
+        sys.exit(1)
+
+    print("\n⏱ Selesai pada:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    print("==============================================================")
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Progress + metrik bersama untuk semua script migrasi
+    - progress_bar(cur, total) : pengganti progress_bar() lokal di tiap
+      script; aman dipanggil per row (tampilan dibatasi per
+      MIG_PROGRESS_INTERVAL), plus row/s dan ETA
+    - Telemetri                : dipakai engine_migrasi; hot loop hanya
+      menambah counter per batch, tampilan digambar thread terpisah
+      secara berkala (satu baris per tabel, satu baris per rentang PK
+      jika reader paralel, satu baris porsi waktu per stage)
+    - Event JSON per batch (MIG_TELEMETRI_JSON=path.jsonl):
+      tabel, batch, rows, bytes, fetch_ms, transform_ms, write_ms,
+      commit_ms (+ event "mulai" / "selesai")
+    - Laporan akhir per tabel: p50 / p95 / p99 / total tiap stage
+    - Byte per kolom (sampel MIG_BYTE_SAMPEL row per batch): dibaca
+      dari source dan ditulis ke target, laporan kolom terbesar
+    - Baris + event "status" server source / target dari
+      status_server.py (jika sampler aktif)
+    - Profil opsional (MIG_PROFIL=1): cProfile thread writer disimpan
+      ke MIG_PROFIL_DIR/<tabel>_<waktu>_writer.prof
+    - Dasbor (MIG_DASBOR=1): status tiap tabel (row, row/s, ETA, tahap,
+      error) ditulis ke MIG_DASBOR_DIR untuk dasbor.py, juga dari
+      progress_bar() script lama
+Di luar terminal (log file / nohup), atau jika dasbor aktif (progress
+beberapa script tidak saling timpa), tampilan ditulis satu baris per
+MIG_PROGRESS_LOG detik, bukan digambar ulang.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from array import array
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+
+# =====================================================
+# 1. KONFIGURASI
+# =====================================================
+load_dotenv()
+
+# Jeda minimal (detik) antar update tampilan progress
+PROGRESS_INTERVAL = float(os.getenv("MIG_PROGRESS_INTERVAL", "0.5"))
+
+# Jeda (detik) antar baris progress jika stdout bukan terminal
+PROGRESS_LOG = float(os.getenv("MIG_PROGRESS_LOG", "10"))
+
+# File event JSON (satu objek per baris), kosong = tidak ditulis
+TELEMETRI_JSON = os.getenv("MIG_TELEMETRI_JSON", "")
+
+STAGE = ("fetch_ms", "transform_ms", "write_ms", "commit_ms")
+
+# Row yang diukur per batch untuk byte per kolom
+BYTE_SAMPEL = int(os.getenv("MIG_BYTE_SAMPEL", "200"))
+
+# cProfile per tabel (mahal, hanya untuk analisis)
+PROFIL = os.getenv("MIG_PROFIL", "0") == "1"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFIL_DIR = os.getenv("MIG_PROFIL_DIR", os.path.join(BASE_DIR, "profil"))
+
+# Status per tabel untuk dasbor.py (satu file JSON per proses + tabel)
+DASBOR = os.getenv("MIG_DASBOR", "0") == "1"
+DASBOR_DIR = os.getenv("MIG_DASBOR_DIR", os.path.join(BASE_DIR, "dasbor"))
+
+TTY = sys.stdout.isatty()
+
+# Digambar ulang di tempat (\r / ANSI) hanya di terminal tanpa dasbor
+GAMBAR_ULANG = TTY and not DASBOR
+
+
+def format_durasi(detik):
+    if detik is None:
+        return "--:--:--"
+    detik = int(detik)
+    return f"{detik // 3600:02d}:{detik % 3600 // 60:02d}:{detik % 60:02d}"
+
+
+def persentil(values, p):
+    """Persentil nearest-rank (values tidak perlu urut)."""
+    if not values:
+        return 0.0
+    urut = sorted(values)
+    k = max(math.ceil(p / 100 * len(urut)) - 1, 0)
+    return urut[k]
+
+
+def ukuran(v):
+    """Perkiraan byte satu nilai di wire (str UTF-8, bytes apa adanya, lain 8)."""
+    if v is None:
+        return 0
+    if isinstance(v, str):
+        return len(v) if v.isascii() else len(v.encode("utf-8"))
+    if isinstance(v, (bytes, bytearray)):
+        return len(v)
+    return 8
+
+
+def byte_kolom(rows):
+    """Perkiraan byte per kolom satu batch dari sampel ±BYTE_SAMPEL row."""
+    n = len(rows)
+    if not n:
+        return []
+    step = max(n // BYTE_SAMPEL, 1)
+    total = [0] * len(rows[0])
+    dihitung = 0
+    for i in range(0, n, step):
+        for j, v in enumerate(rows[i]):
+            total[j] += ukuran(v)
+        dihitung += 1
+    return [t * n // dihitung for t in total]
+
+
+def format_byte(n):
+    for satuan in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:,.1f} {satuan}" if satuan != "B" else f"{n:,.0f} B"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+def tabel_script():
+    """Nama tabel dari nama script (migrasi_<tabel>.py), untuk script lama."""
+    nama = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    return nama[len("migrasi_"):] if nama.startswith("migrasi_") else nama
+
+
+def tulis_papan(tabel, isi):
+    """Status satu tabel untuk dasbor.py (atomik; gagal tulis diabaikan)."""
+    if not DASBOR:
+        return
+    path = os.path.join(DASBOR_DIR, f"tabel_{os.getpid()}_{tabel}.json")
+    isi = dict(isi, tabel=tabel, pid=os.getpid(),
+               script=os.path.basename(sys.argv[0]), ts=time.time())
+    try:
+        os.makedirs(DASBOR_DIR, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(isi, f, default=str)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass  # dasbor hanya tampilan, migrasi jalan terus
+
+
+def bar(cur, total, bar_len=40):
+    filled = int(bar_len * cur / total) if total else bar_len
+    filled = min(filled, bar_len)
+    percent = (cur / total * 100) if total else 100
+    return f"|{'█' * filled}{'-' * (bar_len - filled)}| {percent:5.1f}%"
+
+
+# =====================================================
+# 2. PROGRESS BAR SEDERHANA (script lama)
+# =====================================================
+_progress = {"mulai": None, "mulai_ts": None, "terakhir": -1,
+             "berikut": 0.0, "log": 0.0}
+
+
+def progress_bar(cur, total, tabel=None):
+    """
+    Boleh dipanggil tiap row: yang benar-benar digambar hanya tiap
+    PROGRESS_INTERVAL detik (dan saat selesai). Tanpa `tabel`, nama
+    tabel di dasbor diambil dari nama script.
+    """
+    now = time.monotonic()
+    st = _progress
+    if st["mulai"] is None or cur < st["terakhir"]:
+        st["mulai"] = now           # tabel / putaran baru
+        st["mulai_ts"] = time.time()
+        st["berikut"] = 0.0
+        st["log"] = now + PROGRESS_LOG
+    st["terakhir"] = cur
+
+    if now < st["berikut"] and cur < total:
+        return
+    st["berikut"] = now + PROGRESS_INTERVAL
+
+    lama = now - st["mulai"]
+    rate = cur / lama if lama > 0 else 0.0
+    eta = (total - cur) / rate if rate and total > cur else 0
+    tulis_papan(tabel or tabel_script(), dict(
+        rows=cur, total=total, rate=round(rate, 1), eta=round(eta, 1),
+        mulai=st["mulai_ts"], tahap="jalan",
+        state="selesai" if cur >= total else "jalan"))
+
+    teks = (f"🔄 Progress: {bar(cur, total)} | {rate:,.0f} row/s | "
+            f"ETA {format_durasi(eta)}")
+    if GAMBAR_ULANG:
+        sys.stdout.write(f"\r{teks}   ")
+    elif now >= st["log"] or cur >= total:
+        st["log"] = now + PROGRESS_LOG
+        sys.stdout.write(teks + "\n")
+    sys.stdout.flush()
+
+
+# =====================================================
+# 3. TELEMETRI ENGINE
+# =====================================================
+class Telemetri:
+    """
+    Metrik satu tabel. Writer memanggil batch() sekali per batch;
+    thread tampilan membaca counter tiap PROGRESS_INTERVAL.
+    """
+
+    def __init__(self, tabel, total, info=None, kolom_sumber=(),
+                 kolom_target=()):
+        self.tabel = tabel
+        self.total = total
+        self.info = info or {}
+        self.rows = 0
+        self.ditulis = 0
+        self.bytes = 0
+        self.bytes_tulis = 0
+        self.kolom_sumber = list(kolom_sumber)
+        self.kolom_target = list(kolom_target)
+        self.kolom_baca = array("q", [0] * len(self.kolom_sumber))
+        self.kolom_tulis = array("q", [0] * len(self.kolom_target))
+        self.n_batch = 0
+        self.n_error = 0
+        self.n_retry = 0
+        self.antrean = None        # queue prefetch (kedalaman antrean)
+        self.reader = {}           # nama reader → stat (baca_batch)
+        self.memori = None         # ringkasan memori.py
+        self.rss = 0               # RSS terakhir (byte, memori.py)
+        self.tahap = "mulai"       # langkah writer saat ini (diisi engine)
+        self.state = "jalan"       # jalan / selesai / gagal
+        self.stage = dict.fromkeys(STAGE, 0.0)
+        self.durasi = {k: array("d") for k in STAGE}   # per batch
+        self.rentang = {}          # (lo, hi) → rows
+        self.lock = threading.Lock()
+        self.berhenti = threading.Event()
+        self.thread = None
+        self.n_baris = 0
+        self.mulai_t = None
+        self.mulai_ts = None
+        self.json = None
+        self.json_lock = threading.Lock()
+        self.status = {}           # label server → baris (status_server.py)
+        self.server = None         # ringkasan sampler status
+
+    # ---------- siklus ----------
+    def mulai(self):
+        self.mulai_t = time.monotonic()
+        self.mulai_ts = time.time()
+        if TELEMETRI_JSON:
+            self.json = open(TELEMETRI_JSON, "a", encoding="utf-8")
+            self.event("mulai", total=self.total, **self.info)
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def selesai(self, state="selesai"):
+        """Tampilan + ringkasan akhir. Hanya panggilan pertama berlaku."""
+        if self.mulai_t is None or self.state != "jalan":
+            return None
+        self.state = state
+        self.berhenti.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.gambar(akhir=True)
+        self.papan()
+        ringkas = self.ringkasan()
+        if self.json is not None:
+            self.event("selesai", **ringkas)
+            with self.json_lock:
+                self.json.close()
+                self.json = None
+        return ringkas
+
+    # ---------- hot loop ----------
+    def batch(self, meta, rows, ditulis, write_ms, commit_ms):
+        ms = (meta.get("fetch_ms", 0.0), meta.get("transform_ms", 0.0),
+              write_ms, commit_ms)
+        with self.lock:
+            self.n_batch += 1
+            self.rows += rows
+            self.ditulis += ditulis
+            self.bytes += meta.get("bytes", 0)
+            for akun, nilai in ((self.kolom_baca, meta.get("bytes_kolom")),
+                                (self.kolom_tulis, meta.get("bytes_kolom_tulis"))):
+                if nilai and len(nilai) == len(akun):
+                    for j, b in enumerate(nilai):
+                        akun[j] += b
+            self.bytes_tulis += sum(meta.get("bytes_kolom_tulis") or ())
+            for k, v in zip(STAGE, ms):
+                self.stage[k] += v
+                self.durasi[k].append(v)
+            r = meta.get("rentang")
+            if r is not None:
+                self.rentang[r] = self.rentang.get(r, 0) + rows
+
+        if self.json is not None:
+            self.event(
+                "batch",
+                batch=self.n_batch,
+                rentang=meta.get("rentang"),
+                rows=rows,
+                ditulis=ditulis,
+                bytes=meta.get("bytes", 0),
+                bytes_tulis=sum(meta.get("bytes_kolom_tulis") or ()),
+                fetch_ms=round(meta.get("fetch_ms", 0.0), 3),
+                transform_ms=round(meta.get("transform_ms", 0.0), 3),
+                write_ms=round(write_ms, 3),
+                commit_ms=round(commit_ms, 3),
+            )
+
+    def event(self, jenis, **isi):
+        """Satu baris JSON; dipanggil writer dan thread sampler status."""
+        isi = dict(event=jenis, ts=datetime.now().isoformat(),
+                   tabel=self.tabel, **isi)
+        with self.json_lock:
+            if self.json is not None:
+                self.json.write(json.dumps(isi, default=str) + "\n")
+
+    # ---------- tampilan ----------
+    def ringkasan(self):
+        detik = time.monotonic() - self.mulai_t
+        hasil = {
+            "rows": self.rows,
+            "ditulis": self.ditulis,
+            "bytes": self.bytes,
+            "bytes_tulis": self.bytes_tulis,
+            "bytes_kolom": self.bytes_per_kolom(),
+            "batch": self.n_batch,
+            "retry": self.n_retry,
+            "detik": round(detik, 3),
+            **{k: round(v, 3) for k, v in self.stage.items()},
+            "persentil": self.persentil_stage(),
+        }
+        if self.server is not None:
+            hasil["server"] = self.server
+        if self.memori is not None:
+            hasil["memori"] = self.memori
+        return hasil
+
+    def bytes_per_kolom(self):
+        return {
+            "baca": dict(zip(self.kolom_sumber, self.kolom_baca)),
+            "tulis": dict(zip(self.kolom_target, self.kolom_tulis)),
+        }
+
+    def laporan_byte(self, n=8):
+        """Kolom dengan byte dibaca terbesar + ukuran batch (bahan batch sizing)."""
+        if not self.bytes or not self.rows:
+            return []
+        tulis = dict(zip(self.kolom_target, self.kolom_tulis))
+        detik = time.monotonic() - self.mulai_t
+        hasil = [
+            f"📦 Byte: baca {format_byte(self.bytes)} "
+            f"({self.bytes / self.rows:,.0f} B/row, "
+            f"{self.bytes / detik / 1e6 if detik else 0:,.1f} MB/s) | "
+            f"tulis {format_byte(self.bytes_tulis)}"
+            + (f" ({self.bytes_tulis / self.ditulis:,.0f} B/row)"
+               if self.ditulis else ""),
+            f"   ≈ {format_byte(self.bytes / self.rows * self.info.get('batch_size', 0))}"
+            f" per batch source",
+            f"   {'kolom':<24} {'baca':>12} {'%':>6} {'B/row':>8} {'tulis':>12}",
+        ]
+        urut = sorted(zip(self.kolom_sumber, self.kolom_baca),
+                      key=lambda x: -x[1])
+        for kolom, b in urut[:n]:
+            t = tulis.get(kolom)
+            hasil.append(
+                f"   {kolom:<24} {format_byte(b):>12} "
+                f"{b / self.bytes * 100:5.1f}% {b / self.rows:8,.0f} "
+                f"{format_byte(t) if t is not None else '-':>12}")
+        return hasil
+
+    def persentil_stage(self):
+        return {
+            k: {f"p{p}": round(persentil(v, p), 3) for p in (50, 95, 99)}
+            for k, v in self.durasi.items()
+        }
+
+    def laporan(self):
+        """Baris laporan p50/p95/p99/total per stage (ms per batch)."""
+        if not self.n_batch:
+            return []
+        hasil = [f"📊 Stage per batch (ms)  {'p50':>9} {'p95':>9} "
+                 f"{'p99':>9} {'total (s)':>10}"]
+        for k, per in self.persentil_stage().items():
+            hasil.append(
+                f"   {k[:-3]:<20} {per['p50']:9.1f} {per['p95']:9.1f} "
+                f"{per['p99']:9.1f} {self.stage[k] / 1000:10.2f}")
+        return hasil
+
+    def laju(self):
+        """(row, row/s, ETA detik) rata-rata sejak mulai."""
+        rows = self.rows
+        lama = time.monotonic() - self.mulai_t
+        rate = rows / lama if lama > 0 else 0.0
+        eta = (self.total - rows) / rate if rate and self.total > rows else 0
+        return rows, rate, eta
+
+    def papan(self):
+        """Status untuk dasbor.py (jika MIG_DASBOR=1)."""
+        if not DASBOR:
+            return
+        with self.lock:
+            rentang = sorted(self.rentang.items())
+        rows, rate, eta = self.laju()
+        tulis_papan(self.tabel, dict(
+            rows=rows, total=self.total, ditulis=self.ditulis,
+            rate=round(rate, 1), eta=round(eta, 1), mulai=self.mulai_ts,
+            tahap=self.tahap, error=self.n_error, retry=self.n_retry,
+            antrean=self.antrean.qsize() if self.antrean is not None else None,
+            rentang=[[lo, hi, n] for (lo, hi), n in rentang]
+            if len(rentang) > 1 else [],
+            state=self.state))
+
+    def baris(self):
+        with self.lock:
+            nbytes = self.bytes
+            stage = dict(self.stage)
+            rentang = sorted(self.rentang.items())
+
+        rows, rate, eta = self.laju()
+        lama = time.monotonic() - self.mulai_t
+        mbps = nbytes / lama / 1e6 if lama > 0 else 0.0
+
+        hasil = [
+            f"🔄 {self.tabel} {bar(rows, self.total)} | {rate:,.0f} row/s | "
+            f"{mbps:,.1f} MB/s | ETA {format_durasi(eta)}"
+        ]
+        if len(rentang) > 1:
+            for (lo, hi), n in rentang:
+                hasil.append(f"   ↳ PK ({lo}, {hi}]: {n:,} row")
+        total_ms = sum(stage.values())
+        if total_ms:
+            porsi = " | ".join(
+                f"{k[:-3]} {v / total_ms * 100:4.1f}%" for k, v in stage.items())
+            hasil.append(f"   ⏱ {porsi}")
+        for label, teks in list(self.status.items()):
+            hasil.append(f"   🖥 {label}: {teks}")
+        return hasil
+
+    def gambar(self, akhir=False):
+        lines = self.baris()
+        if GAMBAR_ULANG:
+            # naik ke baris pertama tampilan sebelumnya lalu timpa
+            naik = f"\x1b[{self.n_baris - 1}F" if self.n_baris > 1 else "\r"
+            sys.stdout.write(naik + "\n".join(l + "\x1b[K" for l in lines))
+            self.n_baris = len(lines)
+            if akhir:
+                sys.stdout.write("\n")
+        else:
+            sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    def _loop(self):
+        if GAMBAR_ULANG or not DASBOR:
+            jeda = PROGRESS_INTERVAL if GAMBAR_ULANG else PROGRESS_LOG
+            langkah = 1
+        else:
+            # dasbor diperbarui lebih sering dari baris log
+            jeda = PROGRESS_INTERVAL
+            langkah = max(round(PROGRESS_LOG / PROGRESS_INTERVAL), 1)
+        n = 0
+        while not self.berhenti.wait(jeda):
+            self.papan()
+            n += 1
+            if n % langkah == 0:
+                self.gambar()
+
+
+# =====================================================
+# 4. PROFIL (cProfile thread writer)
+# =====================================================
+class Profil:
+    """
+    cProfile untuk thread pemanggil (aktif hanya jika MIG_PROFIL=1).
+    Hanya SATU Profil boleh aktif per proses: sejak Python 3.12 cProfile
+    memakai sys.monitoring (satu profiler untuk seluruh proses), enable()
+    kedua melempar ValueError. Karena itu hanya thread writer yang
+    diprofil; thread reader dan worker process tidak ikut (waktu fetch
+    tetap terlihat di telemetri fetch_ms).
+    """
+
+    def __init__(self, tabel, nama):
+        self.prof = cProfile.Profile() if PROFIL else None
+        self.path = os.path.join(
+            PROFIL_DIR,
+            f"{tabel}_{datetime.now():%Y%m%d_%H%M%S}_{nama}.prof")
+
+    def __enter__(self):
+        if self.prof is not None:
+            self.prof.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.prof is None:
+            return False
+        self.prof.disable()
+        os.makedirs(PROFIL_DIR, exist_ok=True)
+        self.prof.dump_stats(self.path)
+        return False
+
+    def teratas(self, n=15):
+        """Ringkasan fungsi termahal (cumulative) untuk dicetak."""
+        if self.prof is None:
+            return ""
+        buf = StringIO()
+        pstats.Stats(self.prof, stream=buf).sort_stats(
+            "cumulative").print_stats(n)
+        return buf.getvalue()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ukur volume data per tabel / per kolom langsung di SOURCE
+Pelengkap byte per kolom di engine_migrasi (telemetri.py), untuk tabel
+yang script-nya belum memakai engine (sessions, users, ...):
+    - tanpa argumen : daftar tabel terbesar (information_schema, murah)
+    - dengan tabel  : SUM(LENGTH(kolom)) per kolom dihitung di server,
+                      yang dikirim balik hanya angka ringkasannya
+Pakai:
+    python ukur_kolom.py                       # tabel terbesar
+    python ukur_kolom.py sessions users        # byte per kolom (scan penuh)
+    python ukur_kolom.py transaksi_lab --sampel 100000
+Scan penuh membaca seluruh tabel di server source → jalankan di luar
+jam sibuk atau lewat replika (SRC_REPLICA_HOSTS, lihat sumber_replika.py).
+--sampel N hanya mengukur N row pertama (cepat, bias ke data lama).
+"""
+
+import sys
+import argparse
+
+from sqlalchemy import text
+
+import engine_migrasi as eng
+from sumber_replika import endpoint_tabel
+from telemetri import format_byte
+
+
+# =====================================================
+# 1. DAFTAR TABEL TERBESAR
+# =====================================================
+def daftar_tabel(conn, n):
+    rows = conn.execute(text(
+        "SELECT table_name, table_rows, data_length, index_length "
+        "FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_type = 'BASE TABLE' "
+        "ORDER BY data_length DESC LIMIT :n"), {"n": n}).fetchall()
+
+    total = sum(r[2] or 0 for r in rows)
+    print(f"{'tabel':<32} {'row (perkiraan)':>16} {'data':>12} {'%':>6} "
+          f"{'B/row':>8} {'index':>12}")
+    for nama, n_row, data, index in rows:
+        data = data or 0
+        print(f"{nama:<32} {n_row or 0:>16,} {format_byte(data):>12} "
+              f"{data / total * 100 if total else 0:5.1f}% "
+              f"{data / n_row if n_row else 0:8,.0f} "
+              f"{format_byte(index or 0):>12}")
+
+
+# =====================================================
+# 2. BYTE PER KOLOM
+# =====================================================
+def ukur_tabel(conn, tabel, sampel=None):
+    kolom = conn.execute(text(
+        "SELECT column_name, column_type FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = :t "
+        "ORDER BY ordinal_position"), {"t": tabel}).fetchall()
+    if not kolom:
+        raise ValueError(f"Tabel {tabel} tidak ada di source")
+
+    jumlah = ", ".join(f"SUM(LENGTH(`{k}`))" for k, _ in kolom)
+    sumber = f"`{tabel}`"
+    if sampel:
+        sumber = f"(SELECT * FROM `{tabel}` LIMIT {int(sampel)}) AS s"
+    hasil = conn.execute(text(
+        f"SELECT COUNT(*), {jumlah} FROM {sumber}")).fetchone()
+
+    n_row = hasil[0]
+    per_kolom = sorted(
+        ((k, tipe, int(b or 0)) for (k, tipe), b in zip(kolom, hasil[1:])),
+        key=lambda x: -x[2])
+    total = sum(b for _, _, b in per_kolom)
+
+    print(f"📌 {tabel}: {n_row:,} row{' (sampel)' if sampel else ''}, "
+          f"{format_byte(total)} ({total / n_row if n_row else 0:,.0f} B/row)\n")
+    print(f"   {'kolom':<28} {'tipe':<18} {'byte':>12} {'%':>6} {'B/row':>8}")
+    for k, tipe, b in per_kolom:
+        print(f"   {k:<28} {tipe[:18]:<18} {format_byte(b):>12} "
+              f"{b / total * 100 if total else 0:5.1f}% "
+              f"{b / n_row if n_row else 0:8,.0f}")
+    print()
+
+
+# =====================================================
+# 3. MAIN
+# =====================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur byte per tabel / kolom")
+    parser.add_argument("tabel", nargs="*")
+    parser.add_argument("--sampel", type=int, help="ukur N row pertama saja")
+    parser.add_argument("-n", type=int, default=20,
+                        help="jumlah tabel di daftar terbesar")
+    args = parser.parse_args()
+
+    print("==============================================================")
+    print("🚀 UKUR VOLUME DATA SOURCE")
+    print("==============================================================\n")
+
+    try:
+        endpoints = eng.engine_sumber()
+        if not args.tabel:
+            _, src = endpoints[0]
+            with src.connect() as conn:
+                daftar_tabel(conn, args.n)
+        for tabel in args.tabel:
+            host, src = endpoint_tabel(endpoints, tabel)
+            print(f"📌 Dibaca dari: {host}")
+            with src.connect() as conn:
+                ukur_tabel(conn, tabel, args.sampel)
+    except Exception as e:
+        print("\n❌ ERROR UKUR KOLOM!")
+        print("Error:", e)
+        sys.exit(1)